@@ -3,7 +3,6 @@ from enum import StrEnum
 from pathlib import Path
 from typing import Annotated
 
-import pandas as pd
 import typer
 from rich.console import Console
 from rich.logging import RichHandler
@@ -14,7 +13,7 @@ from scrapy.utils.project import get_project_settings
 from psup_scraper.items import WktLineItem
 from psup_scraper.spiders.psup_files import PsupFilesSpider
 from psup_scraper.spiders.wkt_spider import WktSpiderSpider
-from psup_stac_converter.utils.downloader import sizeof_fmt
+from psup_stac_converter.utils.inventory import load_inventory
 
 app = typer.Typer(name="psup-scraper")
 scrapy_settings = get_project_settings()
@@ -119,14 +118,7 @@ def check_data(
     ] = 10,
 ):
     """Shows a representation of the scraped result in the std console."""
-    psup_refs = pd.read_csv(feed_csv)
-    psup_refs = psup_refs.sort_values(by=["total_size", "rel_path"], ascending=False)
-    psup_refs["h_total_size"] = psup_refs["total_size"].apply(sizeof_fmt)
-    psup_refs["extension"] = psup_refs["rel_path"].apply(
-        lambda p: Path(p).suffix.lstrip(".")
-    )
-    psup_refs["category"] = psup_refs["rel_path"].apply(lambda p: p.split("/")[0])
-    psup_refs["root"] = psup_refs["rel_path"].apply(lambda p: p.split("/")[1])
+    psup_refs = load_inventory(feed_csv)
 
     table = Table("PSUP data feed")
 
@@ -1,6 +1,7 @@
 import re
 import tracemalloc
 from pathlib import Path
+from typing import Any
 
 import pandas as pd
 import pyproj
@@ -9,6 +10,10 @@ from rich.panel import Panel
 
 from psup_stac_converter.processing import CatalogCreator
 from psup_stac_converter.utils.io import IoHandler
+from psup_stac_converter.utils.validation import ValidationReport
+from psup_stac_converter.utils.validation import (
+    validate_catalog as validate_stac_files,
+)
 
 console = Console()
 
@@ -65,7 +70,27 @@ def create_catalog(
     psup_data_inventory_file: Path = None,
     wkt_file_path: Path = None,
     clean_prev_output: bool = False,
+    incremental: bool = False,
     n_omega_items: int | None = None,
+    n_jobs: int = 1,
+    cache_folder: Path | None = None,
+    cache_max_size: int | None = None,
+    http_options: dict[str, Any] | None = None,
+    resume: bool = False,
+    stream_items: bool = False,
+    prefetch_depth: int = 0,
+    prefetch_max_size: int | None = None,
+    pipeline: bool = False,
+    fetch_jobs: int = 4,
+    contour_downsampling: int = 1,
+    contour_tolerance: float = 0.0,
+    thumbnail_sizes: list[int] | None = None,
+    thumbnail_format: str = "png",
+    schema_cache_folder: Path | None = None,
+    download_schemas: bool = False,
+    stac_json_format: str = "indented",
+    stac_gzip: bool = False,
+    write_threads: int = 8,
     **kwargs,
 ):
     catalog_creator = CatalogCreator(
@@ -75,8 +100,32 @@ def create_catalog(
         wkt_file=wkt_file_path,
         log=kwargs.get("logger"),
         n_omega_files=n_omega_items,
+        n_jobs=n_jobs,
+        cache_folder=cache_folder,
+        cache_max_size=cache_max_size,
+        http_options=http_options,
+        resume=resume,
+        stream_items=stream_items,
+        prefetch_depth=prefetch_depth,
+        prefetch_max_size=prefetch_max_size,
+        pipeline=pipeline,
+        fetch_jobs=fetch_jobs,
+        contour_downsampling=contour_downsampling,
+        contour_tolerance=contour_tolerance,
+        thumbnail_sizes=thumbnail_sizes,
+        thumbnail_format=thumbnail_format,
+        schema_cache_folder=schema_cache_folder,
+        download_schemas=download_schemas,
+        stac_json_format=stac_json_format,
+        stac_gzip=stac_gzip,
+        write_threads=write_threads,
     )
-    return catalog_creator.create_catalog(clean_previous_output=clean_prev_output)
+    try:
+        return catalog_creator.create_catalog(
+            clean_previous_output=clean_prev_output, incremental=incremental
+        )
+    finally:
+        catalog_creator.close()
 
 
 def complete_catalog(
@@ -85,6 +134,24 @@ def complete_catalog(
     psup_data_inventory_file: Path = None,
     wkt_file_path: Path = None,
     n_omega_items: int | None = None,
+    n_jobs: int = 1,
+    cache_folder: Path | None = None,
+    cache_max_size: int | None = None,
+    http_options: dict[str, Any] | None = None,
+    stream_items: bool = False,
+    prefetch_depth: int = 0,
+    prefetch_max_size: int | None = None,
+    pipeline: bool = False,
+    fetch_jobs: int = 4,
+    contour_downsampling: int = 1,
+    contour_tolerance: float = 0.0,
+    thumbnail_sizes: list[int] | None = None,
+    thumbnail_format: str = "png",
+    schema_cache_folder: Path | None = None,
+    download_schemas: bool = False,
+    stac_json_format: str = "indented",
+    stac_gzip: bool = False,
+    write_threads: int = 8,
     **kwargs,
 ):
     catalog_creator = CatalogCreator(
@@ -94,5 +161,58 @@ def complete_catalog(
         wkt_file=wkt_file_path,
         log=kwargs.get("logger"),
         n_omega_files=n_omega_items,
+        n_jobs=n_jobs,
+        cache_folder=cache_folder,
+        cache_max_size=cache_max_size,
+        http_options=http_options,
+        stream_items=stream_items,
+        prefetch_depth=prefetch_depth,
+        prefetch_max_size=prefetch_max_size,
+        pipeline=pipeline,
+        fetch_jobs=fetch_jobs,
+        contour_downsampling=contour_downsampling,
+        contour_tolerance=contour_tolerance,
+        thumbnail_sizes=thumbnail_sizes,
+        thumbnail_format=thumbnail_format,
+        schema_cache_folder=schema_cache_folder,
+        download_schemas=download_schemas,
+        stac_json_format=stac_json_format,
+        stac_gzip=stac_gzip,
+        write_threads=write_threads,
+    )
+    try:
+        return catalog_creator.edit_catalog(action="add_missing")
+    finally:
+        catalog_creator.close()
+
+
+def validate_catalog(
+    catalog_file: Path,
+    n_jobs: int = 1,
+    changed_only: bool = False,
+    schema_cache_folder: Path | None = None,
+    download_schemas: bool = False,
+    **kwargs,
+) -> ValidationReport:
+    report = validate_stac_files(
+        catalog_file,
+        n_jobs=n_jobs,
+        changed_only=changed_only,
+        schema_cache_folder=schema_cache_folder,
+        download_schemas=download_schemas,
+        log=kwargs.get("logger"),
     )
-    return catalog_creator.edit_catalog(action="add_missing")
+
+    for stac_file, errors in report.errors.items():
+        console.print(
+            Panel("\n".join(errors), title=f"[bold red]{stac_file}", title_align="left")
+        )
+    if report.valid:
+        console.print(
+            f"[bold green]{report.n_checked} STAC files valid[/] ({report.n_skipped} unchanged skipped)"
+        )
+    else:
+        console.print(
+            f"[bold red]{len(report.errors)} of {report.n_checked} STAC files invalid[/] ({report.n_skipped} unchanged skipped)"
+        )
+    return report
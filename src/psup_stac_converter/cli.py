@@ -3,9 +3,11 @@ from pathlib import Path
 from typing import Annotated, Optional
 
 import typer
+from pydantic import ByteSize, TypeAdapter
 
 from psup_stac_converter import _main as F
 from psup_stac_converter.settings import (
+    Settings,
     create_logger_from_settings,
     init_settings_from_file,
 )
@@ -121,10 +123,77 @@ def create_stac_catalog(
             "--n-omega", help="Specifies the limit of OMEGA items to generate"
         ),
     ] = None,
+    n_jobs: Annotated[
+        int,
+        typer.Option(
+            "--jobs",
+            "-j",
+            min=1,
+            help="Number of processes generating the OMEGA items in parallel",
+        ),
+    ] = None,
+    cache_size: Annotated[
+        str,
+        typer.Option(
+            "--cache-size",
+            help="Size of the cache of remote resources (eg. 200GiB). Disabled by default",
+        ),
+    ] = None,
     clean_previous_output: Annotated[
         bool,
         typer.Option("--clean/--no-clean", "-c/-nc", help="Cleans the output folder"),
     ] = False,
+    stream_items: Annotated[
+        bool,
+        typer.Option(
+            "--stream/--no-stream",
+            help="Writes each OMEGA item as soon as it is created instead of keeping it in memory",
+        ),
+    ] = None,
+    prefetch_depth: Annotated[
+        int,
+        typer.Option(
+            "--prefetch",
+            min=0,
+            help="Number of OMEGA cubes downloaded while the current one is processed (without --jobs). Disabled with 0",
+        ),
+    ] = None,
+    prefetch_size: Annotated[
+        str,
+        typer.Option(
+            "--prefetch-size",
+            help="Maximum size of the OMEGA files downloaded ahead (eg. 20GiB). Unbounded by default",
+        ),
+    ] = None,
+    pipeline: Annotated[
+        bool,
+        typer.Option(
+            "--pipeline/--no-pipeline",
+            help="Fetches the OMEGA files, creates the items (with --jobs processes) and writes them in concurrent stages",
+        ),
+    ] = None,
+    fetch_jobs: Annotated[
+        int,
+        typer.Option(
+            "--fetch-jobs",
+            min=1,
+            help="Number of OMEGA cubes fetched at once by the pipeline",
+        ),
+    ] = None,
+    resume: Annotated[
+        bool,
+        typer.Option(
+            "--resume",
+            help="Reuses the OMEGA items created by an interrupted run. Use with --clean to overwrite its catalog",
+        ),
+    ] = False,
+    incremental: Annotated[
+        bool,
+        typer.Option(
+            "--incremental",
+            help="Updates the catalog of the output folder with the files added, changed or removed since it was built. Builds it in full if there's none",
+        ),
+    ] = False,
 ):
     """Converts raw input into a STAC catalog. The user must have a scraped CSV file as
     a feed to rely on, an input folder to store downloaded raw products, and an output
@@ -137,7 +206,33 @@ def create_stac_catalog(
         psup_data_inventory_file=psup_inventory_file or settings.psup_inventory_file,
         wkt_file_path=wkt_file_path or settings.wkt_file_path,
         clean_prev_output=clean_previous_output,
+        incremental=incremental,
         n_omega_items=n_omega_items or settings.n_omega_items,
+        n_jobs=n_jobs or settings.n_jobs,
+        cache_folder=settings.cache_path,
+        cache_max_size=TypeAdapter(ByteSize).validate_python(cache_size)
+        if cache_size
+        else settings.cache_max_size,
+        http_options=settings.http_options,
+        resume=resume,
+        stream_items=settings.stream_items if stream_items is None else stream_items,
+        prefetch_depth=settings.prefetch_depth
+        if prefetch_depth is None
+        else prefetch_depth,
+        prefetch_max_size=TypeAdapter(ByteSize).validate_python(prefetch_size)
+        if prefetch_size
+        else settings.prefetch_max_size,
+        pipeline=settings.pipeline if pipeline is None else pipeline,
+        fetch_jobs=fetch_jobs or settings.fetch_jobs,
+        contour_downsampling=settings.contour_downsampling,
+        contour_tolerance=settings.contour_tolerance,
+        thumbnail_sizes=settings.thumbnail_sizes,
+        thumbnail_format=settings.thumbnail_format,
+        schema_cache_folder=settings.schema_cache_path,
+        download_schemas=settings.download_schemas,
+        stac_json_format=settings.stac_json_format,
+        stac_gzip=settings.stac_gzip,
+        write_threads=settings.write_threads,
         **{k: v for k, v in ctx.obj.items() if k not in ["settings"]},
     )
 
@@ -207,6 +302,59 @@ def complete_stac_catalog(
             "--n-omega", help="Specifies the limit of OMEGA items to generate"
         ),
     ] = None,
+    n_jobs: Annotated[
+        int,
+        typer.Option(
+            "--jobs",
+            "-j",
+            min=1,
+            help="Number of processes generating the OMEGA items in parallel",
+        ),
+    ] = None,
+    cache_size: Annotated[
+        str,
+        typer.Option(
+            "--cache-size",
+            help="Size of the cache of remote resources (eg. 200GiB). Disabled by default",
+        ),
+    ] = None,
+    stream_items: Annotated[
+        bool,
+        typer.Option(
+            "--stream/--no-stream",
+            help="Writes each OMEGA item as soon as it is created instead of keeping it in memory",
+        ),
+    ] = None,
+    prefetch_depth: Annotated[
+        int,
+        typer.Option(
+            "--prefetch",
+            min=0,
+            help="Number of OMEGA cubes downloaded while the current one is processed (without --jobs). Disabled with 0",
+        ),
+    ] = None,
+    prefetch_size: Annotated[
+        str,
+        typer.Option(
+            "--prefetch-size",
+            help="Maximum size of the OMEGA files downloaded ahead (eg. 20GiB). Unbounded by default",
+        ),
+    ] = None,
+    pipeline: Annotated[
+        bool,
+        typer.Option(
+            "--pipeline/--no-pipeline",
+            help="Fetches the OMEGA files, creates the items (with --jobs processes) and writes them in concurrent stages",
+        ),
+    ] = None,
+    fetch_jobs: Annotated[
+        int,
+        typer.Option(
+            "--fetch-jobs",
+            min=1,
+            help="Number of OMEGA cubes fetched at once by the pipeline",
+        ),
+    ] = None,
 ):
     """Converts raw input into a STAC catalog. The user must have a scraped CSV file as
     a feed to rely on, an input folder to store downloaded raw products, and an output
@@ -219,6 +367,30 @@ def complete_stac_catalog(
         psup_data_inventory_file=psup_inventory_file or settings.psup_inventory_file,
         wkt_file_path=wkt_file_path or settings.wkt_file_path,
         n_omega_items=n_omega_items or settings.n_omega_items,
+        n_jobs=n_jobs or settings.n_jobs,
+        cache_folder=settings.cache_path,
+        cache_max_size=TypeAdapter(ByteSize).validate_python(cache_size)
+        if cache_size
+        else settings.cache_max_size,
+        http_options=settings.http_options,
+        stream_items=settings.stream_items if stream_items is None else stream_items,
+        prefetch_depth=settings.prefetch_depth
+        if prefetch_depth is None
+        else prefetch_depth,
+        prefetch_max_size=TypeAdapter(ByteSize).validate_python(prefetch_size)
+        if prefetch_size
+        else settings.prefetch_max_size,
+        pipeline=settings.pipeline if pipeline is None else pipeline,
+        fetch_jobs=fetch_jobs or settings.fetch_jobs,
+        contour_downsampling=settings.contour_downsampling,
+        contour_tolerance=settings.contour_tolerance,
+        thumbnail_sizes=settings.thumbnail_sizes,
+        thumbnail_format=settings.thumbnail_format,
+        schema_cache_folder=settings.schema_cache_path,
+        download_schemas=settings.download_schemas,
+        stac_json_format=settings.stac_json_format,
+        stac_gzip=settings.stac_gzip,
+        write_threads=settings.write_threads,
         **{k: v for k, v in ctx.obj.items() if k not in ["settings"]},
     )
 
@@ -300,6 +472,63 @@ def show_wkt_projections(
     )
 
 
+@app.command()
+def validate(
+    ctx: typer.Context,
+    catalog_file: Annotated[
+        Path,
+        typer.Argument(
+            help="The catalog.json of the catalog. Defaults to the one of the output folder",
+            exists=True,
+            file_okay=True,
+            dir_okay=False,
+            readable=True,
+            resolve_path=True,
+        ),
+    ] = None,
+    n_jobs: Annotated[
+        int,
+        typer.Option(
+            "--jobs",
+            "-j",
+            min=1,
+            help="Number of processes validating the items in parallel",
+        ),
+    ] = None,
+    changed_only: Annotated[
+        bool,
+        typer.Option(
+            "--changed-only/--all",
+            help="Only validates the files added or modified since they were found valid",
+        ),
+    ] = False,
+    download_schemas: Annotated[
+        bool,
+        typer.Option(
+            "--download-schemas/--offline",
+            help="Downloads the schemas that aren't available locally into the schema cache",
+        ),
+    ] = None,
+):
+    """Validates a STAC catalog, its collections and items against local copies of
+    the JSON schemas, without a network unless asked to."""
+    # The default settings can be enough to validate a catalog
+    settings = ctx.obj.get("settings") or Settings()
+
+    report = F.validate_catalog(
+        catalog_file or settings.output_data_path / "catalog.json",
+        n_jobs=n_jobs or settings.n_jobs,
+        changed_only=changed_only,
+        schema_cache_folder=settings.schema_cache_path,
+        download_schemas=settings.download_schemas
+        if download_schemas is None
+        else download_schemas,
+        **{k: v for k, v in ctx.obj.items() if k not in ["settings"]},
+    )
+    if not report.valid:
+        raise typer.Exit(code=1)
+
+
 @app.command()
 def describe_tif(
     tif_file: Annotated[
@@ -66,6 +66,18 @@ class StacItemCreationError(Exception):
     """Raises when the user can't go through with an item's creation"""
 
 
+class IncompleteDownloadError(Exception):
+    """Raised when a download keeps ending before the expected size is reached"""
+
+    def __init__(self, remote_url: str, received: int, expected: int, *args):
+        self.remote_url = remote_url
+        self.received = received
+        self.expected = expected
+        super().__init__(
+            f"Got {received} out of {expected} bytes from {remote_url}", *args
+        )
+
+
 class OutOfMemoryError(Exception):
     """Raised when process memory usage exceeds the configured threshold."""
 
@@ -91,3 +103,25 @@ class OutOfMemoryError(Exception):
             "threshold_pct": self.threshold_pct,
             "timestamp": self.timestamp,
         }
+
+
+class IdlSaveFormatError(ValueError):
+    """Raised when an IDL .sav file or one of its variables can't be decoded"""
+
+    pass
+
+
+class RangeRequestUnsupportedError(Exception):
+    """Raised when a server answers a byte-range request with the whole resource"""
+
+    def __init__(self, remote_url: str, *args):
+        self.remote_url = remote_url
+        super().__init__(f"{remote_url} doesn't support byte-range requests", *args)
+
+
+class SchemaNotAvailableError(Exception):
+    """Raised when a JSON schema isn't available locally and can't be downloaded"""
+
+    def __init__(self, schema_uri: str, *args):
+        self.schema_uri = schema_uri
+        super().__init__(f"The schema {schema_uri} isn't available locally", *args)
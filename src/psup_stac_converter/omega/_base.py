@@ -1,8 +1,21 @@
 import datetime as dt
 import json
 import logging
+import multiprocessing
+import shutil
+import sqlite3
+import tempfile
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import ExitStack, contextmanager
 from pathlib import Path
-from typing import Any, Literal, cast
+from typing import Any, Callable, Iterable, Iterator, Literal, cast
 from zoneinfo import ZoneInfo
 
 import numpy as np
@@ -23,17 +36,47 @@ from psup_stac_converter.exceptions import (
     OmegaOrbitCubeIndexNotFoundError,
     OutOfMemoryError,
     PropertySetterError,
+    RangeRequestUnsupportedError,
 )
 from psup_stac_converter.extensions import apply_sci, apply_ssys
 from psup_stac_converter.informations.data_providers import providers as data_providers
 from psup_stac_converter.settings import create_logger
-from psup_stac_converter.utils.file_utils import convert_arr_to_thumbnail
+from psup_stac_converter.utils.downloader import index_positions
+from psup_stac_converter.utils.file_utils import (
+    convert_arr_to_thumbnail,
+    convert_arr_to_thumbnails,
+    save_image,
+    save_images,
+)
+from psup_stac_converter.utils.idl_save import read_sav_variables
 from psup_stac_converter.utils.io import PsupIoHandler
+from psup_stac_converter.utils.item_writer import (
+    ItemChanges,
+    ItemStub,
+    StreamingItemWriter,
+    delete_item_file,
+    item_links_by_id,
+    stubs_of_extent,
+)
+from psup_stac_converter.utils.journal import ItemJournal
+from psup_stac_converter.utils.metadata_store import MetadataStore
 from psup_stac_converter.utils.models import (
     CubedataVariable,
     HorizontalSpatialRasterDimension,
     VerticalSpatialRasterDimension,
 )
+from psup_stac_converter.utils.pipeline import StagedPipeline
+from psup_stac_converter.utils.prefetch import (
+    Prefetcher,
+    PrefetchJob,
+    run_prefetch_jobs,
+)
+
+# NetCDF4 files are HDF5 files
+HDF5_SIGNATURE = b"\x89HDF\r\n\x1a\n"
+
+# Planes of a cube read at once by the reductions over its wavelengths
+REDUCTION_CHUNK_PLANES = 8
 
 
 class SpecialObjectEncoder(json.JSONEncoder):
@@ -80,7 +123,100 @@ def select_rgb_from_xarr(ds: xr.Dataset, attrib: str = "Reflectance") -> np.ndar
         ds.wavelength.size // 2,
         ds.wavelength.size // 2 + ds.wavelength.size // 3,
     ]
-    return getattr(ds.isel(wavelength=channels), attrib).values
+    selection = getattr(ds, attrib).isel(wavelength=channels)
+    axis = selection.get_axis_num("wavelength")
+    # Read band by band into the result, without a copy of the selection
+    rgb = np.empty(selection.shape, dtype=selection.dtype)
+    for position in range(len(channels)):
+        rgb[(slice(None),) * axis + (position,)] = selection.isel(
+            wavelength=position
+        ).values
+    return rgb
+
+
+def find_valid_pixels(
+    data_array: xr.DataArray, chunk_planes: int = REDUCTION_CHUNK_PLANES
+) -> np.ndarray:
+    """Finds the pixels having at least a valid value along the first dimension of
+    the array (eg. the wavelengths of a cube).
+
+    The array is read `chunk_planes` planes at a time, so that the memory used
+    depends on the size of a plane rather than on the size of the whole cube.
+
+    Args:
+        data_array (xr.DataArray): A lazily loaded array, eg. from `xr.open_dataset`
+        chunk_planes (int, optional): _description_. Defaults to REDUCTION_CHUNK_PLANES.
+
+    Returns:
+        np.ndarray: Mask of the valid pixels, over the other dimensions
+    """
+    along = data_array.dims[0]
+    valid_pixels = np.zeros(data_array.shape[1:], dtype=bool)
+    for start in range(0, data_array.sizes[along], chunk_planes):
+        chunk = data_array.isel({along: slice(start, start + chunk_planes)})
+        valid_pixels |= chunk.notnull().any(dim=along).values
+        if valid_pixels.all():
+            break
+    return valid_pixels
+
+
+# Media type of the thumbnails by format
+THUMBNAIL_MEDIA_TYPES = {"png": pystac.MediaType.PNG, "webp": "image/webp"}
+# Thumbnails larger than this are rather overviews
+MAX_THUMBNAIL_ROLE_SIZE = 256
+
+# Band selections making the data of a thumbnail out of a NetCDF cube, by name
+THUMBNAIL_STRATEGIES: dict[str, Callable[[xr.Dataset], np.ndarray]] = {
+    "rgb_thirds": select_rgb_from_xarr,
+}
+
+
+# Reader held by each worker of the process pool (see `OmegaDataReader.create_collection`)
+_worker_reader: "OmegaDataReader | None" = None
+
+
+def _init_item_worker(reader: "OmegaDataReader", log_level: int):
+    """Process pool initializer: keeps a copy of the reader for the worker's lifetime"""
+    global _worker_reader
+    reader.log = create_logger(
+        reader.log.name, log_level=logging.getLevelName(log_level)
+    )
+    _worker_reader = reader
+
+
+def _create_item_in_worker(
+    orbit_cube_idx: str, fetched: dict[str, Path] | None = None
+) -> tuple[dict[str, Any] | None, str | None]:
+    """Creates an item inside a worker of the process pool.
+
+    Errors are sent back to the parent instead of breaking the pool, except for
+    `OutOfMemoryError` which must stop the whole generation.
+
+    Args:
+        orbit_cube_idx (str): _description_
+        fetched (dict[str, Path] | None, optional): Files of the cube already
+        fetched, removed once the item is created. Defaults to None.
+
+    Returns:
+        tuple[dict[str, Any] | None, str | None]: The serialized item, or the error
+        that prevented its creation
+    """
+    if fetched:
+        _worker_reader._fetched_files[orbit_cube_idx] = fetched
+    try:
+        item = _worker_reader.create_stac_item(orbit_cube_idx)
+        _worker_reader.io_handler.check_memory()
+        return item.to_dict(include_self_link=False, transform_hrefs=False), None
+    except OutOfMemoryError:
+        raise
+    except Exception as e:
+        return None, f"[{e.__class__.__name__}] {e}"
+    finally:
+        # In case the cube wasn't opened
+        for fetched_path in _worker_reader._fetched_files.pop(
+            orbit_cube_idx, {}
+        ).values():
+            fetched_path.unlink(missing_ok=True)
 
 
 class OmegaDataTextItem(BaseModel):
@@ -109,7 +245,142 @@ class OmegaDataTextItem(BaseModel):
         )
 
 
+class OmegaCubeFiles:
+    """Files of a single OMEGA cube, fetched at most once while the cube is processed.
+
+    Every consumer of the cube (cubedata, extras, thumbnail, contour, sav metadata...)
+    should go through the same instance so the remote files are only downloaded once.
+    The local copies are disposed of when the instance is closed.
+
+    Notes:
+        The NetCDF dataset is opened lazily and kept for the lifetime of the object.
+        Its metadata can be read without downloading it through `nc_header`.
+        The IDL .sav file is only kept on disk: `read_sav` parses it on demand, as
+        keeping a parsed multi-GB cube in memory would outlive its only consumer.
+        Files already fetched (see `Prefetcher`) are used as they are and removed
+        with the others.
+    """
+
+    def __init__(
+        self,
+        reader: "OmegaDataReader",
+        orbit_cube_idx: str,
+        on_disk: bool = False,
+        fetched: dict[str, Path] | None = None,
+    ):
+        self.reader = reader
+        self.orbit_cube_idx = orbit_cube_idx
+        self.on_disk = on_disk
+        self._stack = ExitStack()
+        self._local_paths: dict[str, Path] = {}
+        for file_extension, fetched_path in (fetched or {}).items():
+            self._local_paths[file_extension] = fetched_path
+            self._stack.callback(fetched_path.unlink, missing_ok=True)
+        self._nc: xr.Dataset | None = None
+        self._nc_header: xr.Dataset | None = None
+
+    def __enter__(self) -> "OmegaCubeFiles":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def local_path(self, file_extension: Literal["sav", "nc", "txt"]) -> Path:
+        """Fetches the file of the cube with the given extension if it hasn't been yet.
+
+        Args:
+            file_extension (Literal[&quot;sav&quot;, &quot;nc&quot;, &quot;txt&quot;]): The extension of the file.
+
+        Returns:
+            Path: Location of the file on the local disk
+        """
+        if file_extension not in self._local_paths:
+            self._local_paths[file_extension] = self._stack.enter_context(
+                self.reader.fetch_file(
+                    self.orbit_cube_idx, file_extension, on_disk=self.on_disk
+                )
+            )
+        return self._local_paths[file_extension]
+
+    @property
+    def nc(self) -> xr.Dataset:
+        """The NetCDF dataset of the cube, opened once."""
+        if self._nc is None:
+            # Not kept in memory once read, the data variables being read by parts
+            self._nc = xr.open_dataset(self.local_path("nc"), cache=False)
+            self._stack.callback(self._nc.close)
+            self.reader.io_handler.check_memory()
+        return self._nc
+
+    @property
+    def nc_header(self) -> xr.Dataset:
+        """The NetCDF dataset of the cube, for its attributes and coordinates.
+
+        Unless the file is already on the disk, only the parts of it that are read
+        are fetched, through byte-range requests: the data variables shouldn't be
+        loaded from it. Falls back on `nc` if the file isn't an HDF5 one or if the
+        server can't send parts of it.
+        """
+        if self._nc is not None or "nc" in self._local_paths or self.on_disk:
+            return self.nc
+        if self._nc_header is None:
+            try:
+                self._nc_header = self._open_remote_nc()
+            except RangeRequestUnsupportedError as e:
+                self.reader.log.debug(f"Downloading the whole file instead: {e}")
+            if self._nc_header is None:
+                return self.nc
+        return self._nc_header
+
+    def _open_remote_nc(self) -> xr.Dataset | None:
+        """Opens the remote NetCDF file, None if it isn't an HDF5 one (NetCDF3)"""
+        oc_info = self.reader.find_info_by_orbit_cube(
+            self.orbit_cube_idx, file_extension="nc"
+        )
+        remote_f = self._stack.enter_context(
+            self.reader.io_handler.psup_archive.open_ranges(
+                oc_info["href"].item(), total_size=int(oc_info["total_size"].item())
+            )
+        )
+        if remote_f.read(len(HDF5_SIGNATURE)) != HDF5_SIGNATURE:
+            return None
+        remote_f.seek(0)
+
+        nc_header = xr.open_dataset(remote_f, engine="h5netcdf")
+        self._stack.callback(nc_header.close)
+        return nc_header
+
+    def read_sav(self, variable_names: Iterable[str] | None = None) -> dict[str, Any]:
+        """Parses the IDL .sav file of the cube.
+
+        Args:
+            variable_names (Iterable[str] | None, optional): The only variables to
+            decode, skipping the others (eg. the reflectance cube). The whole file is
+            loaded if None. Defaults to None.
+
+        Returns:
+            dict[str, Any]: An IDL AttrDict of the .sav file, or the requested
+            variables by lowercase name
+        """
+        if variable_names is not None:
+            sav_ds = read_sav_variables(self.local_path("sav"), variable_names)
+        else:
+            sav_ds = sio.readsav(self.local_path("sav"))
+        self.reader.io_handler.check_memory()
+        return sav_ds
+
+    def close(self):
+        self._nc = None
+        self._nc_header = None
+        self._local_paths.clear()
+        self._stack.close()
+
+
 class OmegaDataReader:
+    # Memory taken by a cube being processed, relative to the size of the files it
+    # reads in full (decoded arrays, validity masks and their copies)
+    peak_memory_factor = 4.0
+
     def __init__(
         self,
         psup_io_handler: PsupIoHandler,
@@ -122,6 +393,8 @@ class OmegaDataReader:
         collection_description: str = "",
         publications: list[Publication] = [],
         log: logging.Logger | None = None,
+        thumbnail_sizes: Iterable[int] = (256,),
+        thumbnail_format: Literal["png", "webp"] = "png",
     ):
         self.io_handler = psup_io_handler
         self.data_type = data_type
@@ -129,6 +402,9 @@ class OmegaDataReader:
         self.dim_names = dim_names
         self.metadata_folder_prefix = metadata_folder_prefix
         self._omega_data = self._get_omega_data(data_type)
+        self._omega_data_index = index_positions(
+            zip(self._omega_data.index, self._omega_data["extension"])
+        )
         self.collection_id = collection_id
         self.license_name = license_name
         self.collection_description = collection_description
@@ -138,30 +414,60 @@ class OmegaDataReader:
         else:
             self.log = log
 
+        # Where the metadata was saved as one JSON file per cube, before the store
         self.sav_metadata_folder = (
             psup_io_handler.output_folder / f"{self.metadata_folder_prefix}sav"
         )
         self.nc_metadata_folder = (
             psup_io_handler.output_folder / f"{self.metadata_folder_prefix}nc"
         )
+        self.sav_metadata_kind = f"{self.metadata_folder_prefix}sav"
+        self.nc_metadata_kind = f"{self.metadata_folder_prefix}nc"
+        self.metadata_store = MetadataStore(
+            psup_io_handler.output_folder / "omega_metadata.sqlite", log=self.log
+        )
+        self.metadata_store.import_json_folder(
+            self.sav_metadata_kind, self.sav_metadata_folder, file_prefix="sav_"
+        )
+        self.metadata_store.import_json_folder(
+            self.nc_metadata_kind, self.nc_metadata_folder, file_prefix="nc_"
+        )
         self.thumbnail_folder = (
             psup_io_handler.output_folder
             / "thumbnails"
             / f"{self.metadata_folder_prefix}thumbnail"
         )
-        self.thumbnail_dims = (256, 256)
-        self.log.debug(f".sav metadata folder: {self.sav_metadata_folder}")
-        self.log.debug(f".nc metadata folder: {self.nc_metadata_folder}")
+        # Square thumbnails, the first size being the main thumbnail of the items
+        self.thumbnail_sizes = [(size, size) for size in dict.fromkeys(thumbnail_sizes)]
+        if not self.thumbnail_sizes:
+            raise ValueError("At least one thumbnail size is needed")
+        self.thumbnail_dims = self.thumbnail_sizes[0]
+        if thumbnail_format not in THUMBNAIL_MEDIA_TYPES:
+            raise ValueError(
+                f"Unknown thumbnail format {thumbnail_format}, expected one of {list(THUMBNAIL_MEDIA_TYPES)}"
+            )
+        self.thumbnail_format = thumbnail_format
+        # How the thumbnails are rendered. They are made again when this or their
+        # source file changes, as recorded in the store (see `thumbnail_key`)
+        self.thumbnail_strategy = "rgb_thirds"
+        self.thumbnail_mode: Literal["L", "RGB", "RGBA"] = "RGBA"
+        self.thumbnail_omega_fix = True
+        self.thumbnail_kind = f"{self.metadata_folder_prefix}thumbnail"
+        # Journals of the items created by the runs
+        self.checkpoint_folder = psup_io_handler.output_folder / "checkpoints"
+        # Fetches the files of the next cubes while one is processed, if enabled
+        self._prefetcher: Prefetcher | None = None
+        # Files already fetched by cube, handed over to the next `open_cube`
+        self._fetched_files: dict[str, dict[str, Path]] = {}
+        self.log.debug(f"Metadata store: {self.metadata_store.db_path}")
         self.log.debug(f"Folder for thumbnails: {self.thumbnail_folder}")
-        if not self.sav_metadata_folder.exists():
-            self.sav_metadata_folder.mkdir()
-
-        if not self.nc_metadata_folder.exists():
-            self.nc_metadata_folder.mkdir()
-
         if not self.thumbnail_folder.exists():
             self.thumbnail_folder.mkdir(parents=True)
 
+    def close(self):
+        """Closes the metadata store"""
+        self.metadata_store.close()
+
     @property
     def omega_data(self) -> pd.DataFrame:
         return self._omega_data
@@ -214,16 +520,12 @@ class OmegaDataReader:
             )
 
         if file_extension is not None:
-            omega_info = self.omega_data.loc[
-                self.omega_data.index.str.contains(orbit_cube_idx)
-                & self.omega_data["extension"].str.contains(file_extension),
-                :,
-            ]
-            if omega_info.empty:
+            position = self._omega_data_index.get((orbit_cube_idx, file_extension))
+            if position is None:
                 raise OmegaCubeDataMissingError(
                     f"{orbit_cube_idx} exists but the info requested with extension .{file_extension} couldn't be found"
                 )
-            return omega_info
+            return self.omega_data.iloc[[position]]
 
         omega_info = self.omega_data.loc[[orbit_cube_idx], :]
         if omega_info.empty:
@@ -265,6 +567,123 @@ class OmegaDataReader:
         else:
             raise FileExtensionError(["sav", "nc", "txt"], file_extension)
 
+    @contextmanager
+    def fetch_file(
+        self,
+        orbit_cube_idx: str,
+        file_extension: Literal["sav", "nc", "txt"],
+        on_disk: bool = True,
+    ) -> Iterator[Path]:
+        """Makes a file of an OMEGA cube available on the local disk.
+
+        Args:
+            orbit_cube_idx (str): OMEGA data ID of the item
+            file_extension (Literal[&quot;sav&quot;, &quot;nc&quot;, &quot;txt&quot;]): The extension of the file.
+            on_disk (bool, optional): Whether the file should be kept in the input folder or
+            only held temporarily until the context exits. Defaults to True.
+
+        Yields:
+            Iterator[Path]: The local path of the file
+        """
+        oc_info = self.find_info_by_orbit_cube(
+            orbit_cube_idx, file_extension=file_extension
+        )
+
+        if on_disk:
+            yield self.io_handler.find_or_download(oc_info["file_name"].item())
+        else:
+            with self.io_handler.psup_archive.open_resource(
+                oc_info["href"].item(), total_size=int(oc_info["total_size"].item())
+            ) as resource_file:
+                yield Path(resource_file.name)
+
+    def open_cube(self, orbit_cube_idx: str, on_disk: bool = False) -> OmegaCubeFiles:
+        """Opens the files of an OMEGA cube so they can be shared by all the steps of
+        the item's creation. Should be used as a context manager.
+
+        Args:
+            orbit_cube_idx (str): OMEGA data ID of the item
+            on_disk (bool, optional): Whether the files should be kept in the input folder.
+            Defaults to False.
+
+        Returns:
+            OmegaCubeFiles: The files of the cube
+        """
+        fetched = None
+        if not on_disk:
+            fetched = self._fetched_files.pop(orbit_cube_idx, None)
+            if fetched is None and self._prefetcher is not None:
+                fetched = self._prefetcher.take(orbit_cube_idx)
+        return OmegaCubeFiles(self, orbit_cube_idx, on_disk=on_disk, fetched=fetched)
+
+    def prefetch_jobs(self, orbit_cube_idx: str) -> list[PrefetchJob]:
+        """Files of a cube that the creation of its item downloads in full: the NetCDF
+        file unless the thumbnail is up to date, and the .sav file unless its
+        metadata is stored.
+
+        Args:
+            orbit_cube_idx (str): OMEGA data ID of the item
+
+        Returns:
+            list[PrefetchJob]: _description_
+        """
+        jobs = []
+        if not self.thumbnail_is_current(orbit_cube_idx):
+            jobs.append(self._prefetch_job(orbit_cube_idx, "nc"))
+        if not self.metadata_store.get(self.sav_metadata_kind, orbit_cube_idx):
+            jobs.append(self._prefetch_job(orbit_cube_idx, "sav"))
+        return [job for job in jobs if job is not None]
+
+    def estimate_peak_mb(self, orbit_cube_idx: str) -> float:
+        """Estimates the peak memory used to create the item of a cube, from the size
+        in the inventory of the files it reads in full (see `prefetch_jobs`).
+
+        Args:
+            orbit_cube_idx (str): OMEGA data ID of the item
+
+        Returns:
+            float: _description_
+        """
+        files_size = sum(
+            job.size for job in self.prefetch_jobs(orbit_cube_idx) if job.name != "txt"
+        )
+        return self.peak_memory_factor * files_size / (1024**2)
+
+    def _prefetch_job(
+        self,
+        orbit_cube_idx: str,
+        file_extension: Literal["sav", "nc", "txt"],
+        on_disk: bool = False,
+    ) -> PrefetchJob | None:
+        """Fetches a file of the cube the same way as `fetch_file`. None if the file
+        isn't in the inventory or is already in the input folder."""
+        try:
+            oc_info = self.find_info_by_orbit_cube(
+                orbit_cube_idx, file_extension=file_extension
+            )
+        except OmegaCubeDataMissingError:
+            return None
+        file_name = oc_info["file_name"].item()
+        href = oc_info["href"].item()
+        total_size = int(oc_info["total_size"].item())
+
+        if on_disk:
+            if self.io_handler.find_by_file(file_name)[1]:
+                return None
+
+            def save_in_input_folder(_folder: Path) -> None:
+                # Found there by `fetch_file` afterwards
+                self.io_handler.find_or_download(file_name)
+
+            return PrefetchJob(file_extension, total_size, save_in_input_folder)
+
+        def download(folder: Path) -> Path:
+            return self.io_handler.psup_archive.download_resource(
+                href, folder / file_name, total_size=total_size
+            )
+
+        return PrefetchJob(file_extension, total_size, download)
+
     def open_sav_dataset(
         self, orbit_cube_idx: str, on_disk: bool = True
     ) -> dict[str, Any]:
@@ -278,21 +697,9 @@ class OmegaDataReader:
         Returns:
             dict[str, Any]: An IDL AttrDict of the.sav file
         """
-        sav_ds = None
-        oc_info = self.find_info_by_orbit_cube(orbit_cube_idx, file_extension="sav")
-
         self.log.debug(f"finding info related to {orbit_cube_idx}. On disk? {on_disk}")
-        if on_disk:
-            fp = self.io_handler.find_or_download(oc_info["file_name"].item())
-            sav_ds = sio.readsav(fp)
-        else:
-            with self.io_handler.psup_archive.open_resource(
-                oc_info["href"].item()
-            ) as sav_file:
-                sav_ds = sio.readsav(sav_file.name)
-
-        self.io_handler.check_memory()
-        return sav_ds
+        with self.open_cube(orbit_cube_idx, on_disk=on_disk) as cube:
+            return cube.read_sav()
 
     def open_nc_dataset(self, orbit_cube_idx: str, on_disk: bool = True) -> xr.Dataset:
         """Opens NetCDF4 dataset using the XArray package
@@ -306,16 +713,8 @@ class OmegaDataReader:
             xr.Dataset: The NetCDF dataset under an xarray dataset.
         """
         nc_dataset = None
-        oc_info = self.find_info_by_orbit_cube(orbit_cube_idx, file_extension="nc")
-
-        if on_disk:
-            fp = self.io_handler.find_or_download(oc_info["file_name"].item())
+        with self.fetch_file(orbit_cube_idx, "nc", on_disk=on_disk) as fp:
             nc_dataset = xr.open_dataset(fp)
-        else:
-            with self.io_handler.psup_archive.open_resource(
-                oc_info["href"].item()
-            ) as nc_file:
-                nc_dataset = xr.open_dataset(nc_file.name)
         self.io_handler.check_memory()
 
         return nc_dataset
@@ -339,24 +738,11 @@ class OmegaDataReader:
             str | OmegaDataTextItem: The result. Either the raw text if `raw=True` or
             OmegaDataTextItem
         """
-        oc_info = self.find_info_by_orbit_cube(orbit_cube_idx, file_extension="txt")
-        textinfo = ""
-
-        if on_disk:
-            fp = self.io_handler.find_or_download(oc_info["file_name"].item())
-            textinfo = fp.read_text()
-        else:
-            with self.io_handler.psup_archive.open_resource(
-                oc_info["href"].item()
-            ) as txt_file:
-                raw_txt = txt_file.read()
-                if isinstance(raw_txt, (bytes, bytearray)):
-                    textinfo = raw_txt.decode("utf-8", errors="replace")
-                else:
-                    textinfo = str(raw_txt)
+        with self.fetch_file(orbit_cube_idx, "txt", on_disk=on_disk) as fp:
+            textinfo = fp.read_text(encoding="utf-8", errors="replace")
 
-            if raw:
-                return textinfo
+        if raw:
+            return textinfo
 
         text_obj = {}
         for line in textinfo.strip().split("\n"):
@@ -394,9 +780,53 @@ class OmegaDataReader:
             ]
         )
 
-    def create_collection(self, n_limit: int | None = None) -> pystac.Collection:
+    def update_extent(self, collection: pystac.Collection, item_stubs: list[ItemStub]):
+        """Narrows the extent of the collection down to its items, once they are all
+        created. The extent found beforehand is kept by default.
+
+        Args:
+            collection (pystac.Collection): _description_
+            item_stubs (list[ItemStub]): The items of the collection
+        """
+        pass
+
+    def create_collection(
+        self,
+        n_limit: int | None = None,
+        n_jobs: int = 1,
+        resume: bool = False,
+        item_writer: StreamingItemWriter | None = None,
+        prefetch_depth: int = 0,
+        prefetch_max_bytes: int | None = None,
+        pipeline: bool = False,
+        fetch_jobs: int = 4,
+    ) -> pystac.Collection:
         """Creates a STAC collection based over the OMEGA data series.
 
+        Every item created is recorded in a journal of the checkpoint folder, so that
+        an interrupted run can be resumed.
+
+        Args:
+            n_limit (int | None, optional): Maximum number of items to create. Defaults to None.
+            n_jobs (int, optional): Number of processes creating the items. Items are
+            created in the current process if left to 1. Defaults to 1.
+            resume (bool, optional): Reuses the items recorded by the previous run
+            and only creates the missing ones. Defaults to False.
+            item_writer (StreamingItemWriter | None, optional): Writes each item as
+            soon as it is created, the collection only keeping links to them. Items
+            are kept in the collection otherwise. Defaults to None.
+            prefetch_depth (int, optional): Number of cubes whose files are
+            downloaded while the current one is processed, when the items are
+            created in the current process. Disabled if 0. Defaults to 0.
+            prefetch_max_bytes (int | None, optional): Maximum size of the files
+            downloaded ahead, by the prefetcher or the pipeline. Unbounded if None.
+            Defaults to None.
+            pipeline (bool, optional): Creates the items through stages fetching
+            the files, creating the items in `n_jobs` processes and writing them,
+            all at the same time. Defaults to False.
+            fetch_jobs (int, optional): Number of cubes fetched at once by the
+            pipeline. Defaults to 4.
+
         Returns:
             pystac.Collection: The corresponding STAC collection
         """
@@ -422,40 +852,415 @@ class OmegaDataReader:
         # TODO: make a pystac extension for processing
         # collection.extra_fields["processing:level"] = self.processing_level
 
-        for omega_data_idx in tqdm(
-            self.get_omega_data_ids(n_limit=n_limit),
-            total=n_limit if n_limit else self.n_elements,
-        ):
-            try:
-                omega_data_item = self.create_stac_item(omega_data_idx)
+        if item_writer is not None:
+            item_writer.attach(collection)
+        item_stubs: list[ItemStub] = []
+
+        def add_item(omega_data_item: pystac.Item):
+            if item_writer is not None:
+                item_stubs.append(item_writer.write(collection, omega_data_item))
+            else:
                 collection.add_item(omega_data_item)
-                self.log.debug(f"Created item for cube # {omega_data_item}")
-
-                mem_snapshot = self.io_handler.check_memory()
-                self.log.debug(str(mem_snapshot))
-            # If the memory available is shrinking, stop everything and save
-            except OutOfMemoryError as oom_e:
-                self.log.error("System hitting OOM error soon! (code 137)!")
-                self.log.error(f"Details: {oom_e}")
-                raise
-            except Exception as e:
-                self.log.error(
-                    f"An unexpected error occured: [{e.__class__.__name__}] {e}"
+                item_stubs.append(ItemStub.from_item(omega_data_item))
+
+        omega_data_ids = self.get_omega_data_ids(n_limit=n_limit)
+        with ItemJournal(
+            self.checkpoint_folder / f"{self.collection_id}.jsonl",
+            resume=resume,
+            log=self.log,
+        ) as journal:
+            if resume:
+                recorded_items = journal.load()
+                is_recorded = omega_data_ids.isin(list(recorded_items))
+                for omega_data_idx in omega_data_ids[is_recorded]:
+                    add_item(recorded_items.pop(omega_data_idx))
+                omega_data_ids = omega_data_ids[~is_recorded]
+                self.log.info(
+                    f"Resuming {self.collection_id}: {is_recorded.sum()} items recorded, {omega_data_ids.size} left"
                 )
-                self.log.error(f"{omega_data_idx} skipped!")
 
+            def record_item(omega_data_item: pystac.Item):
+                journal.record(omega_data_item)
+                add_item(omega_data_item)
+
+            self._create_items_by(
+                omega_data_ids,
+                record_item,
+                n_jobs=n_jobs,
+                prefetch_depth=prefetch_depth,
+                prefetch_max_bytes=prefetch_max_bytes,
+                pipeline=pipeline,
+                fetch_jobs=fetch_jobs,
+            )
+
+        if item_stubs:
+            self.update_extent(collection, item_stubs)
         return collection
 
+    def update_collection(
+        self,
+        collection: pystac.Collection,
+        changed_ids: Iterable[str] = (),
+        n_limit: int | None = None,
+        n_jobs: int = 1,
+        item_writer: StreamingItemWriter | None = None,
+        prefetch_depth: int = 0,
+        prefetch_max_bytes: int | None = None,
+        pipeline: bool = False,
+        fetch_jobs: int = 4,
+    ) -> ItemChanges:
+        """Brings the collection of a saved catalog up to date with the inventory,
+        without reading its items:
+
+        - the items of the cubes that left the inventory are deleted;
+        - the items of the cubes in `changed_ids` are created again;
+        - the items missing from the collection, like the ones that failed before,
+          are created.
+
+        The extent of the collection is widened to the new items, but isn't
+        narrowed down by the deleted ones.
+
+        Args:
+            collection (pystac.Collection): The collection, as loaded from the catalog
+            changed_ids (Iterable[str], optional): The cubes whose files changed since
+            the collection was made. Defaults to ().
+            n_limit (int | None, optional): Maximum number of items to create.
+            Defaults to None.
+            Other args: see `create_collection`.
+
+        Returns:
+            ItemChanges: _description_
+        """
+        item_links = item_links_by_id(collection)
+        omega_data_ids = self.get_omega_data_ids()
+        deleted = sorted(set(item_links) - set(omega_data_ids))
+        for omega_data_idx in deleted:
+            item_link = item_links.pop(omega_data_idx)
+            collection.links.remove(item_link)
+            delete_item_file(item_link)
+
+        is_missing = ~omega_data_ids.isin(list(item_links))
+        is_changed = omega_data_ids.isin(list(changed_ids)) & ~is_missing
+        for omega_data_idx in omega_data_ids[is_changed]:
+            self.forget_cube(omega_data_idx)
+        omega_data_ids = omega_data_ids[is_missing | is_changed]
+        if n_limit is not None:
+            omega_data_ids = omega_data_ids[:n_limit]
+        self.log.info(
+            f"Updating {self.collection_id}: {len(deleted)} items deleted, {is_missing.sum()} missing and {is_changed.sum()} changed"
+        )
+
+        if item_writer is not None:
+            item_writer.attach(collection)
+        item_stubs = stubs_of_extent(collection.extent)
+        item_changes = ItemChanges(created=[], updated=[], deleted=deleted)
+
+        def replace_item(omega_data_item: pystac.Item):
+            previous_link = item_links.pop(omega_data_item.id, None)
+            if previous_link is not None:
+                collection.links.remove(previous_link)
+                item_changes.updated.append(omega_data_item.id)
+            else:
+                item_changes.created.append(omega_data_item.id)
+            if item_writer is not None:
+                item_stubs.append(item_writer.write(collection, omega_data_item))
+            else:
+                collection.add_item(omega_data_item)
+                item_stubs.append(ItemStub.from_item(omega_data_item))
+
+        self._create_items_by(
+            omega_data_ids,
+            replace_item,
+            n_jobs=n_jobs,
+            prefetch_depth=prefetch_depth,
+            prefetch_max_bytes=prefetch_max_bytes,
+            pipeline=pipeline,
+            fetch_jobs=fetch_jobs,
+        )
+
+        if item_changes.created or item_changes.updated:
+            self.update_extent(collection, item_stubs)
+            # Like when the collection is read again from its parent, otherwise the
+            # next update rewrites it only to move the link
+            collection.links.sort(key=lambda link: link.rel == pystac.RelType.PARENT)
+        return item_changes
+
+    def forget_cube(self, orbit_cube_idx: str):
+        """Drops what was kept of a cube whose files changed: its stored metadata and
+        the copies of its files in the input folder. Its thumbnails are made again
+        on their own (see `thumbnail_is_current`).
+
+        Args:
+            orbit_cube_idx (str): OMEGA data ID of the item
+        """
+        self.metadata_store.delete(self.sav_metadata_kind, orbit_cube_idx)
+        self.metadata_store.delete(self.nc_metadata_kind, orbit_cube_idx)
+        for file_name in self.find_info_by_orbit_cube(orbit_cube_idx)["file_name"]:
+            file_location, exists = self.io_handler.find_by_file(file_name)
+            if exists:
+                self.log.debug(f"Deleting the outdated {file_location}")
+                file_location.unlink()
+
+    def _create_items_by(
+        self,
+        omega_data_ids: pd.Index,
+        on_item: Callable[[pystac.Item], None],
+        n_jobs: int = 1,
+        prefetch_depth: int = 0,
+        prefetch_max_bytes: int | None = None,
+        pipeline: bool = False,
+        fetch_jobs: int = 4,
+    ):
+        """Creates the items of `omega_data_ids` in the current process, in a pool of
+        `n_jobs` processes or in a pipeline, handing each one to `on_item` in order"""
+        if pipeline:
+            self._create_items_in_pipeline(
+                omega_data_ids,
+                on_item,
+                n_jobs=n_jobs,
+                fetch_jobs=fetch_jobs,
+                prefetch_max_bytes=prefetch_max_bytes,
+            )
+            return
+
+        if n_jobs > 1:
+            omega_data_items = self._create_items_in_pool(omega_data_ids, n_jobs)
+        else:
+            omega_data_items = self._create_items(
+                omega_data_ids,
+                prefetch_depth=prefetch_depth,
+                prefetch_max_bytes=prefetch_max_bytes,
+            )
+        for omega_data_item in omega_data_items:
+            on_item(omega_data_item)
+
+    def _create_items(
+        self,
+        omega_data_ids: pd.Index,
+        prefetch_depth: int = 0,
+        prefetch_max_bytes: int | None = None,
+    ) -> Iterator[pystac.Item]:
+        """Creates the items one after the other in the current process, the files
+        of the next `prefetch_depth` cubes being downloaded in the background"""
+        if prefetch_depth > 0:
+            self._prefetcher = Prefetcher(
+                (
+                    (omega_data_idx, self.prefetch_jobs(omega_data_idx))
+                    for omega_data_idx in omega_data_ids
+                ),
+                depth=prefetch_depth,
+                max_bytes=prefetch_max_bytes,
+                log=self.log,
+            )
+        try:
+            for omega_data_idx in tqdm(omega_data_ids, total=omega_data_ids.size):
+                try:
+                    omega_data_item = self.create_stac_item(omega_data_idx)
+                    self.log.debug(f"Created item for cube # {omega_data_item}")
+
+                    mem_snapshot = self.io_handler.check_memory()
+                    self.log.debug(str(mem_snapshot))
+                # If the memory available is shrinking, stop everything and save
+                except OutOfMemoryError as oom_e:
+                    self.log.error("System hitting OOM error soon! (code 137)!")
+                    self.log.error(f"Details: {oom_e}")
+                    raise
+                except Exception as e:
+                    self.log.error(
+                        f"An unexpected error occured: [{e.__class__.__name__}] {e}"
+                    )
+                    self.log.error(f"{omega_data_idx} skipped!")
+                    continue
+
+                yield omega_data_item
+        finally:
+            if self._prefetcher is not None:
+                self._prefetcher.close()
+                self._prefetcher = None
+
+    def _create_items_in_pool(
+        self, omega_data_ids: pd.Index, n_jobs: int
+    ) -> Iterator[pystac.Item]:
+        """Spreads the creation of the items over a pool of `n_jobs` processes.
+
+        The items are yielded in the same order as `omega_data_ids`, whatever the
+        order in which the workers finish them. A cube failing in a worker is
+        skipped without affecting the others. Cubes are only handed to the workers
+        when the memory manager admits their estimated peak memory (see
+        `estimate_peak_mb`), the largest ones being processed alone.
+        """
+        self.log.info(f"Creating {omega_data_ids.size} items with {n_jobs} processes")
+        memory_manager = self.io_handler.memory_manager
+        executor = self._item_process_pool(n_jobs)
+        to_submit = deque(omega_data_ids)
+        submitted: deque[tuple[str, Future]] = deque()
+        # Estimated peak memory of the cubes being processed
+        reservations: dict[Future, float] = {}
+        throttled_idx = None
+        try:
+            with tqdm(total=omega_data_ids.size) as pbar:
+                while to_submit or submitted:
+                    for future in [f for f in reservations if f.done()]:
+                        memory_manager.release(reservations.pop(future))
+
+                    # A cube is only given to a worker if the memory allows it
+                    while to_submit and len(reservations) < n_jobs:
+                        estimated_mb = self.estimate_peak_mb(to_submit[0])
+                        if not memory_manager.try_reserve(estimated_mb):
+                            if throttled_idx != to_submit[0]:
+                                throttled_idx = to_submit[0]
+                                self.log.info(
+                                    f"Waiting for memory to process {throttled_idx} ({estimated_mb:.0f} MB expected, {memory_manager.headroom_mb:.0f} MB left)"
+                                )
+                            break
+                        omega_data_idx = to_submit.popleft()
+                        future = executor.submit(_create_item_in_worker, omega_data_idx)
+                        reservations[future] = estimated_mb
+                        submitted.append((omega_data_idx, future))
+
+                    omega_data_idx, future = submitted[0]
+                    if not future.done():
+                        # Also wakes up from time to time, the memory left changing
+                        wait(
+                            list(reservations), timeout=1.0, return_when=FIRST_COMPLETED
+                        )
+                        continue
+                    submitted.popleft()
+                    pbar.update(1)
+
+                    try:
+                        item_dict, error = future.result()
+                    except OutOfMemoryError as oom_e:
+                        self.log.error("System hitting OOM error soon! (code 137)!")
+                        self.log.error(f"Details: {oom_e}")
+                        raise
+                    except BrokenProcessPool as bpp_e:
+                        self.log.error(
+                            "A worker died abruptly (most likely killed by the system)."
+                        )
+                        self.log.error(f"Details: {bpp_e}")
+                        raise
+
+                    if error is not None:
+                        self.log.error(f"An unexpected error occured: {error}")
+                        self.log.error(f"{omega_data_idx} skipped!")
+                        continue
+
+                    omega_data_item = pystac.Item.from_dict(item_dict)
+                    self.log.debug(f"Created item for cube # {omega_data_item}")
+                    yield omega_data_item
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            for estimated_mb in reservations.values():
+                memory_manager.release(estimated_mb)
+
+    def _item_process_pool(self, n_jobs: int) -> ProcessPoolExecutor:
+        """Pool of `n_jobs` processes creating items with a copy of the reader"""
+        return ProcessPoolExecutor(
+            max_workers=n_jobs,
+            # Workers are started from scratch rather than forked from a parent
+            # holding open files, clients and progress bars
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_item_worker,
+            initargs=(self, self.log.getEffectiveLevel()),
+        )
+
+    def _create_items_in_pipeline(
+        self,
+        omega_data_ids: pd.Index,
+        on_item: Callable[[pystac.Item], None],
+        n_jobs: int = 1,
+        fetch_jobs: int = 4,
+        prefetch_max_bytes: int | None = None,
+    ):
+        """Creates the items through a `StagedPipeline`: the files of the cubes are
+        fetched by `fetch_jobs` threads, the items created from them by a pool of
+        `n_jobs` processes and handed to `on_item` by a writer thread, in the order
+        of `omega_data_ids`. A cube failing is skipped without affecting the others.
+
+        The files fetched and not processed yet are kept within
+        `prefetch_max_bytes`.
+        """
+        self.log.info(
+            f"Creating {omega_data_ids.size} items with {fetch_jobs} fetching threads and {n_jobs} processes"
+        )
+        fetch_folder = Path(tempfile.mkdtemp(prefix="psup_pipeline_"))
+        pbar = tqdm(total=omega_data_ids.size)
+
+        def fetch(omega_data_idx: str) -> dict[str, Path]:
+            return run_prefetch_jobs(
+                omega_data_idx,
+                self.prefetch_jobs(omega_data_idx),
+                fetch_folder,
+                log=self.log,
+            )
+
+        def write(
+            omega_data_idx: str, result: tuple[dict[str, Any] | None, str | None]
+        ):
+            pbar.update(1)
+            item_dict, error = result
+            if error is not None:
+                self.log.error(f"An unexpected error occured: {error}")
+                self.log.error(f"{omega_data_idx} skipped!")
+                return
+            omega_data_item = pystac.Item.from_dict(item_dict)
+            self.log.debug(f"Created item for cube # {omega_data_item}")
+            on_item(omega_data_item)
+
+        executor = self._item_process_pool(n_jobs)
+        item_pipeline = StagedPipeline(
+            fetch,
+            _create_item_in_worker,
+            write,
+            executor,
+            fetch_concurrency=fetch_jobs,
+            process_concurrency=n_jobs,
+            memory_manager=self.io_handler.memory_manager,
+            estimate_mb=self.estimate_peak_mb,
+            fetch_size=lambda omega_data_idx: sum(
+                job.size for job in self.prefetch_jobs(omega_data_idx)
+            ),
+            fetch_max_bytes=prefetch_max_bytes,
+            log=self.log,
+        )
+        try:
+            item_pipeline.run(omega_data_ids)
+        except OutOfMemoryError as oom_e:
+            self.log.error("System hitting OOM error soon! (code 137)!")
+            self.log.error(f"Details: {oom_e}")
+            raise
+        except BrokenProcessPool as bpp_e:
+            self.log.error("A worker died abruptly (most likely killed by the system).")
+            self.log.error(f"Details: {bpp_e}")
+            raise
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            pbar.close()
+            shutil.rmtree(fetch_folder, ignore_errors=True)
+            for stage_report in item_pipeline.report():
+                self.log.info(stage_report)
+
     def create_stac_item(self, orbit_cube_idx: str, **kwargs) -> pystac.Item:
         """Creates a STAC item based on the common properties of OMEGA cubes.
 
         Args:
             orbit_cube_idx (str): The ID of the data cube
+            cube (OmegaCubeFiles, optional): The files of the cube, shared with the
+            subclass' own processing. Opened (and closed) here if not given.
 
         Returns:
             pystac.Item: The corresponding item of the orbit-cube ID
         """
-
+        cube: OmegaCubeFiles | None = kwargs.pop("cube", None)
+        if cube is None:
+            with self.open_cube(orbit_cube_idx) as cube:
+                return self._build_stac_item(orbit_cube_idx, cube, **kwargs)
+        return self._build_stac_item(orbit_cube_idx, cube, **kwargs)
+
+    def _build_stac_item(
+        self, orbit_cube_idx: str, cube: OmegaCubeFiles, **kwargs
+    ) -> pystac.Item:
         footprint = kwargs.get(
             "footprint", json.loads(to_geojson(box(-180.0, -90.0, 180.0, 90.0)))
         )
@@ -508,43 +1313,20 @@ class OmegaDataReader:
         except OmegaCubeDataMissingError:
             self.log.warning(f"IDL.sav not found for {orbit_cube_idx}. Skipping.")
 
-        # Add created thumbnail as an asset
-        thumbnail_location = (
-            self.thumbnail_folder
-            / f"{orbit_cube_idx}_{self.thumbnail_dims[0]}x{self.thumbnail_dims[1]}.png"
-        )
-
-        # Normally the thumbnail should be generated
-        # but if not, the file is open
-        if not thumbnail_location.exists():
+        # The thumbnails are only made again if their source or rendering changed
+        if not self.thumbnail_is_current(orbit_cube_idx):
             try:
-                thumbnail_strategy = "mean"
                 self.log.debug(
-                    f"{thumbnail_location} doesn't exist. Creating thumbnail based on {thumbnail_strategy} strategy."
+                    f"Thumbnails of {orbit_cube_idx} aren't up to date. Creating them based on {self.thumbnail_strategy} strategy."
                 )
-                nc_data = self.open_file(orbit_cube_idx, "nc", on_disk=False)
 
-                # define thumbnail strategy
                 # By default, takes the reflectance cube
-                self.make_thumbnail(
+                self.make_thumbnails(
                     orbit_cube_idx=orbit_cube_idx,
-                    data=select_rgb_from_xarr(nc_data),
-                    dims=self.thumbnail_dims,
-                    thumbnail_location=thumbnail_location,
+                    data=THUMBNAIL_STRATEGIES[self.thumbnail_strategy](cube.nc),
+                    mode=self.thumbnail_mode,
+                    with_omega_fix=self.thumbnail_omega_fix,
                 )
-
-                # Thumbnail
-                thumbn_asset = pystac.Asset(
-                    href=(
-                        Path("/")
-                        / thumbnail_location.relative_to(self.io_handler.output_folder)
-                    ).as_posix(),
-                    media_type=pystac.MediaType.PNG,
-                    roles=["thumbnail"],
-                    description="PNG thumbnail preview for visualizations",
-                )
-                pystac_item.add_asset("thumbnail", thumbn_asset)
-                self.log.debug(f"Added {thumbn_asset} to item.")
             except OSError as ose:
                 self.log.error(f"[{ose.__class__.__name__}] {ose}")
                 self.log.error(
@@ -556,20 +1338,32 @@ class OmegaDataReader:
             except Exception as e:
                 self.log.error(f"A problem with {orbit_cube_idx} occured")
                 self.log.error(f"[{e.__class__.__name__}] {e}")
-            finally:
-                nc_data.close()
-        else:
-            # Thumbnail
+        elif self.metadata_store.get(self.thumbnail_kind, orbit_cube_idx) is None:
+            # Made before the keys were recorded
+            self.record_thumbnail_key(orbit_cube_idx)
+
+        # Add created thumbnails as assets
+        for dims in self.thumbnail_sizes:
+            thumbnail_location = self.thumbnail_location(orbit_cube_idx, dims=dims)
+            if not thumbnail_location.exists():
+                continue
             thumbn_asset = pystac.Asset(
                 href=(
                     Path("/")
                     / thumbnail_location.relative_to(self.io_handler.output_folder)
                 ).as_posix(),
-                media_type=pystac.MediaType.PNG,
-                roles=["thumbnail"],
-                description="PNG thumbnail preview for visualizations",
+                media_type=THUMBNAIL_MEDIA_TYPES[self.thumbnail_format],
+                roles=["thumbnail"]
+                if max(dims) <= MAX_THUMBNAIL_ROLE_SIZE
+                else ["overview"],
+                description=f"{self.thumbnail_format.upper()} {dims[0]}x{dims[1]} preview for visualizations",
+            )
+            asset_key = (
+                "thumbnail"
+                if dims == self.thumbnail_dims
+                else f"thumbnail_{dims[0]}x{dims[1]}"
             )
-            pystac_item.add_asset("thumbnail", thumbn_asset)
+            pystac_item.add_asset(asset_key, thumbn_asset)
             self.log.debug(f"Added {thumbn_asset} to item.")
 
         # extensions
@@ -577,7 +1371,9 @@ class OmegaDataReader:
 
         # apply cubedata
         self.log.debug("Applying DatacubeExtension")
-        cubedata = self.retrieve_nc_info_from_saved_state(orbit_cube_idx=orbit_cube_idx)
+        cubedata = self.retrieve_nc_info_from_saved_state(
+            orbit_cube_idx=orbit_cube_idx, cube=cube
+        )
         self.log.debug(f"Loading: {cubedata}")
         if cubedata:
             dc_ext = DatacubeExtension.ext(pystac_item, add_if_missing=True)
@@ -606,19 +1402,94 @@ class OmegaDataReader:
 
         return pystac_item
 
+    def thumbnail_location(
+        self, orbit_cube_idx: str, dims: tuple[int, int] | None = None
+    ) -> Path:
+        """Where a thumbnail of the cube's item is saved, the main one by default"""
+        if dims is None:
+            dims = self.thumbnail_dims
+        return (
+            self.thumbnail_folder
+            / f"{orbit_cube_idx}_{dims[0]}x{dims[1]}.{self.thumbnail_format}"
+        )
+
+    def thumbnail_key(self, orbit_cube_idx: str) -> dict[str, Any]:
+        """What the thumbnail of a cube depends on: its NetCDF file, as listed in the
+        inventory, and the way it is rendered.
+
+        Args:
+            orbit_cube_idx (str): OMEGA data ID of the item
+
+        Returns:
+            dict[str, Any]: _description_
+        """
+        try:
+            nc_info = self.find_info_by_orbit_cube(orbit_cube_idx, file_extension="nc")
+            source = {
+                "href": nc_info["href"].item(),
+                "size": int(nc_info["total_size"].item()),
+            }
+        except OmegaCubeDataMissingError:
+            source = None
+        return {
+            "source": source,
+            "strategy": self.thumbnail_strategy,
+            "sizes": [list(dims) for dims in self.thumbnail_sizes],
+            "format": self.thumbnail_format,
+            "mode": self.thumbnail_mode,
+            "with_omega_fix": self.thumbnail_omega_fix,
+        }
+
+    def thumbnail_is_current(self, orbit_cube_idx: str) -> bool:
+        """Whether the thumbnails of a cube exist and were made out of the current
+        source with the current rendering (see `thumbnail_key`).
+
+        Thumbnails made before the keys were recorded are taken as current. Their
+        key is recorded along with their item (see `create_stac_item`), not here:
+        this is also called to plan the downloads and estimate the memory.
+
+        Args:
+            orbit_cube_idx (str): OMEGA data ID of the item
+
+        Returns:
+            bool: _description_
+        """
+        if not all(
+            self.thumbnail_location(orbit_cube_idx, dims=dims).exists()
+            for dims in self.thumbnail_sizes
+        ):
+            return False
+        recorded_key = self.metadata_store.get(self.thumbnail_kind, orbit_cube_idx)
+        return recorded_key is None or recorded_key == self.thumbnail_key(
+            orbit_cube_idx
+        )
+
+    def record_thumbnail_key(self, orbit_cube_idx: str):
+        """Records what the thumbnails of a cube were made from (see
+        `thumbnail_key`)"""
+        self.metadata_store.put(
+            self.thumbnail_kind, orbit_cube_idx, self.thumbnail_key(orbit_cube_idx)
+        )
+
     def find_cubedata_from_ncfile(
-        self, orbit_cube_idx: str, thumbnail_strategy: str = "mean"
+        self, orbit_cube_idx: str, cube: OmegaCubeFiles | None = None
     ) -> dict[str, dict[str, Dimension | Variable]]:
         """From the NetCDF file, extracts the cubedata information needed for the
         generated STAC item.
 
         Args:
             orbit_cube_idx (str): the ID of the orbit cube
+            cube (OmegaCubeFiles | None, optional): The already opened files of the cube.
+            Defaults to None, in which case the NetCDF file is fetched for this call only.
 
         Returns:
             dict[str, dict[str, Dimension | Variable]]: A dict containing
             "dimensions", "variables" and "extras" as main keys
         """
+        if cube is None:
+            with self.open_cube(orbit_cube_idx) as cube:
+                return self.find_cubedata_from_ncfile(orbit_cube_idx, cube=cube)
+
         dimensions = {}
         variables = {}
         extras = {}
@@ -626,10 +1497,8 @@ class OmegaDataReader:
         try:
             self.log.debug(f"Opening the nc file for {orbit_cube_idx}")
 
-            nc_data = cast(
-                xr.Dataset,
-                self.open_file(orbit_cube_idx, file_extension="nc", on_disk=False),
-            )
+            # Only the attributes, coordinates and scalars are needed
+            nc_data = cube.nc_header
 
             # Start with the variables
             for data_var_name in nc_data.data_vars.keys():
@@ -708,16 +1577,6 @@ class OmegaDataReader:
 
             # Add some extras if you want
             extras = self.find_extra_nc_data(nc_data)
-
-            # define thumbnail strategy
-            # By default, takes the reflectance cube
-            self.make_thumbnail(
-                orbit_cube_idx=orbit_cube_idx,
-                data=select_rgb_from_xarr(nc_data),
-                dims=self.thumbnail_dims,
-            )
-
-            nc_data.close()
         except OSError as ose:
             self.log.error(f"[{ose.__class__.__name__}] {ose}")
             self.log.error(
@@ -729,8 +1588,6 @@ class OmegaDataReader:
         except Exception as e:
             self.log.error(f"A problem with {orbit_cube_idx} occured")
             self.log.error(f"[{e.__class__.__name__}] {e}")
-        finally:
-            nc_data.close()
 
         self.log.debug(f"Obtained dimensions {dimensions}")
         self.log.debug(f"Obtained variables {variables}")
@@ -739,36 +1596,66 @@ class OmegaDataReader:
     def find_extra_nc_data(self, nc_data: xr.Dataset) -> dict[str, Any]:
         return {}
 
-    def retrieve_nc_info_from_saved_state(self, orbit_cube_idx: str) -> dict[str, Any]:
-        nc_md_state = self.nc_metadata_folder / f"nc_{orbit_cube_idx}.json"
-        self.log.debug(f"Opening {nc_md_state}")
-        if nc_md_state.exists():
-            with open(nc_md_state, "r", encoding="utf-8") as nc_md:
-                nc_info = json.load(nc_md)
-                nc_info = reformat_nc_info(nc_info)
-                self.log.debug(f"nc_info loaded with {nc_info}")
-            if not nc_info:
-                nc_md_state.unlink()
-                return self.retrieve_nc_info_from_saved_state(
-                    orbit_cube_idx=orbit_cube_idx
-                )
+    def retrieve_from_saved_state(
+        self,
+        kind: str,
+        orbit_cube_idx: str,
+        extract: Callable[[], dict[str, Any]],
+        encoder: type[json.JSONEncoder] | None = None,
+        on_load: Callable[[dict[str, Any]], dict[str, Any]] | None = None,
+    ) -> dict[str, Any]:
+        """Gets metadata of a cube from the store, extracting and saving it first if
+        it isn't there yet.
 
-        else:
-            self.log.debug(
-                f"{nc_md_state} not found. Creating it from # {orbit_cube_idx}"
+        Args:
+            kind (str): The kind of metadata, eg. `sav_metadata_kind`
+            orbit_cube_idx (str): OMEGA data ID of the item
+            extract (Callable[[], dict[str, Any]]): Extracts the metadata from the cube
+            encoder (type[json.JSONEncoder] | None, optional): Serializes what isn't
+            JSON in the extracted metadata. Defaults to None.
+            on_load (Callable[[dict[str, Any]], dict[str, Any]] | None, optional):
+            Applied to the metadata read from the store. Defaults to None.
+
+        Returns:
+            dict[str, Any]: The metadata, empty if it couldn't be extracted
+        """
+        info = self.metadata_store.get(kind, orbit_cube_idx)
+        if info:
+            self.log.debug(f"{kind} info of # {orbit_cube_idx} loaded with {info}")
+            return on_load(info) if on_load is not None else info
+
+        self.log.debug(f"No {kind} info saved. Extracting it from # {orbit_cube_idx}")
+        try:
+            info = extract()
+        except Exception as e:
+            self.log.warning(
+                f"Couldn't extract {kind} information for # {orbit_cube_idx} because of the following: {e}"
             )
+            return {}
+
+        # An empty result is extracted again next time
+        if info:
             try:
-                nc_info = self.find_cubedata_from_ncfile(orbit_cube_idx=orbit_cube_idx)
-                with open(nc_md_state, "w", encoding="utf-8") as nc_md:
-                    json.dump(nc_info, nc_md, cls=SpecialObjectEncoder)
-                self.log.debug(f"{nc_md_state} with {nc_info} created!")
-            except Exception as e:
+                self.metadata_store.put(kind, orbit_cube_idx, info, encoder=encoder)
+                self.log.debug(f"{kind} info of # {orbit_cube_idx} saved with {info}")
+            except (sqlite3.Error, TypeError, ValueError) as e:
                 self.log.warning(
-                    f"Couldn't save .nc information for # {orbit_cube_idx} because of the following: {e}"
+                    f"Couldn't save {kind} information for # {orbit_cube_idx} because of the following: {e}"
                 )
-                nc_info = {}
+        return info
 
-        return nc_info
+    def retrieve_nc_info_from_saved_state(
+        self, orbit_cube_idx: str, cube: OmegaCubeFiles | None = None
+    ) -> dict[str, Any]:
+        return self.retrieve_from_saved_state(
+            self.nc_metadata_kind,
+            orbit_cube_idx,
+            lambda: self.find_cubedata_from_ncfile(
+                orbit_cube_idx=orbit_cube_idx, cube=cube
+            ),
+            encoder=SpecialObjectEncoder,
+            on_load=reformat_nc_info,
+        )
 
     def make_thumbnail(
         self,
@@ -809,4 +1696,44 @@ class OmegaDataReader:
             )
 
         self.log.debug(f"""Saving as {thumbnail_location.resolve()}""")
-        thumbnail.save(thumbnail_location)
+        save_image(thumbnail, thumbnail_location, fmt=fmt)
+
+    def make_thumbnails(
+        self,
+        orbit_cube_idx: str,
+        data: np.ndarray,
+        mode: Literal["L", "RGB", "RGBA"] = "RGBA",
+        cmap: str | None = None,
+        with_omega_fix: bool = True,
+    ):
+        """Creates the thumbnails of all the sizes of a datacube at once, out of one
+        of its 2D data arrays, and records their key (see `thumbnail_key`).
+
+        The array is normalized once, each size being resized from the larger one,
+        and the images are encoded in parallel threads.
+
+        Args:
+            orbit_cube_idx (str): _description_
+            data (np.ndarray): _description_
+            mode (Literal["L", "RGB", "RGBA"], optional): _description_. Defaults to "RGBA".
+            cmap (str | None, optional): _description_. Defaults to None.
+            with_omega_fix (bool, optional): _description_. Defaults to True.
+        """
+        self.log.debug(
+            f"Converting cube {orbit_cube_idx} to thumbnails of {self.thumbnail_sizes}."
+        )
+        thumbnails = convert_arr_to_thumbnails(
+            data=data,
+            sizes=self.thumbnail_sizes,
+            mode=mode,
+            cmap=cmap,
+            with_omega_fix=with_omega_fix,
+        )
+        save_images(
+            {
+                self.thumbnail_location(orbit_cube_idx, dims=dims): thumbnail
+                for dims, thumbnail in thumbnails.items()
+            },
+            fmt=self.thumbnail_format,
+        )
+        self.record_thumbnail_key(orbit_cube_idx)
@@ -1,23 +1,132 @@
 import json
 import logging
-from typing import Any, cast
+from typing import Any, Iterable, Literal, cast
 
+import numpy as np
 import pystac
-import xarray as xr
-from shapely import MultiPolygon, Polygon, bounds, remove_repeated_points, to_geojson
+from shapely import (
+    MultiPolygon,
+    Polygon,
+    bounds,
+    remove_repeated_points,
+    simplify,
+    to_geojson,
+)
 from skimage import measure
 
 from psup_stac_converter.extensions import apply_eo
 from psup_stac_converter.informations.instruments import omega_bands
 from psup_stac_converter.informations.publications import omega_c_channel
-from psup_stac_converter.omega._base import OmegaDataReader, OmegaDataTextItem
+from psup_stac_converter.omega._base import (
+    OmegaCubeFiles,
+    OmegaDataReader,
+    OmegaDataTextItem,
+    find_valid_pixels,
+)
 from psup_stac_converter.utils.io import PsupIoHandler
+from psup_stac_converter.utils.item_writer import (
+    ItemStub,
+    StreamingItemWriter,
+    spatial_extent_of,
+    temporal_extent_of,
+)
+from psup_stac_converter.utils.prefetch import PrefetchJob
+
+
+def downsample_mask(mask: np.ndarray, factor: int) -> np.ndarray:
+    """Reduces a mask by blocks of `factor` x `factor` pixels, a block being valid if
+    any of its pixels is.
+
+    Args:
+        mask (np.ndarray): 2D mask
+        factor (int): _description_
+
+    Returns:
+        np.ndarray: _description_
+    """
+    if factor <= 1:
+        return mask
+    n_rows = -(-mask.shape[0] // factor)
+    n_cols = -(-mask.shape[1] // factor)
+    padded = np.zeros((n_rows * factor, n_cols * factor), dtype=bool)
+    padded[: mask.shape[0], : mask.shape[1]] = mask
+    return padded.reshape(n_rows, factor, n_cols, factor).any(axis=(1, 3))
+
+
+def contour_footprint(
+    mask: np.ndarray,
+    longitudes: np.ndarray,
+    latitudes: np.ndarray,
+    downsampling: int = 1,
+    tolerance: float = 0.0,
+) -> Polygon | MultiPolygon:
+    """Outlines the valid pixels of a map, its rows being the latitudes and its
+    columns the longitudes. The vertices of all the contours are mapped to their
+    coordinates at once.
+
+    Args:
+        mask (np.ndarray): Valid pixels of the map
+        longitudes (np.ndarray): Longitude of each column
+        latitudes (np.ndarray): Latitude of each row
+        downsampling (int, optional): Outlines the mask reduced by blocks of
+        `downsampling` pixels, giving fewer vertices. Defaults to 1.
+        tolerance (float, optional): Simplifies the outline, preserving its
+        topology, within this distance in degrees. Disabled if 0. Defaults to 0.0.
+
+    Returns:
+        Polygon | MultiPolygon: _description_
+    """
+    contours = measure.find_contours(downsample_mask(mask, downsampling))
+    if not contours:
+        return MultiPolygon()
+
+    vertices = np.concatenate(contours)
+    if downsampling > 1:
+        # Centers of the blocks, in the pixels of the map
+        vertices = vertices * downsampling + (downsampling - 1) / 2
+    rows = np.clip(np.rint(vertices[:, 0]).astype(np.intp), 0, len(latitudes) - 1)
+    cols = np.clip(np.rint(vertices[:, 1]).astype(np.intp), 0, len(longitudes) - 1)
+    coords = np.column_stack((longitudes[cols], latitudes[rows]))
+
+    contour_ends = np.cumsum([len(contour) for contour in contours])[:-1]
+    polygons = [
+        remove_repeated_points(Polygon(contour_coords))
+        for contour_coords in np.split(coords, contour_ends)
+    ]
+    footprint = polygons[0] if len(polygons) == 1 else MultiPolygon(polygons)
+
+    if tolerance > 0:
+        footprint = simplify(footprint, tolerance, preserve_topology=True)
+    return footprint
 
 
 class OmegaCChannelProj(OmegaDataReader):
     def __init__(
-        self, psup_io_handler: PsupIoHandler, log: logging.Logger | None = None
+        self,
+        psup_io_handler: PsupIoHandler,
+        log: logging.Logger | None = None,
+        contour_downsampling: int = 1,
+        contour_tolerance: float = 0.0,
+        thumbnail_sizes: Iterable[int] = (256,),
+        thumbnail_format: Literal["png", "webp"] = "png",
     ):
+        """
+        Args:
+            psup_io_handler (PsupIoHandler): _description_
+            log (logging.Logger | None, optional): _description_. Defaults to None.
+            contour_downsampling (int, optional): Factor by which the valid pixels
+            are reduced before outlining the footprint of a cube. Defaults to 1.
+            contour_tolerance (float, optional): Tolerance in degrees of the
+            simplification of the footprints. Disabled if 0. Defaults to 0.0.
+            thumbnail_sizes (Iterable[int], optional): Sizes of the square thumbnails,
+            the first one being the main thumbnail. Defaults to (256,).
+            thumbnail_format (Literal["png", "webp"], optional): _description_.
+            Defaults to "png".
+        """
+        if contour_downsampling < 1:
+            raise ValueError("contour_downsampling must be at least 1")
+        self.contour_downsampling = contour_downsampling
+        self.contour_tolerance = contour_tolerance
         super().__init__(
             psup_io_handler,
             data_type="c_channel_slice",
@@ -32,55 +141,72 @@ They contain all the OMEGA observations acquired with the C channel after filter
 Both files contain the cubes of reflectance of the surface at a given longitude, latitude and wavelength λ. The reflectance is defined by the “reflectance factor” $\frac{I(\\lambda)}{F \\cos(i)}$ where i is the solar incidence angle with $\\lambda$ from 0.97 to 2.55 µm (second dimension of the cube with 120 wavelengths). The spectra are corrected for atmospheric and aerosol contributions according to the method described in Vincendon et al. (Icarus, 251, 2015). It therefore corresponds to albedo for a lambertian surface. The first dimension of the cube refers to the length of scan. It can be 32, 64, or 128 pixels. It gives the first spatial dimension. The third dimension refers to the rank of the scan. It is the second spatial dimension.""",
             publications=omega_c_channel,
             log=log,
+            thumbnail_sizes=thumbnail_sizes,
+            thumbnail_format=thumbnail_format,
         )
 
-    def create_collection(self, n_limit: int | None = None) -> pystac.Collection:
-        collection = super().create_collection(n_limit=n_limit)
+    def create_collection(
+        self,
+        n_limit: int | None = None,
+        n_jobs: int = 1,
+        resume: bool = False,
+        item_writer: StreamingItemWriter | None = None,
+        prefetch_depth: int = 0,
+        prefetch_max_bytes: int | None = None,
+        pipeline: bool = False,
+        fetch_jobs: int = 4,
+    ) -> pystac.Collection:
+        collection = super().create_collection(
+            n_limit=n_limit,
+            n_jobs=n_jobs,
+            resume=resume,
+            item_writer=item_writer,
+            prefetch_depth=prefetch_depth,
+            prefetch_max_bytes=prefetch_max_bytes,
+            pipeline=pipeline,
+            fetch_jobs=fetch_jobs,
+        )
 
         # Only the C band is needed
         collection = cast(
             pystac.Collection, apply_eo(collection, bands=[omega_bands[1]])
         )
 
-        item_date_range = [
-            item.datetime
-            for item in collection.get_items()
-            if item.datetime is not None
-        ]
-
-        item_spatial_range = [
-            item.bbox for item in collection.get_items() if item.bbox is not None
-        ]
-        coll_min_x = min([itembox[0] for itembox in item_spatial_range])
-        coll_min_y = min([itembox[1] for itembox in item_spatial_range])
-        coll_max_x = max([itembox[2] for itembox in item_spatial_range])
-        coll_max_y = max([itembox[3] for itembox in item_spatial_range])
-
-        collection.extent.temporal = pystac.TemporalExtent(
-            intervals=[min(item_date_range), max(item_date_range)]
-        )
+        return collection
 
-        collection.extent.spatial = pystac.SpatialExtent(
-            bboxes=[[coll_min_x, coll_min_y, coll_max_x, coll_max_y]]
-        )
+    def update_extent(self, collection: pystac.Collection, item_stubs: list[ItemStub]):
+        collection.extent.temporal = temporal_extent_of(item_stubs)
+        collection.extent.spatial = spatial_extent_of(item_stubs)
 
-        return collection
+    def prefetch_jobs(self, orbit_cube_idx: str) -> list[PrefetchJob]:
+        # The NetCDF file gives the footprint, and the text file is kept on the disk
+        jobs = [
+            self._prefetch_job(orbit_cube_idx, "nc"),
+            self._prefetch_job(orbit_cube_idx, "txt", on_disk=True),
+        ]
+        if not self.metadata_store.get(self.sav_metadata_kind, orbit_cube_idx):
+            jobs.append(self._prefetch_job(orbit_cube_idx, "sav"))
+        return [job for job in jobs if job is not None]
 
     def extract_sav_metadata(self, orbit_cube_idx: str, **kwargs) -> dict[str, Any]:
         """
         Note
             when extracting information, always make sure it's JSON serializable.
         """
+        cube: OmegaCubeFiles | None = kwargs.get("cube")
+        if cube is None:
+            with self.open_cube(orbit_cube_idx) as cube:
+                return self.extract_sav_metadata(
+                    orbit_cube_idx, **{**kwargs, "cube": cube}
+                )
+
         try:
             sav_info = {}
             self.log.debug(f"Opening the sav file for {orbit_cube_idx}")
 
             # .sav files range from several GB to some KB
             # It is generally not recommended to keep them on local disk
-            sav_data: dict[str, Any] = cast(
-                dict[str, Any],
-                self.open_file(orbit_cube_idx, file_extension="sav", on_disk=False),
-            )
+            sav_data: dict[str, Any] = cube.read_sav(["longi"])
             sav_info["dims"] = sav_data["longi"].shape
             self.log.debug(f"Obtained sav_info={sav_info}")
 
@@ -100,48 +226,31 @@ Both files contain the cubes of reflectance of the surface at a given longitude,
     def retrieve_sav_info_from_saved_state(
         self, orbit_cube_idx: str, **kwargs
     ) -> dict[str, Any]:
-        sav_md_state = self.sav_metadata_folder / f"sav_{orbit_cube_idx}.json"
-        if sav_md_state.exists():
-            self.log.debug(f"{sav_md_state} found! Opening...")
-            with open(
-                sav_md_state,
-                "r",
-                encoding="utf-8",
-            ) as sav_md:
-                sav_info = json.load(sav_md)
-                self.log.debug(f"sav_info loaded with {sav_info}")
-            if not sav_info:
-                self.log.warning(
-                    f"Cube {orbit_cube_idx} happens to not have info. Redownloading..."
-                )
-                sav_md_state.unlink()
-                return self.retrieve_sav_info_from_saved_state(orbit_cube_idx, **kwargs)
-        else:
-            self.log.debug(
-                f"{sav_md_state} Not found. Creating from # {orbit_cube_idx}"
-            )
-            try:
-                sav_info = self.extract_sav_metadata(orbit_cube_idx, **kwargs)
-                with open(sav_md_state, "w", encoding="utf-8") as sav_md:
-                    json.dump(sav_info, sav_md)
-                    self.log.debug(f"{sav_md_state} with {sav_info} created!")
-            except Exception as e:
-                self.log.warning(
-                    f"Couldn't save .sav information for # {orbit_cube_idx} because of the following: {e}"
-                )
-                sav_info = {}
-        return sav_info
+        return self.retrieve_from_saved_state(
+            self.sav_metadata_kind,
+            orbit_cube_idx,
+            lambda: self.extract_sav_metadata(orbit_cube_idx, **kwargs),
+        )
 
     def create_stac_item(self, orbit_cube_idx: str) -> pystac.Item:
+        with self.open_cube(orbit_cube_idx) as cube:
+            return self._create_c_channel_item(orbit_cube_idx, cube)
+
+    def _create_c_channel_item(
+        self, orbit_cube_idx: str, cube: OmegaCubeFiles
+    ) -> pystac.Item:
         text_data = cast(
             OmegaDataTextItem, self.open_file(orbit_cube_idx, "txt", on_disk=True)
         )
 
-        footprint = json.loads(to_geojson(self.get_contour_data(orbit_cube_idx)))
+        footprint = json.loads(
+            to_geojson(self.get_contour_data(orbit_cube_idx, cube=cube))
+        )
         bbox = bounds(text_data.bbox).tolist()
 
         pystac_item = super().create_stac_item(
             orbit_cube_idx,
+            cube=cube,
             timestamp=text_data.start_time,
             start_datetime=text_data.start_time,
             end_datetime=text_data.stop_time,
@@ -157,7 +266,9 @@ Both files contain the cubes of reflectance of the surface at a given longitude,
         )
 
         sav_info = self.retrieve_sav_info_from_saved_state(
-            orbit_cube_idx, sav_size=pystac_item.assets["sav"].extra_fields["size"]
+            orbit_cube_idx,
+            sav_size=pystac_item.assets["sav"].extra_fields["size"],
+            cube=cube,
         )
 
         pystac_item.assets["sav"].extra_fields["map_dimensions"] = sav_info.get("dims")
@@ -165,44 +276,29 @@ Both files contain the cubes of reflectance of the surface at a given longitude,
 
         return pystac_item
 
-    def get_contour_data(self, orbit_cube_idx: str) -> Polygon | MultiPolygon:
+    def get_contour_data(
+        self, orbit_cube_idx: str, cube: OmegaCubeFiles | None = None
+    ) -> Polygon | MultiPolygon:
         """Returns contour of a OMEGA L3 image
 
         Args:
             orbit_cube_idx (str): _description_
+            cube (OmegaCubeFiles | None, optional): The already opened files of the cube.
+            Defaults to None, in which case the NetCDF file is fetched for this call only.
 
         Returns:
             Polygon | MultiPolygon: _description_
         """
-        nc_data = cast(
-            xr.Dataset,
-            self.open_file(
-                orbit_cube_idx=orbit_cube_idx, file_extension="nc", on_disk=False
-            ),
-        )
-
-        img_contours = measure.find_contours(
-            nc_data.Reflectance.notnull().mean(axis=0).values > 0
+        if cube is None:
+            with self.open_cube(orbit_cube_idx) as cube:
+                return self.get_contour_data(orbit_cube_idx, cube=cube)
+
+        nc_data = cube.nc
+
+        return contour_footprint(
+            find_valid_pixels(nc_data.Reflectance),
+            nc_data.longitude.values,
+            nc_data.latitude.values,
+            downsampling=self.contour_downsampling,
+            tolerance=self.contour_tolerance,
         )
-
-        polygons = [
-            remove_repeated_points(
-                Polygon(
-                    [
-                        (
-                            nc_data.longitude[round(_x)].item(),
-                            nc_data.latitude[round(_y)].item(),
-                        )
-                        for _x, _y in zip(_contour[:, 1], _contour[:, 0])
-                    ]
-                )
-            )
-            for _contour in img_contours
-        ]
-
-        nc_data.close()
-
-        if len(polygons) == 1:
-            return polygons[0]
-
-        return MultiPolygon(polygons)
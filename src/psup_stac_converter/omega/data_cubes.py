@@ -2,7 +2,7 @@ import datetime as dt
 import json
 import logging
 import re
-from typing import Any, cast
+from typing import Any, Iterable, Literal, cast
 
 import numpy as np
 import pystac
@@ -12,14 +12,49 @@ from shapely import bounds, box, to_geojson
 from psup_stac_converter.extensions import apply_eo
 from psup_stac_converter.informations.instruments import omega_bands
 from psup_stac_converter.informations.publications import omega_data_cubes
-from psup_stac_converter.omega._base import OmegaDataReader
+from psup_stac_converter.omega._base import OmegaCubeFiles, OmegaDataReader
 from psup_stac_converter.utils.io import PsupIoHandler
+from psup_stac_converter.utils.item_writer import (
+    ItemStub,
+    StreamingItemWriter,
+    spatial_extent_of,
+)
+
+# Variables of the .sav files read by `extract_sav_info`, leaving the reflectance
+# cube out
+SAV_INFO_VARIABLES = [
+    "lat",
+    "lon",
+    "wvl",
+    "solarlong",
+    "data_quality",
+    "pointing_mode",
+    "year",
+    "pres",
+    "tag_ok",
+    "tag_l",
+    "tag_c",
+    "heure",
+]
 
 
 class OmegaDataCubes(OmegaDataReader):
     def __init__(
-        self, psup_io_handler: PsupIoHandler, log: logging.Logger | None = None
+        self,
+        psup_io_handler: PsupIoHandler,
+        log: logging.Logger | None = None,
+        thumbnail_sizes: Iterable[int] = (256,),
+        thumbnail_format: Literal["png", "webp"] = "png",
     ):
+        """
+        Args:
+            psup_io_handler (PsupIoHandler): _description_
+            log (logging.Logger | None, optional): _description_. Defaults to None.
+            thumbnail_sizes (Iterable[int], optional): Sizes of the square thumbnails,
+            the first one being the main thumbnail. Defaults to (256,).
+            thumbnail_format (Literal["png", "webp"], optional): _description_.
+            Defaults to "png".
+        """
         super().__init__(
             psup_io_handler,
             data_type="data_cubes_slice",
@@ -41,9 +76,21 @@ Please note that longitudes range from -180 to 180 degrees east.
 """,
             publications=omega_data_cubes,
             log=log,
+            thumbnail_sizes=thumbnail_sizes,
+            thumbnail_format=thumbnail_format,
         )
 
-    def create_collection(self, n_limit: int | None = None) -> pystac.Collection:
+    def create_collection(
+        self,
+        n_limit: int | None = None,
+        n_jobs: int = 1,
+        resume: bool = False,
+        item_writer: StreamingItemWriter | None = None,
+        prefetch_depth: int = 0,
+        prefetch_max_bytes: int | None = None,
+        pipeline: bool = False,
+        fetch_jobs: int = 4,
+    ) -> pystac.Collection:
         """Creates a collection based on the OMEGA datacubes' dataset
 
         This dataset contains all the OMEGA observations acquired with the C, L and VIS channels until April 2016, 11, after filtering. Filtering processes have been implemented to remove some instrumental artefacts and observational conditions. Each OMEGA record is available as a netCDF4.nc file and an idl.sav
@@ -60,19 +107,15 @@ Please note that longitudes range from -180 to 180 degrees east.
         Returns:
             pystac.Collection: OMEGA Data Cubes' collection
         """
-        collection = super().create_collection(n_limit=n_limit)
-
-        # Change spatial extent since temporal extent is
-        item_spatial_range = [
-            item.bbox for item in collection.get_items() if item.bbox is not None
-        ]
-        coll_min_x = min([itembox[0] for itembox in item_spatial_range])
-        coll_min_y = min([itembox[1] for itembox in item_spatial_range])
-        coll_max_x = max([itembox[2] for itembox in item_spatial_range])
-        coll_max_y = max([itembox[3] for itembox in item_spatial_range])
-
-        collection.extent.spatial = pystac.SpatialExtent(
-            bboxes=[[coll_min_x, coll_min_y, coll_max_x, coll_max_y]]
+        collection = super().create_collection(
+            n_limit=n_limit,
+            n_jobs=n_jobs,
+            resume=resume,
+            item_writer=item_writer,
+            prefetch_depth=prefetch_depth,
+            prefetch_max_bytes=prefetch_max_bytes,
+            pipeline=pipeline,
+            fetch_jobs=fetch_jobs,
         )
 
         # Only the C band is needed
@@ -80,7 +123,13 @@ Please note that longitudes range from -180 to 180 degrees east.
 
         return collection
 
-    def extract_sav_info(self, orbit_cube_idx: str) -> dict[str, Any]:
+    def update_extent(self, collection: pystac.Collection, item_stubs: list[ItemStub]):
+        # Only the spatial extent, the temporal extent is left as is
+        collection.extent.spatial = spatial_extent_of(item_stubs)
+
+    def extract_sav_info(
+        self, orbit_cube_idx: str, cube: OmegaCubeFiles | None = None
+    ) -> dict[str, Any]:
         """Extracts information from the IDL.sav file.
 
         This method is considered as the main method for information extraction. If the .sav file
@@ -98,10 +147,16 @@ Please note that longitudes range from -180 to 180 degrees east.
 
         Args:
             orbit_cube_idx (str): The ID of the .sav item
+            cube (OmegaCubeFiles | None, optional): The already opened files of the cube.
+            Defaults to None, in which case the .sav file is fetched for this call only.
 
         Returns:
             dict[str, Any]: Useful information from the .sav file
         """
+        if cube is None:
+            with self.open_cube(orbit_cube_idx) as cube:
+                return self.extract_sav_info(orbit_cube_idx, cube=cube)
+
         try:
             orbit_number, cube_number = orbit_cube_idx.split("_")
             sav_info = {"orbit_number": orbit_number, "cube_number": int(cube_number)}
@@ -109,10 +164,7 @@ Please note that longitudes range from -180 to 180 degrees east.
 
             # .sav files range from several GB to some KB
             # It is generally not recommended to keep them on local disk
-            sav_data = cast(
-                dict[str, Any],
-                self.open_file(orbit_cube_idx, file_extension="sav", on_disk=False),
-            )
+            sav_data = cube.read_sav(SAV_INFO_VARIABLES)
             cube_dims = sav_data["lat"].shape
             em_wl_range = sav_data["wvl"].size
 
@@ -190,44 +242,27 @@ Please note that longitudes range from -180 to 180 degrees east.
     def retrieve_sav_info_from_saved_state(
         self, orbit_cube_idx: str, **kwargs
     ) -> dict[str, Any]:
-        sav_md_state = self.sav_metadata_folder / f"sav_{orbit_cube_idx}.json"
-        self.log.debug(f"Opening {sav_md_state}")
-        if sav_md_state.exists():
-            with open(sav_md_state, "r", encoding="utf-8") as sav_md:
-                sav_info = json.load(sav_md)
-                self.log.debug(f"sav_info loaded with {sav_info}")
-            if not sav_info:
-                self.log.warning(
-                    f"Cube {orbit_cube_idx} happens to not have info. Redownloading..."
-                )
-                sav_md_state.unlink()
-                return self.retrieve_sav_info_from_saved_state(orbit_cube_idx, **kwargs)
-        else:
-            self.log.debug(
-                f"{sav_md_state} not found. Creating it from # {orbit_cube_idx}"
-            )
-            try:
-                sav_info = self.extract_sav_info(orbit_cube_idx)
-                with open(sav_md_state, "w", encoding="utf-8") as sav_md:
-                    json.dump(sav_info, sav_md)
-                    self.log.debug(f"{sav_md_state} with {sav_info} created!")
-            except Exception as e:
-                self.log.warning(
-                    f"Couldn't save .sav information for # {orbit_cube_idx} because of the following: {e}"
-                )
-                sav_info = {}
-        return sav_info
+        return self.retrieve_from_saved_state(
+            self.sav_metadata_kind,
+            orbit_cube_idx,
+            lambda: self.extract_sav_info(orbit_cube_idx, cube=kwargs.get("cube")),
+        )
 
     def create_stac_item(self, orbit_cube_idx: str) -> pystac.Item:
-        # TODO: regroup that in a single function
+        with self.open_cube(orbit_cube_idx) as cube:
+            return self._create_data_cube_item(orbit_cube_idx, cube)
 
-        sav_info = self.retrieve_sav_info_from_saved_state(orbit_cube_idx)
+    def _create_data_cube_item(
+        self, orbit_cube_idx: str, cube: OmegaCubeFiles
+    ) -> pystac.Item:
+        sav_info = self.retrieve_sav_info_from_saved_state(orbit_cube_idx, cube=cube)
 
         # This one is given by the data description
         default_end_datetime = dt.datetime(2016, 4, 11, 0, 0)
 
         pystac_item = super().create_stac_item(
             orbit_cube_idx,
+            cube=cube,
             timestamp=default_end_datetime,
             footprint=sav_info["footprint"],
             bbox=sav_info["bbox"],
@@ -1,14 +1,17 @@
+import datetime as dt
+import json
 import logging
 import os
+import shutil
 import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import cast
+from typing import Any, Iterator, Literal, cast
 
 import numpy as np
 import pandas as pd
 import psutil
 import pystac
-import pystac.errors
 from httpx import ReadTimeout
 from shapely import bounds
 
@@ -21,15 +24,58 @@ from psup_stac_converter.exceptions import (
 from psup_stac_converter.extensions import apply_proj, apply_sci, apply_ssys
 from psup_stac_converter.informations.data_providers import providers
 from psup_stac_converter.informations.geojson_features import geojson_features
+from psup_stac_converter.omega._base import OmegaDataReader
 from psup_stac_converter.omega.c_channel_proj import OmegaCChannelProj
 from psup_stac_converter.omega.data_cubes import OmegaDataCubes
 from psup_stac_converter.omega.mineral_maps import omega_maps_collection_generator
 from psup_stac_converter.processors.selection import ProcessorName, select_processor
 from psup_stac_converter.settings import Settings, create_logger
+from psup_stac_converter.utils.cache import ResourceCache
+from psup_stac_converter.utils.catalog_io import (
+    CatalogStacIO,
+    save_catalog,
+    write_if_changed,
+)
+from psup_stac_converter.utils.inventory import (
+    InventoryDiff,
+    diff_inventories,
+    load_inventory_snapshot,
+    save_inventory_snapshot,
+)
 from psup_stac_converter.utils.io import IoHandler, PsupIoHandler, WktIoHandler
+from psup_stac_converter.utils.item_writer import ItemChanges, StreamingItemWriter
+from psup_stac_converter.utils.validation import validate_catalog
 
 process = psutil.Process(os.getpid())
 
+COLLECTION_IDS = [
+    "features_datasets",
+    "omega_mineral_maps",
+    "omega_data_cubes",
+    "omega_c_channel_proj",
+]
+# Collections made of one item by OMEGA cube, by the root of the files of the cubes
+OMEGA_ITEM_COLLECTIONS = {
+    "cubes_L2": "omega_data_cubes",
+    "cubes_L3": "omega_c_channel_proj",
+}
+# Kept next to catalog.json: the inventory of the last build, compared with the
+# current one by `CatalogCreator.update_catalog`, and what the last run changed
+BUILD_INVENTORY_FILE = ".psup_refs.last_build.csv"
+CHANGE_MANIFEST_FILE = "changes.json"
+
+
+def omega_item_of_file(rel_path: str) -> tuple[str, str] | None:
+    """The OMEGA collection and cube ID a file of the inventory belongs to, eg.
+    `("omega_c_channel_proj", "ORB0001_1")` for `omega/cubes_L3/ORB0001_1.nc`.
+    None if it isn't the file of a cube."""
+    path_parts = rel_path.split("/")
+    if len(path_parts) > 2 and "omega" in path_parts[0]:
+        collection_id = OMEGA_ITEM_COLLECTIONS.get(path_parts[1])
+        if collection_id is not None:
+            return collection_id, Path(rel_path).stem
+    return None
+
 
 class BaseProcessor:
     def __init__(
@@ -83,6 +129,25 @@ class CatalogCreator(BaseProcessor):
         wkt_file: Path | None = None,
         log: logging.Logger | None = None,
         n_omega_files: int | None = None,
+        n_jobs: int = 1,
+        cache_folder: Path | None = None,
+        cache_max_size: int | None = None,
+        http_options: dict[str, Any] | None = None,
+        resume: bool = False,
+        stream_items: bool = False,
+        prefetch_depth: int = 0,
+        prefetch_max_size: int | None = None,
+        pipeline: bool = False,
+        fetch_jobs: int = 4,
+        contour_downsampling: int = 1,
+        contour_tolerance: float = 0.0,
+        thumbnail_sizes: list[int] | None = None,
+        thumbnail_format: Literal["png", "webp"] = "png",
+        schema_cache_folder: Path | None = None,
+        download_schemas: bool = False,
+        stac_json_format: Literal["indented", "compact"] = "indented",
+        stac_gzip: bool = False,
+        write_threads: int = 8,
     ):
         super().__init__(raw_data_folder, output_folder, log=log)
         if psup_data_inventory_file is None:
@@ -97,8 +162,18 @@ class CatalogCreator(BaseProcessor):
         if not psup_data_inventory_file.suffix.endswith("csv"):
             raise FileExtensionError(["csv"], psup_data_inventory_file.suffix)
 
+        if cache_max_size:
+            resource_cache = ResourceCache(
+                cache_folder or Settings().cache_path, cache_max_size, log=self.log
+            )
+        else:
+            resource_cache = None
+
         self.psup_archive = PsupIoHandler(
-            psup_data_inventory_file, output_folder=raw_data_folder
+            psup_data_inventory_file,
+            output_folder=raw_data_folder,
+            cache=resource_cache,
+            http_options=http_options,
         )
 
         if wkt_file is not None:
@@ -107,10 +182,34 @@ class CatalogCreator(BaseProcessor):
             self.wkt_io = None
 
         self.n_omega_files = n_omega_files
+        self.n_jobs = n_jobs
+        self.resume = resume
+        self.stream_items = stream_items
+        self.prefetch_depth = prefetch_depth
+        self.prefetch_max_size = prefetch_max_size
+        self.pipeline = pipeline
+        self.fetch_jobs = fetch_jobs
+        self.contour_downsampling = contour_downsampling
+        self.contour_tolerance = contour_tolerance
+        self.thumbnail_sizes = thumbnail_sizes or [256]
+        self.thumbnail_format = thumbnail_format
+        self.schema_cache_folder = schema_cache_folder
+        self.download_schemas = download_schemas
+        self.stac_io = CatalogStacIO(
+            json_format=stac_json_format, gzip_copies=stac_gzip
+        )
+        self.write_threads = write_threads
         self.log.debug(self.psup_archive)
 
+    def close(self):
+        """Releases the resources held for the run, like the connections to PSUP"""
+        self.psup_archive.close()
+
     def _add_collections_to_catalog(
-        self, catalog: pystac.Catalog, collections_to_add: list[str] | None = None
+        self,
+        catalog: pystac.Catalog,
+        collections_to_add: list[str] | None = None,
+        item_writer: StreamingItemWriter | None = None,
     ) -> pystac.Catalog:
         """Add PSUP collections to the catalog, all on a unique thread.
 
@@ -122,19 +221,16 @@ class CatalogCreator(BaseProcessor):
                     - "omega_mineral_maps"
                     - "omega_data_cubes"
                     - "omega_c_channel_proj"
+            item_writer (StreamingItemWriter | None, optional): Writes the OMEGA items
+            as soon as they are created. Defaults to None.
 
         Returns:
             pystac.Catalog: _description_
         """
         if collections_to_add is None:
-            collections_to_add = [
-                "features_datasets",
-                "omega_mineral_maps",
-                "omega_data_cubes",
-                "omega_c_channel_proj",
-            ]
+            collections_to_add = COLLECTION_IDS
 
-        try:
+        with self._collection_errors():
             # Feature collection
             if "features_datasets" in collections_to_add:
                 feature_collection = self.create_feature_collection()
@@ -179,14 +275,22 @@ class CatalogCreator(BaseProcessor):
             # OMEGA data cubes
             if "omega_data_cubes" in collections_to_add:
                 self.log.info("Creating OMEGA Data cubes collection")
-                omega_data_cubes_builder = OmegaDataCubes(
-                    self.psup_archive, log=self.log
-                )
-                omega_data_cubes_collection = (
-                    omega_data_cubes_builder.create_collection(
-                        n_limit=self.n_omega_files
+                omega_data_cubes_builder = self._omega_reader("omega_data_cubes")
+                try:
+                    omega_data_cubes_collection = (
+                        omega_data_cubes_builder.create_collection(
+                            n_limit=self.n_omega_files,
+                            n_jobs=self.n_jobs,
+                            resume=self.resume,
+                            item_writer=item_writer,
+                            prefetch_depth=self.prefetch_depth,
+                            prefetch_max_bytes=self.prefetch_max_size,
+                            pipeline=self.pipeline,
+                            fetch_jobs=self.fetch_jobs,
+                        )
                     )
-                )
+                finally:
+                    omega_data_cubes_builder.close()
 
                 if self.wkt_io is not None:
                     omega_data_cubes_collection = apply_proj(
@@ -210,12 +314,22 @@ class CatalogCreator(BaseProcessor):
                 # OMEGA C channel proj
                 self.log.info("Creating OMEGA C Channel Proj collection")
                 self.log.debug(self.psup_archive)
-                omega_c_channel_builder = OmegaCChannelProj(
-                    self.psup_archive, log=self.log
-                )
-                omega_c_channel_collection = omega_c_channel_builder.create_collection(
-                    n_limit=self.n_omega_files
-                )
+                omega_c_channel_builder = self._omega_reader("omega_c_channel_proj")
+                try:
+                    omega_c_channel_collection = (
+                        omega_c_channel_builder.create_collection(
+                            n_limit=self.n_omega_files,
+                            n_jobs=self.n_jobs,
+                            resume=self.resume,
+                            item_writer=item_writer,
+                            prefetch_depth=self.prefetch_depth,
+                            prefetch_max_bytes=self.prefetch_max_size,
+                            pipeline=self.pipeline,
+                            fetch_jobs=self.fetch_jobs,
+                        )
+                    )
+                finally:
+                    omega_c_channel_builder.close()
                 if self.wkt_io is not None:
                     omega_c_channel_collection = apply_proj(
                         omega_c_channel_collection,
@@ -233,6 +347,15 @@ class CatalogCreator(BaseProcessor):
             else:
                 self.log.info("Skipping OMEGA L3 cubes")
 
+        return catalog
+
+    @contextmanager
+    def _collection_errors(self) -> Iterator[None]:
+        """Logs the errors stopping the generation of the collections, the catalog
+        being saved as it is. `build_complete` tells whether one occurred."""
+        self.build_complete = False
+        try:
+            yield
         except KeyboardInterrupt:
             self.log.warning(
                 "Stopped collection generation. Use the same command (ie. Ctrl+C) to shut down the process."
@@ -252,12 +375,35 @@ class CatalogCreator(BaseProcessor):
         except Exception as e:
             self.log.error("There was a problem during collection generation!")
             self.log.error(f"[{e.__class__.__name__}] {e}")
-
-        finally:
-            return catalog
+        else:
+            self.build_complete = True
+
+    def _omega_reader(self, collection_id: str) -> OmegaDataReader:
+        """The reader creating the items of an OMEGA collection, with the options of
+        the run. Close it once done."""
+        if collection_id == "omega_data_cubes":
+            return OmegaDataCubes(
+                self.psup_archive,
+                log=self.log,
+                thumbnail_sizes=self.thumbnail_sizes,
+                thumbnail_format=self.thumbnail_format,
+            )
+        if collection_id == "omega_c_channel_proj":
+            return OmegaCChannelProj(
+                self.psup_archive,
+                log=self.log,
+                contour_downsampling=self.contour_downsampling,
+                contour_tolerance=self.contour_tolerance,
+                thumbnail_sizes=self.thumbnail_sizes,
+                thumbnail_format=self.thumbnail_format,
+            )
+        raise ValueError(f"{collection_id} isn't an OMEGA collection of items")
 
     def create_catalog(
-        self, self_contained: bool = True, clean_previous_output: bool = False
+        self,
+        self_contained: bool = True,
+        clean_previous_output: bool = False,
+        incremental: bool = False,
     ) -> pystac.Catalog:
         """Creates a catalog over the entire feature selection. The function's goal is to create a brand new
         catalog in a target folder, preferably over the existing one if `clean_previous_output` is set to
@@ -265,6 +411,8 @@ class CatalogCreator(BaseProcessor):
         Args:
             self_contained (bool, optional): _description_. Defaults to True.
             clean_previous_output (bool, optional): _description_. Defaults to False.
+            incremental (bool, optional): Updates the catalog of the output folder
+            instead, if there's one (see `update_catalog`). Defaults to False.
 
         Raises:
             FolderNotEmptyError: _description_
@@ -273,6 +421,9 @@ class CatalogCreator(BaseProcessor):
             pystac.Catalog: _description_
         """
 
+        if incremental and (self.io_handler.output_folder / "catalog.json").exists():
+            return self.update_catalog(self_contained=self_contained)
+
         # The output folder is expected to ahve a catalog.json instance + the user doesn't want to clean the catalog up
         if not self.io_handler.is_output_folder_empty() and not clean_previous_output:
             raise FolderNotEmptyError(
@@ -290,7 +441,7 @@ class CatalogCreator(BaseProcessor):
         catalog = cast(pystac.Catalog, apply_ssys(catalog))
 
         return self._add_collections_wrapper(
-            catalog=catalog, self_contained=self_contained
+            catalog=catalog, self_contained=self_contained, record_build=True
         )
 
     def create_feature_collection(self) -> pystac.Collection:
@@ -404,12 +555,7 @@ class CatalogCreator(BaseProcessor):
         if action == "add_missing":
             missing_collections = [
                 collection_id
-                for collection_id in [
-                    "features_datasets",
-                    "omega_mineral_maps",
-                    "omega_data_cubes",
-                    "omega_c_channel_proj",
-                ]
+                for collection_id in COLLECTION_IDS
                 if collection_id not in collection_ids
             ]
 
@@ -435,50 +581,287 @@ class CatalogCreator(BaseProcessor):
 
         return catalog
 
+    def update_catalog(self, self_contained: bool = True) -> pystac.Catalog:
+        """Brings the catalog of the output folder up to date with the inventory. It
+        is compared with the inventory of the last build, only the items of the
+        files added, changed or removed since then being made again (see
+        `_update_collections_of_catalog`).
+
+        Args:
+            self_contained (bool, optional): _description_. Defaults to True.
+
+        Raises:
+            FileNotFoundError: If there's no catalog to update
+
+        Returns:
+            pystac.Catalog: _description_
+        """
+        catalog_file = self.io_handler.output_folder / "catalog.json"
+        if not catalog_file.exists():
+            raise FileNotFoundError(
+                f"{catalog_file} is nowhere to be found. Create the catalog first."
+            )
+
+        build_inventory_file = self.io_handler.output_folder / BUILD_INVENTORY_FILE
+        if build_inventory_file.exists():
+            inventory_diff = diff_inventories(
+                load_inventory_snapshot(build_inventory_file),
+                self.psup_archive.inventory,
+            )
+        else:
+            self.log.warning(
+                f"No inventory was recorded with {catalog_file}: only the OMEGA cubes added to or removed from the inventory are taken into account this time."
+            )
+            inventory_diff = InventoryDiff(added=[], changed=[], removed=[])
+        self.log.info(
+            f"Since the last build: {len(inventory_diff.added)} files added, {len(inventory_diff.changed)} changed and {len(inventory_diff.removed)} removed"
+        )
+
+        catalog = pystac.Catalog.from_file(catalog_file)
+        return self._add_collections_wrapper(
+            catalog=catalog,
+            self_contained=self_contained,
+            inventory_diff=inventory_diff,
+            record_build=True,
+        )
+
+    def _update_collections_of_catalog(
+        self,
+        catalog: pystac.Catalog,
+        inventory_diff: InventoryDiff,
+        item_writer: StreamingItemWriter | None = None,
+    ) -> tuple[list[str], dict[str, ItemChanges]]:
+        """Updates the collections of a saved catalog after the inventory changed:
+
+        - the OMEGA collections item by item (see `OmegaDataReader.update_collection`),
+          the items being matched with the files by their cube ID;
+        - the other collections, built from a few files, are created again if any of
+          these changed.
+
+        Args:
+            catalog (pystac.Catalog): The catalog, as loaded from the output folder
+            inventory_diff (InventoryDiff): _description_
+            item_writer (StreamingItemWriter | None, optional): _description_.
+            Defaults to None.
+
+        Returns:
+            tuple[list[str], dict[str, ItemChanges]]: The collections created again,
+            and the changes by OMEGA collection
+        """
+        changed_ids: dict[str, set[str]] = {
+            collection_id: set() for collection_id in OMEGA_ITEM_COLLECTIONS.values()
+        }
+        other_files = []
+        for rel_path in inventory_diff.rel_paths:
+            omega_item = omega_item_of_file(rel_path)
+            if omega_item is None:
+                other_files.append(rel_path)
+            else:
+                collection_id, omega_data_idx = omega_item
+                changed_ids[collection_id].add(omega_data_idx)
+
+        collections = {child.id: child for child in catalog.get_children()}
+        other_collections_complete = True
+        to_recreate = []
+        if other_files:
+            to_recreate = [
+                collection_id
+                for collection_id in ["features_datasets", "omega_mineral_maps"]
+                if collection_id in collections
+            ]
+            self.log.info(
+                f"{len(other_files)} files of the other collections changed, creating {', '.join(to_recreate)} again"
+            )
+            for collection_id in to_recreate:
+                collection_folder = Path(
+                    collections.pop(collection_id).self_href
+                ).parent
+                catalog.remove_child(collection_id)
+                shutil.rmtree(collection_folder, ignore_errors=True)
+            self._add_collections_to_catalog(
+                catalog, collections_to_add=to_recreate, item_writer=item_writer
+            )
+            other_collections_complete = self.build_complete
+
+        item_changes: dict[str, ItemChanges] = {}
+        with self._collection_errors():
+            for collection_id in OMEGA_ITEM_COLLECTIONS.values():
+                if collection_id not in collections:
+                    self.log.info(
+                        f"{collection_id} isn't in the catalog, it can be added with `complete`"
+                    )
+                    continue
+                omega_reader = self._omega_reader(collection_id)
+                try:
+                    item_changes[collection_id] = omega_reader.update_collection(
+                        cast(pystac.Collection, collections[collection_id]),
+                        changed_ids=changed_ids[collection_id],
+                        n_limit=self.n_omega_files,
+                        n_jobs=self.n_jobs,
+                        item_writer=item_writer,
+                        prefetch_depth=self.prefetch_depth,
+                        prefetch_max_bytes=self.prefetch_max_size,
+                        pipeline=self.pipeline,
+                        fetch_jobs=self.fetch_jobs,
+                    )
+                finally:
+                    omega_reader.close()
+                self.log.info(f"{collection_id}: {item_changes[collection_id]}")
+        self.build_complete = self.build_complete and other_collections_complete
+        return to_recreate, item_changes
+
+    def _record_build(
+        self,
+        collections_to_add: list[str] | None,
+        inventory_diff: InventoryDiff | None,
+        item_changes: dict[str, ItemChanges],
+    ):
+        """Keeps the inventory the catalog was built from and the changes of the run
+        next to `catalog.json`, for the next update and the tools syncing the
+        catalog"""
+        output_folder = self.io_handler.output_folder
+        if inventory_diff is None and collections_to_add is None:
+            collections_to_add = COLLECTION_IDS
+
+        inventory = self.psup_archive.inventory
+        if inventory_diff is not None:
+            # The files of the changed cubes whose item wasn't made again (failed or
+            # beyond `n_omega_files`) are left out, to be seen as added next time
+            pending = []
+            for rel_path in inventory_diff.added + inventory_diff.changed:
+                omega_item = omega_item_of_file(rel_path)
+                if omega_item is None or omega_item[0] not in item_changes:
+                    continue
+                collection_id, omega_data_idx = omega_item
+                changes = item_changes[collection_id]
+                if omega_data_idx not in changes.created + changes.updated:
+                    pending.append(rel_path)
+            if pending:
+                self.log.info(
+                    f"{len(pending)} changed files have no new item yet, they will be processed again"
+                )
+                inventory = inventory[~inventory["rel_path"].isin(pending)]
+        save_inventory_snapshot(inventory, output_folder / BUILD_INVENTORY_FILE)
+        change_manifest = {
+            "updated_at": dt.datetime.now(tz=dt.UTC).isoformat(),
+            "mode": "full" if inventory_diff is None else "incremental",
+            "collections_created": collections_to_add,
+            "files": {} if inventory_diff is None else inventory_diff._asdict(),
+            "items": {
+                collection_id: changes._asdict()
+                for collection_id, changes in item_changes.items()
+            },
+        }
+        write_if_changed(
+            output_folder / CHANGE_MANIFEST_FILE,
+            json.dumps(change_manifest, indent=2).encode("utf-8"),
+        )
+        self.log.info(f"Changes recorded in {output_folder / CHANGE_MANIFEST_FILE}")
+
     def _add_collections_wrapper(
         self,
         catalog: pystac.Catalog,
         collections_to_add: list[str] | None = None,
         self_contained: bool = True,
+        inventory_diff: InventoryDiff | None = None,
+        record_build: bool = False,
     ) -> pystac.Catalog:
         """Wrapper for collection adder that handles the different behaviors from create and edit, as well as
-        the execution time and possible exceptions."""
+        the execution time and possible exceptions.
+
+        With an `inventory_diff`, the collections of the catalog are updated instead
+        (see `_update_collections_of_catalog`). With `record_build`, the inventory
+        and the changes of a complete run are kept next to `catalog.json` (see
+        `BUILD_INVENTORY_FILE` and `CHANGE_MANIFEST_FILE`)."""
         start_time = time.time()
-        try:
-            catalog = self._add_collections_to_catalog(
-                catalog, collections_to_add=collections_to_add
+        catalog_type = (
+            pystac.CatalogType.SELF_CONTAINED
+            if self_contained
+            else pystac.CatalogType.ABSOLUTE_PUBLISHED
+        )
+        if self.stream_items:
+            # Items are written along the way, with the hrefs they would get at the end
+            catalog.catalog_type = catalog_type
+            catalog.normalize_hrefs(
+                self.io_handler.output_folder.as_posix(), skip_unresolved=True
             )
+            item_writer = StreamingItemWriter(
+                catalog, stac_io=self.stac_io, log=self.log
+            )
+        else:
+            item_writer = None
+
+        self.build_complete = False
+        item_changes: dict[str, ItemChanges] = {}
+        try:
+            if inventory_diff is None:
+                catalog = self._add_collections_to_catalog(
+                    catalog,
+                    collections_to_add=collections_to_add,
+                    item_writer=item_writer,
+                )
+            else:
+                collections_to_add, item_changes = self._update_collections_of_catalog(
+                    catalog, inventory_diff, item_writer=item_writer
+                )
         except KeyboardInterrupt:
+            self.build_complete = False
             self.log.warning("Process interrupted by user! Catalog is incomplete.")
         except Exception as e:
+            self.build_complete = False
             self.log.error(f"A problem occured when generating the catalog: {e}")
         finally:
             # Save catalog (ie. in the STAC folder)
             self.log.info(f"Normalizing hrefs to {self.io_handler.output_folder}")
-            catalog.normalize_hrefs(self.io_handler.output_folder.as_posix())
+            # Streamed items are only links, already written where they belong
+            catalog.normalize_hrefs(
+                self.io_handler.output_folder.as_posix(),
+                skip_unresolved=self.stream_items or inventory_diff is not None,
+            )
 
             self.log.info(
                 f"""Saving catalog as {"self-contained" if self_contained else "absolute published"}"""
             )
-            if self_contained:
-                catalog.save(catalog_type=pystac.CatalogType.SELF_CONTAINED)
-            else:
-                catalog.save(catalog_type=pystac.CatalogType.ABSOLUTE_PUBLISHED)
+            save_catalog(
+                catalog,
+                catalog_type,
+                stac_io=self.stac_io,
+                n_threads=self.write_threads,
+                log=self.log,
+            )
+            if record_build and self.build_complete:
+                self._record_build(collections_to_add, inventory_diff, item_changes)
 
         exec_time = time.time() - start_time
         self.log.info(
             f"Catalog created in {exec_time // 60} minutes and {round(exec_time % 60, 2)} seconds!"
         )
+        cache_stats = self.psup_archive.cache_stats()
+        if cache_stats is not None:
+            self.log.info(f"Resource cache: {cache_stats}")
 
         self.log.info("Checking if catalog is STAC-compliant:")
         try:
-            catalog.validate_all()
-        except pystac.errors.STACValidationError as e:
-            self.log.warning(
-                "Validation failed. Some errors were detected during validation."
+            # Only the files written or modified by this run
+            validation_report = validate_catalog(
+                Path(catalog.self_href),
+                n_jobs=self.n_jobs,
+                changed_only=True,
+                schema_cache_folder=self.schema_cache_folder,
+                download_schemas=self.download_schemas,
+                log=self.log,
             )
-            self.log.warning(f"See stacktrace for more details: {e}")
+        except Exception as e:
+            self.log.warning(f"The catalog couldn't be validated: {e}")
         else:
-            self.log.info("Your catalog is STAC-compliant!")
+            if validation_report.valid:
+                self.log.info("Your catalog is STAC-compliant!")
+            else:
+                self.log.warning(
+                    f"Validation failed. Errors were detected in {len(validation_report.errors)} files."
+                )
+                for stac_file, errors in list(validation_report.errors.items())[:10]:
+                    self.log.warning(f"{stac_file}: {errors}")
+                self.log.warning("Run `psup-stac validate` for the whole list.")
         finally:
             return catalog
@@ -1,9 +1,10 @@
 import inspect
 import logging
 from pathlib import Path
+from typing import Any, Literal
 
 import yaml
-from pydantic import field_validator
+from pydantic import ByteSize, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from rich.logging import RichHandler
 
@@ -32,11 +33,63 @@ class Settings(BaseSettings):
     psup_inventory_file: Path = BASE_DIR / "data" / "raw" / "psup_refs.csv"
 
     wkt_file_path: Path = BASE_DIR / "data" / "extra" / "wkt_solar_system.csv"
+    # Cache of the remote resources, disabled if no size is given (eg. "200GiB")
+    cache_path: Path = BASE_DIR / "data" / "cache"
+    cache_max_size: ByteSize | None = None
+
+    # Connections to PSUP, shared by all the downloads of a run.
+    # HTTP/2 requires httpx[http2] to be installed.
+    http_max_connections: int = 10
+    http_max_keepalive_connections: int = 10
+    http_keepalive_expiry: float = 30.0
+    http2: bool = False
+    http_retries: int = 5
 
     n_omega_items: int | None = None
+    # Number of processes generating the OMEGA items
+    n_jobs: int = 1
+    # Writes the OMEGA items as soon as they are created instead of at the end
+    stream_items: bool = False
+    # Number of OMEGA cubes downloaded while the current one is processed, and the
+    # maximum size of their files (eg. "20GiB"). Disabled if 0.
+    prefetch_depth: int = 0
+    prefetch_max_size: ByteSize | None = None
+    # Creates the OMEGA items through stages fetching the files (with `fetch_jobs`
+    # threads), creating the items (with `n_jobs` processes) and writing them
+    pipeline: bool = False
+    fetch_jobs: int = 4
+    # Footprints of the OMEGA C channel cubes: outlined on their valid pixels reduced
+    # by blocks of `contour_downsampling` pixels, and simplified within
+    # `contour_tolerance` degrees (disabled if 0)
+    contour_downsampling: int = 1
+    contour_tolerance: float = 0.0
+    # Sizes of the square thumbnails of the OMEGA items, rendered at once. The first
+    # one is the main thumbnail, the ones larger than 256 px are overviews.
+    thumbnail_sizes: list[int] = [256]
+    thumbnail_format: Literal["png", "webp"] = "png"
+    # Local copies of the JSON schemas used to validate the catalog, on top of the
+    # bundled ones. The missing schemas are downloaded there if allowed.
+    schema_cache_path: Path = BASE_DIR / "data" / "schemas"
+    download_schemas: bool = False
+    # Output of the STAC files: "indented" or "compact" JSON, with gzip-compressed
+    # copies next to them if `stac_gzip`, written by `write_threads` threads
+    stac_json_format: Literal["indented", "compact"] = "indented"
+    stac_gzip: bool = False
+    write_threads: int = 8
 
     model_config = SettingsConfigDict()
 
+    @property
+    def http_options(self) -> dict[str, Any]:
+        """Options of the HTTP client, see `create_http_client`"""
+        return {
+            "max_connections": self.http_max_connections,
+            "max_keepalive_connections": self.http_max_keepalive_connections,
+            "keepalive_expiry": self.http_keepalive_expiry,
+            "http2": self.http2,
+            "retries": self.http_retries,
+        }
+
     @field_validator(
         "data_path",
         "raw_data_path",
@@ -44,6 +97,8 @@ class Settings(BaseSettings):
         "extra_data_path",
         "psup_inventory_file",
         "wkt_file_path",
+        "cache_path",
+        "schema_cache_path",
         mode="after",
     )
     @classmethod
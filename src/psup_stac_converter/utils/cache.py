@@ -0,0 +1,279 @@
+import fcntl
+import hashlib
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator
+from urllib.parse import urlparse
+
+from rich.filesize import decimal
+
+from psup_stac_converter.settings import create_logger
+
+
+class ResourceCache:
+    """Bounded on-disk cache of remote PSUP resources, evicting the least recently
+    used entries first.
+
+    Entries are keyed by their href and their size in the inventory, so a resource
+    that changed size on the server is downloaded again. The last access of an entry
+    is tracked with its modification time, which keeps the cache usable across runs
+    and shareable between processes.
+
+    Each entry has a lock file next to it (see `locked`): it is downloaded under an
+    exclusive lock and read under a shared one, and an entry whose lock is held
+    isn't evicted.
+    """
+
+    partial_suffix = ".part"
+    lock_suffix = ".lock"
+
+    def __init__(
+        self,
+        cache_folder: Path,
+        max_bytes: int,
+        log: logging.Logger | None = None,
+    ):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be strictly positive")
+        self.cache_folder = cache_folder
+        self.max_bytes = max_bytes
+        if log is None:
+            self.log = create_logger(__name__)
+        else:
+            self.log = log
+
+        self.cache_folder.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_hit = 0
+        self.bytes_added = 0
+
+        self.log.debug(
+            f"Resource cache at {self.cache_folder} ({decimal(self.max_bytes)} max)"
+        )
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict[str, Any]):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def path_for(self, href: str, size: int | None) -> Path:
+        """Location of the entry in the cache. The file's extension is kept so that
+        readers relying on it still work.
+        """
+        digest = hashlib.sha256(f"{href}|{size}".encode()).hexdigest()
+        suffix = Path(urlparse(href).path).suffix
+        return self.cache_folder / digest[:2] / f"{digest}{suffix}"
+
+    @staticmethod
+    def _complete_size(entry: Path, size: int | None) -> int | None:
+        """The size of an entry if it is in the cache and complete, None otherwise"""
+        try:
+            entry_size = entry.stat().st_size
+        except FileNotFoundError:
+            return None
+        if size is not None and entry_size != size:
+            return None
+        return entry_size
+
+    def get(self, href: str, size: int | None) -> Path | None:
+        """Looks for a resource in the cache and marks it as recently used.
+
+        The entry may be evicted by another process right after, unless its lock is
+        held (see `locked` and `use`).
+
+        Returns:
+            Path | None: The location of the cached resource, None on a miss
+        """
+        entry = self.path_for(href, size)
+        with self._lock:
+            try:
+                entry_size = self._complete_size(entry, size)
+                if entry_size is None:
+                    raise FileNotFoundError(entry)
+                os.utime(entry)
+            except FileNotFoundError:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.bytes_hit += entry_size
+        self.log.debug(f"Cache hit for {href} ({entry})")
+        return entry
+
+    @contextmanager
+    def locked(
+        self, href: str, size: int | None, shared: bool = False
+    ) -> Iterator[Path]:
+        """Holds the lock of an entry, between the threads and processes sharing the
+        cache. The lock files are kept, as removing them would let two holders
+        lock different files.
+
+        Args:
+            href (str): _description_
+            size (int | None): _description_
+            shared (bool, optional): Takes a shared lock, to read the entry, instead
+            of an exclusive one, to write it. Defaults to False.
+
+        Yields:
+            Iterator[Path]: The location of the entry
+        """
+        entry = self.path_for(href, size)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        with open(entry.with_name(f"{entry.name}{self.lock_suffix}"), "a") as lock_f:
+            fcntl.flock(lock_f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield entry
+            finally:
+                fcntl.flock(lock_f, fcntl.LOCK_UN)
+
+    def _publish(self, entry: Path, part_entry: Path):
+        os.replace(part_entry, entry)
+        with self._lock:
+            self.bytes_added += entry.stat().st_size
+        self.evict(keep=entry)
+
+    @contextmanager
+    def reserve(self, href: str, size: int | None) -> Iterator[Path]:
+        """Gives a partial location to download a resource to, under the entry's
+        exclusive lock. The resource is published in the cache once the context
+        exits without error.
+
+        The partial location is the same for a given entry and is kept on failure,
+        so that an interrupted download can be resumed later on.
+
+        Yields:
+            Iterator[Path]: Where the resource must be written
+        """
+        with self.locked(href, size) as entry:
+            part_entry = entry.with_name(f"{entry.name}{self.partial_suffix}")
+            yield part_entry
+            self._publish(entry, part_entry)
+
+    @contextmanager
+    def use(
+        self, href: str, size: int | None, download: Callable[[Path], None]
+    ) -> Iterator[Path]:
+        """Holds a resource of the cache for reading, downloading it first on a miss.
+        The entry can't be evicted until the context exits.
+
+        A resource missed by several threads or processes at once is only downloaded
+        by the first one, the others waiting for it.
+
+        Args:
+            href (str): _description_
+            size (int | None): _description_
+            download (Callable[[Path], None]): Writes the resource to the given
+            partial location, resuming it if it exists
+
+        Yields:
+            Iterator[Path]: The location of the entry
+        """
+        downloaded = False
+        while True:
+            with self.locked(href, size, shared=True) as entry:
+                if downloaded:
+                    # Not counted as a hit
+                    cached = self._complete_size(entry, size) is not None
+                else:
+                    cached = self.get(href, size) is not None
+                if cached:
+                    yield entry
+                    return
+            with self.locked(href, size) as entry:
+                # Another thread or process may have downloaded it meanwhile
+                if self._complete_size(entry, size) is None:
+                    part_entry = entry.with_name(f"{entry.name}{self.partial_suffix}")
+                    download(part_entry)
+                    self._publish(entry, part_entry)
+                    downloaded = True
+            # Read under the shared lock, unless evicted in between
+
+    def _scan(self) -> list[tuple[Path, os.stat_result]]:
+        entries = []
+        for root, _, files in self.cache_folder.walk():
+            for name in files:
+                if name.endswith((self.partial_suffix, self.lock_suffix)):
+                    continue
+                try:
+                    entries.append((root / name, (root / name).stat()))
+                except FileNotFoundError:
+                    # Evicted by another process in the meantime
+                    continue
+        return entries
+
+    @property
+    def size(self) -> int:
+        return sum(stat.st_size for _, stat in self._scan())
+
+    def evict(self, keep: Path | None = None):
+        """Removes the least recently used entries until the cache fits its budget.
+
+        The folder is scanned on each call, as other processes may share the cache.
+        The entries in use, whose lock is held, are skipped.
+
+        Args:
+            keep (Path | None, optional): An entry that must stay, typically the one
+            about to be used. Defaults to None.
+        """
+        with self._lock:
+            entries = sorted(self._scan(), key=lambda entry: entry[1].st_mtime)
+            total = sum(stat.st_size for _, stat in entries)
+            for entry, stat in entries:
+                if total <= self.max_bytes:
+                    break
+                if keep is not None and entry == keep:
+                    continue
+                if not self._remove_unused(entry):
+                    continue
+                total -= stat.st_size
+                self.evictions += 1
+                self.log.debug(f"Evicted {entry} from cache ({decimal(stat.st_size)})")
+
+    def _remove_unused(self, entry: Path) -> bool:
+        """Removes an entry unless its lock is held
+
+        Returns:
+            bool: Whether the entry was removed
+        """
+        with open(entry.with_name(f"{entry.name}{self.lock_suffix}"), "a") as lock_f:
+            try:
+                fcntl.flock(lock_f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                self.log.debug(f"{entry} is in use, it isn't evicted")
+                return False
+            try:
+                entry.unlink(missing_ok=True)
+            finally:
+                fcntl.flock(lock_f, fcntl.LOCK_UN)
+        return True
+
+    def clear(self):
+        with self._lock:
+            for entry, _ in self._scan():
+                entry.unlink(missing_ok=True)
+            for suffix in (self.partial_suffix, self.lock_suffix):
+                for other_file in self.cache_folder.rglob(f"*{suffix}"):
+                    other_file.unlink(missing_ok=True)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss statistics of the cache since its creation in this process"""
+        requests = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / requests, 3) if requests else None,
+            "evictions": self.evictions,
+            "bytes_hit": self.bytes_hit,
+            "bytes_added": self.bytes_added,
+            "max_bytes": self.max_bytes,
+        }
@@ -0,0 +1,165 @@
+import gzip
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Literal
+
+import msgspec
+import pystac
+from pystac.stac_io import DefaultStacIO
+
+from psup_stac_converter.settings import create_logger
+
+JsonFormat = Literal["indented", "compact"]
+
+
+def write_if_changed(location: Path, content: bytes) -> bool:
+    """Writes a file atomically, unless it already holds the same bytes. Its
+    modification time is then left as is, for the tools syncing the catalog.
+
+    Args:
+        location (Path): _description_
+        content (bytes): _description_
+
+    Returns:
+        bool: Whether the file was written
+    """
+    try:
+        if location.stat().st_size == len(content) and location.read_bytes() == content:
+            return False
+    except FileNotFoundError:
+        location.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp_location = location.with_name(
+        f"{location.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+    )
+    try:
+        tmp_location.write_bytes(content)
+        os.replace(tmp_location, location)
+    finally:
+        tmp_location.unlink(missing_ok=True)
+    return True
+
+
+class CatalogStacIO(DefaultStacIO):
+    """Serializes the STAC objects with msgspec, and only rewrites the files whose
+    content changes.
+
+    With `gzip_copies`, a gzip-compressed copy of each file is kept next to it
+    (`item.json.gz`), for the web servers serving precompressed files. The
+    `.json` files stay readable by any STAC client.
+    """
+
+    def __init__(
+        self,
+        json_format: JsonFormat = "indented",
+        gzip_copies: bool = False,
+        headers: dict[str, str] | None = None,
+    ):
+        """
+        Args:
+            json_format (JsonFormat, optional): "indented" (by 2 spaces, like
+            pystac) or "compact". Defaults to "indented".
+            gzip_copies (bool, optional): _description_. Defaults to False.
+            headers (dict[str, str] | None, optional): _description_. Defaults to
+            None.
+        """
+        super().__init__(headers=headers)
+        self.json_format = json_format
+        self.gzip_copies = gzip_copies
+        self.n_written = 0
+        self.n_unchanged = 0
+        self._lock = threading.Lock()
+
+    def encode(self, json_dict: dict[str, Any]) -> bytes:
+        content = msgspec.json.encode(json_dict)
+        if self.json_format == "indented":
+            content = msgspec.json.format(content, indent=2)
+        return content
+
+    def json_dumps(self, json_dict: dict[str, Any], *args: Any, **kwargs: Any) -> str:
+        return self.encode(json_dict).decode("utf-8")
+
+    def save_json(
+        self, dest: pystac.HREF, json_dict: dict[str, Any], *args: Any, **kwargs: Any
+    ) -> None:
+        location = Path(os.fspath(dest))
+        content = self.encode(json_dict)
+        written = write_if_changed(location, content)
+
+        gzip_location = location.with_name(f"{location.name}.gz")
+        if self.gzip_copies and (written or not gzip_location.exists()):
+            # Without a timestamp, the same content gives the same bytes
+            write_if_changed(gzip_location, gzip.compress(content, mtime=0))
+
+        with self._lock:
+            if written:
+                self.n_written += 1
+            else:
+                self.n_unchanged += 1
+
+
+def save_catalog(
+    catalog: pystac.Catalog,
+    catalog_type: pystac.CatalogType,
+    stac_io: CatalogStacIO | None = None,
+    n_threads: int = 8,
+    log: logging.Logger | None = None,
+):
+    """Saves a catalog like `Catalog.save`, its collections and items being written
+    by a pool of threads. The links that aren't resolved, like the ones of the
+    items already written by a `StreamingItemWriter`, are left as is.
+
+    Args:
+        catalog (pystac.Catalog): The root catalog, with normalized hrefs
+        catalog_type (pystac.CatalogType): _description_
+        stac_io (CatalogStacIO | None, optional): _description_. Defaults to None.
+        n_threads (int, optional): _description_. Defaults to 8.
+        log (logging.Logger | None, optional): _description_. Defaults to None.
+    """
+    if log is None:
+        log = create_logger(__name__)
+    if stac_io is None:
+        stac_io = CatalogStacIO()
+    catalog.catalog_type = catalog_type
+    n_written, n_unchanged = stac_io.n_written, stac_io.n_unchanged
+
+    # Same self links as `Catalog.save`
+    items_include_self_link = catalog_type == pystac.CatalogType.ABSOLUTE_PUBLISHED
+    to_save: list[tuple[pystac.STACObject, bool]] = []
+    parents = [catalog]
+    while parents:
+        parent = parents.pop()
+        for link in parent.get_child_links():
+            if link.is_resolved():
+                parents.append(link.target)
+        for link in parent.get_item_links():
+            if link.is_resolved():
+                to_save.append((link.target, items_include_self_link))
+
+        if catalog_type == pystac.CatalogType.ABSOLUTE_PUBLISHED:
+            include_self_link = True
+        elif catalog_type == pystac.CatalogType.SELF_CONTAINED:
+            include_self_link = False
+        else:
+            include_self_link = parent is catalog
+        to_save.append((parent, include_self_link))
+
+    with ThreadPoolExecutor(max_workers=n_threads) as executor:
+        futures = [
+            executor.submit(
+                stac_object.save_object,
+                include_self_link=include_self_link,
+                stac_io=stac_io,
+            )
+            for stac_object, include_self_link in to_save
+        ]
+        # Raises the first error met
+        for future in futures:
+            future.result()
+
+    log.info(
+        f"{stac_io.n_written - n_written} STAC files written, {stac_io.n_unchanged - n_unchanged} unchanged"
+    )
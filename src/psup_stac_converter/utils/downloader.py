@@ -1,11 +1,15 @@
+import importlib.util
+import json
 import logging
 import os
-import re
+import shutil
 import tempfile
+import threading
 import zipfile
-from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack, contextmanager
 from pathlib import Path
-from typing import Any, Iterable, Literal
+from typing import Any, Callable, Hashable, Iterable, Iterator, Literal
 from urllib.parse import urlparse
 
 import httpx
@@ -14,42 +18,190 @@ import psutil
 from httpx_retries import Retry, RetryTransport
 from tqdm.rich import tqdm
 
-from psup_stac_converter.exceptions import OutOfMemoryError, ValueNotAcceptedError
+from psup_stac_converter.exceptions import (
+    IncompleteDownloadError,
+    OutOfMemoryError,
+    ValueNotAcceptedError,
+)
 from psup_stac_converter.settings import create_logger
+from psup_stac_converter.utils.cache import ResourceCache
+from psup_stac_converter.utils.inventory import load_inventory, sizeof_fmt
+from psup_stac_converter.utils.remote_file import HttpRangeFile
 
 log = create_logger(__name__)
 
 
-def sizeof_fmt(num: int, suffix: str = "B") -> str:
-    for unit in ["", "Ki", "Mi", "Gi", "Ti"]:
-        if abs(num) < 1024.0:
-            return f"{num:3.1f} {unit}{suffix}"
-        num /= 1024.0
-    return f"{num:.1f} Ei{suffix}"
+def index_positions(keys: Iterable[Hashable]) -> dict[Hashable, int]:
+    """Maps each key to the position of its first row, for constant time lookups.
+
+    Args:
+        keys (Iterable[Hashable]): The keys of the rows, in order
+
+    Returns:
+        dict[Hashable, int]: _description_
+    """
+    positions = {}
+    for position, key in enumerate(keys):
+        positions.setdefault(key, position)
+    return positions
+
+
+def create_http_client(
+    max_connections: int | None = 10,
+    max_keepalive_connections: int | None = 10,
+    keepalive_expiry: float | None = 30.0,
+    http2: bool = False,
+    retries: int = 5,
+) -> httpx.Client:
+    """Defines an httpx Client with an exponential startegy to avoid crashouts.
+    The client is meant to be shared, so that its connections are reused.
+
+    Args:
+        max_connections (int | None, optional): Size of the connection pool,
+        unbounded if None. Defaults to 10.
+        max_keepalive_connections (int | None, optional): Idle connections kept
+        open for the next requests. Defaults to 10.
+        keepalive_expiry (float | None, optional): Time in seconds before an idle
+        connection is closed. Defaults to 30.0.
+        http2 (bool, optional): Enables HTTP/2, which requires `httpx[http2]`.
+        Defaults to False.
+        retries (int, optional): Number of retries of a failing request.
+        Defaults to 5.
+
+    Returns:
+        httpx.Client: _description_
+    """
+    if http2 and importlib.util.find_spec("h2") is None:
+        log.warning("HTTP/2 requires httpx[http2] to be installed. Using HTTP/1.1.")
+        http2 = False
+
+    retry = Retry(total=retries, backoff_factor=0.5)
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry,
+    )
+    transport = RetryTransport(
+        transport=httpx.HTTPTransport(limits=limits, http2=http2), retry=retry
+    )
+    # Waiting for a free connection of the pool is part of the plan
+    return httpx.Client(transport=transport, timeout=httpx.Timeout(5.0, pool=None))
+
+
+# How often a segment records its progress, for a later run to resume it
+SEGMENT_CHECKPOINT_BYTES = 8 * 1024 * 1024
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+PROC_SELF_CGROUP = Path("/proc/self/cgroup")
+
+
+def find_cgroup_folder(
+    cgroup_root: Path = CGROUP_ROOT, proc_cgroup: Path = PROC_SELF_CGROUP
+) -> Path | None:
+    """Folder of the cgroup v2 of the current process, None if it isn't in one
+    (eg. cgroup v1 or not on Linux)"""
+    try:
+        lines = proc_cgroup.read_text().splitlines()
+    except OSError:
+        return None
+    for line in lines:
+        hierarchy_id, _, cgroup_path = line.split(":", 2)
+        if hierarchy_id == "0":
+            cgroup_folder = cgroup_root / cgroup_path.lstrip("/")
+            if (cgroup_folder / "memory.current").exists():
+                return cgroup_folder
+    return None
+
+
+def read_cgroup_memory_max(
+    cgroup_folder: Path, cgroup_root: Path = CGROUP_ROOT
+) -> int | None:
+    """Lowest `memory.max` of the cgroup and its parents, in bytes. None if unlimited.
+
+    Args:
+        cgroup_folder (Path): _description_
+        cgroup_root (Path, optional): _description_. Defaults to CGROUP_ROOT.
+
+    Returns:
+        int | None: _description_
+    """
+    limits = []
+    for folder in [cgroup_folder, *cgroup_folder.parents]:
+        try:
+            memory_max = (folder / "memory.max").read_text().strip()
+        except OSError:
+            memory_max = "max"
+        if memory_max != "max":
+            limits.append(int(memory_max))
+        if folder == cgroup_root:
+            break
+    return min(limits, default=None)
 
 
 class MemoryManager:
     """
-    Watches over the memory resources
+    Watches over the memory resources.
+
+    The limit is the RAM of the host, or the `memory.max` of the cgroup v2 of the
+    process if lower (eg. a container's limit). Besides `check`, it governs how many
+    tasks run at once: `try_reserve` only admits a task if its estimated peak memory
+    fits in what is left, a task being always admitted when none is running.
     """
 
-    def __init__(self, threshold_pct: float = 70.0, log: logging.Logger | None = None):
+    def __init__(
+        self,
+        threshold_pct: float = 70.0,
+        log: logging.Logger | None = None,
+        cgroup_root: Path = CGROUP_ROOT,
+        proc_cgroup: Path = PROC_SELF_CGROUP,
+    ):
         if not (0 < threshold_pct < 100):
             raise ValueError("threshold_pct must be between 0 and 100")
         self.threshold_pct = threshold_pct
-        self.total_mb = psutil.virtual_memory().total / (1024**2)
+        self.host_total_mb = psutil.virtual_memory().total / (1024**2)
+        self.cgroup_folder = find_cgroup_folder(cgroup_root, proc_cgroup)
+        cgroup_max = None
+        if self.cgroup_folder is not None:
+            cgroup_max = read_cgroup_memory_max(self.cgroup_folder, cgroup_root)
+        if cgroup_max is not None and cgroup_max / (1024**2) < self.host_total_mb:
+            self.total_mb = cgroup_max / (1024**2)
+            self.limited_by_cgroup = True
+        else:
+            self.total_mb = self.host_total_mb
+            self.limited_by_cgroup = False
         self.threshold_mb = self.total_mb * (threshold_pct / 100)
         self._process = psutil.Process(os.getpid())
+        self._lock = threading.Lock()
+        self.n_reserved = 0
+        self.reserved_mb = 0.0
+        # Memory used when the first of the running tasks was admitted
+        self._baseline_mb = 0.0
         if log is None:
             self.log = create_logger(__name__)
         else:
             self.log = log
 
-        self.log.debug(f"Total RAM : {self.total_mb:.1f} MB")
+        self.log.debug(
+            f"Total RAM : {self.total_mb:.1f} MB"
+            + (" (cgroup limit)" if self.limited_by_cgroup else "")
+        )
         self.log.debug(
             f"Threshold : {self.threshold_pct}%  ->  {self.threshold_mb:.1f} MB"
         )
 
+    def __getstate__(self) -> dict[str, Any]:
+        # The watched process is always the current one, and psutil's handle
+        # can't be pickled (eg. when sent to a worker process)
+        state = self.__dict__.copy()
+        del state["_process"]
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict[str, Any]):
+        self.__dict__.update(state)
+        self._process = psutil.Process(os.getpid())
+        self._lock = threading.Lock()
+
     @property
     def used_mb(self) -> float:
         """Current RSS memory used by this process in MB."""
@@ -60,12 +212,42 @@ class MemoryManager:
         """Overall system memory usage percentage."""
         return psutil.virtual_memory().percent
 
+    @property
+    def group_used_mb(self) -> float:
+        """Memory used by the cgroup of the process (eg. all the processes of the
+        container), or by the whole system outside of a cgroup, in MB.
+
+        As for the "working set" of Kubernetes, the file cache that can be
+        reclaimed (eg. the one of the downloads) isn't counted.
+        """
+        if self.cgroup_folder is not None:
+            try:
+                used = int((self.cgroup_folder / "memory.current").read_text())
+                memory_stat = (self.cgroup_folder / "memory.stat").read_text()
+                for line in memory_stat.splitlines():
+                    if line.startswith("inactive_file "):
+                        used -= int(line.split()[1])
+                        break
+                return max(used, 0) / (1024**2)
+            except (OSError, ValueError):
+                pass
+        virtual_memory = psutil.virtual_memory()
+        return (virtual_memory.total - virtual_memory.available) / (1024**2)
+
+    @property
+    def headroom_mb(self) -> float:
+        """What can still be used before the threshold, in MB"""
+        return self.threshold_mb - self.group_used_mb
+
     def check(self) -> dict:
         """
-        Check memory usage. Raises OutOfMemoryError if threshold exceeded.
+        Check memory usage. Raises OutOfMemoryError if threshold exceeded, by the
+        process or by its cgroup when it has a limit.
         Returns a snapshot dict otherwise.
         """
         used = self.used_mb
+        if self.limited_by_cgroup:
+            used = max(used, self.group_used_mb)
         if used >= self.threshold_mb:
             raise OutOfMemoryError(used, self.total_mb, self.threshold_pct)
         return {
@@ -75,8 +257,39 @@ class MemoryManager:
             "threshold_mb": round(self.threshold_mb, 2),
             "threshold_pct": self.threshold_pct,
             "system_used_pct": round(self.system_used_pct, 2),
+            "reserved_mb": round(self.reserved_mb, 2),
         }
 
+    def try_reserve(self, estimated_mb: float) -> bool:
+        """Admits a task expected to use up to `estimated_mb` if it fits along the
+        running ones, both in the memory left when they started and in the memory
+        left now. A task is always admitted when none is running, so that the
+        largest ones run alone. Each admission must be followed by a `release`.
+
+        Args:
+            estimated_mb (float): Estimated peak memory of the task
+
+        Returns:
+            bool: Whether the task can start
+        """
+        with self._lock:
+            if self.n_reserved == 0:
+                self._baseline_mb = self.group_used_mb
+            elif (
+                self._baseline_mb + self.reserved_mb + estimated_mb > self.threshold_mb
+                or estimated_mb > self.headroom_mb
+            ):
+                return False
+            self.n_reserved += 1
+            self.reserved_mb += estimated_mb
+            return True
+
+    def release(self, estimated_mb: float):
+        """Ends a task admitted by `try_reserve`"""
+        with self._lock:
+            self.n_reserved = max(self.n_reserved - 1, 0)
+            self.reserved_mb = max(self.reserved_mb - estimated_mb, 0.0)
+
 
 class Downloader:
     """This class is more used as a blueprint"""
@@ -93,8 +306,9 @@ class Downloader:
             true_path = Path(parsed_url.path)
         self.extension = true_path.suffix
 
-    def __init__(self, file_name: str):
+    def __init__(self, file_name: str, client: httpx.Client | None = None):
         self.file_name = file_name
+        self.client = client
         self.url_type: Literal["local", "url", "unknown"] = "unknown"
         self.extension: str = ""
         self._analyze_file_path()
@@ -111,11 +325,10 @@ class Downloader:
         """Bulk downloads the file if on remote, with progress bar"""
         self.local_path = output_directory / filename
 
-        # define client config
-        retry = Retry(total=5, backoff_factor=0.5)
-        transport = RetryTransport(retry=retry)
-
-        with httpx.Client(transport=transport) as client:
+        with ExitStack() as stack:
+            client = self.client
+            if client is None:
+                client = stack.enter_context(create_http_client())
             with client.stream("GET", self.file_name) as response:
                 response.raise_for_status()
                 total = int(response.headers.get("Content-Length", 0))
@@ -150,28 +363,76 @@ class Downloader:
 class PsupArchive:
     @staticmethod
     def open_archive(archive_path: Path) -> pd.DataFrame:
-        df = pd.read_csv(archive_path)
-        df = df.sort_values(by=["total_size", "rel_path"], ascending=False)
-        df["h_total_size"] = df["total_size"].apply(sizeof_fmt)
-        df["extension"] = df["rel_path"].apply(lambda p: Path(p).suffix.lstrip("."))
-        df["category"] = df["rel_path"].apply(lambda p: p.split("/")[0])
-        df["root"] = df["rel_path"].apply(lambda p: p.split("/")[1])
-        return df
+        return load_inventory(archive_path)
 
-    @staticmethod
-    def create_http_client() -> httpx.Client:
-        """Defines an httpx Client with an exponential startegy to avoid crashouts
+    # Number of times a download is resumed before giving up
+    download_attempts = 5
 
-        Returns:
-            httpx.Client: _description_
+    def __init__(
+        self,
+        psup_archive_file: Path,
+        cache: ResourceCache | None = None,
+        segment_threshold: int | None = None,
+        n_segments: int = 4,
+        client: httpx.Client | None = None,
+        client_options: dict[str, Any] | None = None,
+        link_from_cache: bool = False,
+    ):
         """
-        retry = Retry(total=5, backoff_factor=0.5)
-        transport = RetryTransport(retry=retry)
-        return httpx.Client(transport=transport)
-
-    def __init__(self, psup_archive_file: Path):
+        Args:
+            psup_archive_file (Path): The inventory of the PSUP files, as a CSV
+            cache (ResourceCache | None, optional): Where the opened resources are
+            kept for the next uses. Defaults to None.
+            segment_threshold (int | None, optional): Files of at least this size
+            are downloaded as `n_segments` byte ranges in parallel. Disabled if None.
+            Defaults to None.
+            n_segments (int, optional): _description_. Defaults to 4.
+            client (httpx.Client | None, optional): The client used by all the
+            downloads. It is left open on `close` as the caller owns it.
+            Defaults to None.
+            client_options (dict[str, Any] | None, optional): Passed to
+            `create_http_client` when the archive creates its own client.
+            Defaults to None.
+            link_from_cache (bool, optional): Files saved on the disk are hard links
+            to the cache entries instead of copies. This saves the copy, but the
+            saved file and the entry are then the same file: writing to one changes
+            the other, and using the entry updates the saved file's modification
+            time. Defaults to False.
+        """
+        if n_segments < 1:
+            raise ValueError("n_segments must be at least 1")
         self.psup_archive = self.open_archive(psup_archive_file)
         self.fields = self.psup_archive.columns
+        self._file_name_index = index_positions(self.psup_archive["file_name"])
+        self._href_index = index_positions(self.psup_archive["href"])
+        self.cache = cache
+        self.segment_threshold = segment_threshold
+        self.n_segments = n_segments
+        self.client_options = client_options or {}
+        self._client = client
+        self._owns_client = client is None
+        self.link_from_cache = link_from_cache
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Clients can't be pickled (eg. when sent to a worker process), which then
+        # creates its own
+        state = self.__dict__.copy()
+        state["_client"] = None
+        state["_owns_client"] = True
+        return state
+
+    @property
+    def client(self) -> httpx.Client:
+        """The HTTP client shared by all the downloads, created on first use"""
+        if self._client is None:
+            self._client = create_http_client(**self.client_options)
+        return self._client
+
+    def close(self):
+        """Closes the HTTP client, if the archive created it"""
+        if self._owns_client and self._client is not None:
+            self._client.close()
+            self._client = None
 
     def __str__(self):
         return f"""Archive of {self.n_elements} elements.
@@ -236,7 +497,9 @@ class PsupArchive:
         """
         filtered_df = self.psup_archive.copy()
         for _by, _criteria in filters:
-            filtered_df = self.slice_by_one(filtered_df, _by, _criteria)
+            filtered_df = self.slice_by_one(_by, _criteria, slice_copy=filtered_df)
+            if filtered_df is None:
+                return None
         return filtered_df
 
     @property
@@ -251,18 +514,32 @@ class PsupArchive:
     def htotal_size(self) -> str:
         return sizeof_fmt(self.total_size)
 
-    def _find_single_file_name(self, file_name: str) -> pd.DataFrame:
-        fn_pattern = r"^" + re.escape(file_name) + r"$"
-        row = self.psup_archive[
-            self.psup_archive["file_name"].str.contains(fn_pattern, regex=True)
-        ]
-        if row.empty:
-            raise ValueError(f'Couldn\'t find item with the name "{file_name}"')
+    def find_by_file_name(self, file_name: str) -> pd.Series | None:
+        """Looks for the row of a file by its exact name.
+
+        Args:
+            file_name (str): _description_
 
-        # In theory, only one item is left
-        row = row.drop_duplicates(subset=["file_name"]).squeeze()
+        Returns:
+            pd.Series | None: The first row with this file name, None if there is none
+        """
+        position = self._file_name_index.get(file_name)
+        if position is None:
+            return None
+        return self.psup_archive.iloc[position]
+
+    def _find_single_file_name(self, file_name: str) -> pd.Series:
+        row = self.find_by_file_name(file_name)
+        if row is None:
+            raise ValueError(f'Couldn\'t find item with the name "{file_name}"')
         return row
 
+    def _find_size_by_href(self, file_href: str) -> int | None:
+        position = self._href_index.get(file_href)
+        if position is None:
+            return None
+        return int(self.psup_archive["total_size"].iat[position])
+
     def save_resource_on_disk(self, file_name: str, dest_folder: Path):
         """Saves a single resource on the disk
 
@@ -284,88 +561,532 @@ class PsupArchive:
             raise FileExistsError(f"{local_path} already exists!")
         else:
             local_path.parent.mkdir(exist_ok=True, parents=True)
-            self._save_on_disk(server_ref, local_path)
+            self._save_on_disk(
+                server_ref, local_path, total_size=int(row["total_size"])
+            )
+
+    def download_resource(
+        self, file_href: str, dst: Path, total_size: int | None = None
+    ) -> Path:
+        """Downloads a resource to a given location, through the cache if the archive
+        has one.
+
+        Args:
+            file_href (str): The remote location of the resource
+            dst (Path): _description_
+            total_size (int | None, optional): Size of the resource in the inventory,
+            looked for by href if not given. Defaults to None.
+
+        Returns:
+            Path: The location of the downloaded file
+        """
+        if total_size is None:
+            total_size = self._find_size_by_href(file_href)
+        self._save_on_disk(file_href, dst, dl_desc=dst.name, total_size=total_size)
+        return dst
 
     def _save_on_disk(
         self,
         remote_url: str,
         dst: Path,
         dl_desc: str | None = None,
+        total_size: int | None = None,
+        **download_kwargs,
     ):
-        """Simple command downloading files on the disk
+        """Saves a remote file on the disk, through the cache if the archive has one.
+        The file is copied from the cache, or hard linked to the entry with
+        `link_from_cache`.
 
         Args:
             remote_url (str): _description_
             dst (Path): _description_
             dl_desc (str | None, optional): _description_. Defaults to None.
+            total_size (int | None, optional): Size of the file in the inventory. Defaults to None.
+            **download_kwargs: Passed to `_download_part`
         """
-        retry = Retry(total=5, backoff_factor=0.5)
-        transport = RetryTransport(retry=retry)
+        if self.cache is None:
+            self._download_to_file(
+                remote_url,
+                dst,
+                dl_desc=dl_desc,
+                total_size=total_size,
+                **download_kwargs,
+            )
+            return
+
+        with self._fetch_to_cache(
+            remote_url, total_size, **download_kwargs
+        ) as cached_path:
+            if self.link_from_cache:
+                try:
+                    os.link(cached_path, dst)
+                    return
+                except OSError:
+                    # Cache and destination on different devices
+                    log.debug(f"Couldn't link {dst} to {cached_path}, copying it")
+            shutil.copyfile(cached_path, dst)
+
+    def _download_to_file(
+        self,
+        remote_url: str,
+        dst: Path,
+        dl_desc: str | None = None,
+        total_size: int | None = None,
+        **download_kwargs,
+    ):
+        """Downloads a file on the disk. The bytes are gathered in a `.part` file
+        next to the destination, which is only renamed once complete. An interrupted
+        download is thus resumed where it stopped, even from a previous run.
 
-        with httpx.Client(transport=transport) as client:
-            with client.stream("GET", remote_url) as response:
-                response.raise_for_status()
-                total = int(response.headers.get("Content-Length", 0))
+        Args:
+            remote_url (str): _description_
+            dst (Path): _description_
+            dl_desc (str | None, optional): _description_. Defaults to None.
+            total_size (int | None, optional): Expected size of the file, from the
+            inventory. Defaults to None.
+            **download_kwargs: Passed to `_download_part`
+        """
+        part_path = dst.with_name(f"{dst.name}.part")
+        self._download_part(
+            remote_url,
+            part_path,
+            dl_desc=dl_desc if dl_desc is not None else dst.as_posix(),
+            total_size=total_size,
+            **download_kwargs,
+        )
+        os.replace(part_path, dst)
+
+    def _download_part(
+        self,
+        remote_url: str,
+        part_path: Path,
+        dl_desc: str | None = None,
+        total_size: int | None = None,
+        client: httpx.Client | None = None,
+        on_progress: Callable[[int], None] | None = None,
+    ):
+        """Downloads a remote file into `part_path`, resuming from the bytes already
+        there with `Range` requests. The download is attempted again from where it
+        stopped when the connection drops.
+
+        Args:
+            remote_url (str): _description_
+            part_path (Path): Where the bytes are gathered
+            dl_desc (str | None, optional): _description_. Defaults to None.
+            total_size (int | None, optional): Expected size of the file, from the
+            inventory. Without it, the download is complete when the server
+            stops sending. Defaults to None.
+            client (httpx.Client | None, optional): The client to download with.
+            Defaults to None, which uses the archive's one.
+            on_progress (Callable[[int], None] | None, optional): Called with the
+            number of bytes received after each chunk. Defaults to None.
+
+        Raises:
+            IncompleteDownloadError: The file is still incomplete after all attempts
+        """
+        if client is None:
+            client = self.client
+
+        if (
+            self.segment_threshold is not None
+            and total_size is not None
+            and total_size >= self.segment_threshold
+            and not part_path.exists()
+        ):
+            if self._download_segmented(
+                client, remote_url, part_path, total_size, dl_desc, on_progress
+            ):
+                return
+
+        offset = 0
+        for attempt in range(1, self.download_attempts + 1):
+            offset = part_path.stat().st_size if part_path.exists() else 0
+            if total_size is not None and offset > total_size:
+                log.warning(f"{part_path} is larger than expected. Starting over.")
+                offset = 0
+            elif total_size is not None and offset == total_size:
+                if attempt == 1 and on_progress is not None:
+                    on_progress(offset)
+                return
+            elif offset > 0:
+                log.info(f"Resuming {remote_url} from byte {offset}")
+            if attempt == 1 and offset > 0 and on_progress is not None:
+                on_progress(offset)
+
+            try:
+                offset = self._stream_into_part(
+                    client, remote_url, part_path, offset, dl_desc, on_progress
+                )
+            except httpx.TransportError as e:
+                if attempt == self.download_attempts:
+                    raise
+                log.warning(
+                    f"Download of {remote_url} interrupted ({e}) "
+                    f"[attempt {attempt}/{self.download_attempts}]"
+                )
+                continue
+
+            if total_size is None or offset == total_size:
+                return
+            if offset > total_size:
+                # Most likely an outdated inventory: the server is trusted
+                log.warning(
+                    f"{remote_url} is {offset} bytes long, {total_size} were expected"
+                )
+                return
+
+        raise IncompleteDownloadError(remote_url, offset, total_size or offset)
+
+    def _stream_into_part(
+        self,
+        client: httpx.Client,
+        remote_url: str,
+        part_path: Path,
+        offset: int,
+        dl_desc: str | None = None,
+        on_progress: Callable[[int], None] | None = None,
+    ) -> int:
+        """Streams a remote file into `part_path` from byte `offset`.
+
+        Returns:
+            int: The size of the part file afterwards
+        """
+        headers = {"Range": f"bytes={offset}-"} if offset > 0 else None
+        with client.stream("GET", remote_url, headers=headers) as response:
+            if response.status_code == httpx.codes.REQUESTED_RANGE_NOT_SATISFIABLE:
+                # The part already holds the whole file
+                return offset
+            response.raise_for_status()
+            if offset > 0 and response.status_code != httpx.codes.PARTIAL_CONTENT:
+                log.warning(f"{remote_url} can't be resumed. Starting over.")
+                if on_progress is not None:
+                    on_progress(-offset)
+                offset = 0
+            total = offset + int(response.headers.get("Content-Length", 0))
+            with (
+                open(part_path, "ab" if offset > 0 else "wb") as f,
+                tqdm(
+                    total=total,
+                    initial=offset,
+                    unit="B",
+                    unit_scale=True,
+                    unit_divisor=1024,
+                    desc=dl_desc if dl_desc is not None else remote_url,
+                    leave=on_progress is None,
+                ) as pbar,
+            ):
+                num_bytes_downloaded = response.num_bytes_downloaded
+                for chunk in response.iter_bytes():
+                    f.write(chunk)
+                    n_bytes = response.num_bytes_downloaded - num_bytes_downloaded
+                    pbar.update(n_bytes)
+                    if on_progress is not None:
+                        on_progress(n_bytes)
+                    num_bytes_downloaded = response.num_bytes_downloaded
+        return part_path.stat().st_size
+
+    def _download_segmented(
+        self,
+        client: httpx.Client,
+        remote_url: str,
+        part_path: Path,
+        total_size: int,
+        dl_desc: str | None = None,
+        on_progress: Callable[[int], None] | None = None,
+    ) -> bool:
+        """Downloads a file as `n_segments` byte ranges fetched concurrently into a
+        preallocated file, moved to `part_path` once every range is complete.
+
+        Where each range stands is recorded next to the preallocated file, so that
+        a failed or interrupted download is resumed range by range by the next
+        attempt, even from a later run.
+
+        Returns:
+            bool: False if the server can't serve the ranges of the file, in which
+            case nothing was downloaded
+        """
+        with client.stream(
+            "GET", remote_url, headers={"Range": "bytes=0-0"}
+        ) as response:
+            response.raise_for_status()
+            content_range = response.headers.get("Content-Range", "")
+        if (
+            response.status_code != httpx.codes.PARTIAL_CONTENT
+            or content_range.rpartition("/")[2] != str(total_size)
+        ):
+            log.info(f"{remote_url} can't be downloaded in segments")
+            return False
+
+        # Unlike the part file, its size says nothing about what was downloaded:
+        # the position of each range is kept in a progress record
+        segments_path = part_path.with_suffix(f".seg{part_path.suffix}")
+        progress_path = part_path.with_suffix(f".progress{part_path.suffix}")
+        positions = self._load_segment_progress(
+            segments_path, progress_path, total_size
+        )
+        if positions:
+            log.info(f"Resuming the segments of {remote_url}")
+        else:
+            segment_size = -(-total_size // self.n_segments)
+            positions = {
+                start: [start, min(start + segment_size, total_size) - 1]
+                for start in range(0, total_size, segment_size)
+            }
+            with open(segments_path, "wb") as f:
+                f.truncate(total_size)
+        progress_lock = threading.Lock()
+
+        def save_progress():
+            tmp_path = progress_path.with_name(
+                f"{progress_path.name}.{os.getpid()}.tmp"
+            )
+            try:
+                tmp_path.write_text(
+                    json.dumps({"total_size": total_size, "segments": positions})
+                )
+                os.replace(tmp_path, progress_path)
+            finally:
+                tmp_path.unlink(missing_ok=True)
+
+        def checkpoint(start: int, position: int):
+            with progress_lock:
+                positions[start][0] = position
+                save_progress()
+
+        with progress_lock:
+            save_progress()
+        n_done = sum(position - start for start, (position, _) in positions.items())
+        with (
+            ThreadPoolExecutor(max_workers=len(positions)) as executor,
+            tqdm(
+                total=total_size,
+                initial=n_done,
+                unit="B",
+                unit_scale=True,
+                unit_divisor=1024,
+                desc=f"{dl_desc if dl_desc is not None else remote_url} ({len(positions)} segments)",
+                leave=on_progress is None,
+            ) as pbar,
+        ):
+            if n_done > 0 and on_progress is not None:
+                on_progress(n_done)
+
+            def update(n_bytes: int):
+                with progress_lock:
+                    pbar.update(n_bytes)
+                    if on_progress is not None:
+                        on_progress(n_bytes)
+
+            futures = [
+                executor.submit(
+                    self._download_segment,
+                    client,
+                    remote_url,
+                    segments_path,
+                    start,
+                    end,
+                    update,
+                    position=position,
+                    on_checkpoint=lambda position, start=start: checkpoint(
+                        start, position
+                    ),
+                )
+                for start, (position, end) in positions.items()
+                if position <= end
+            ]
+            for future in futures:
+                future.result()
+
+        os.replace(segments_path, part_path)
+        progress_path.unlink(missing_ok=True)
+        return True
+
+    @staticmethod
+    def _load_segment_progress(
+        segments_path: Path, progress_path: Path, total_size: int
+    ) -> dict[int, list[int]]:
+        """Where the ranges of an unfinished segmented download stand.
+
+        Returns:
+            dict[int, list[int]]: The next position and the end of each range, by
+            start. Empty if there is nothing to resume.
+        """
+        try:
+            progress = json.loads(progress_path.read_text())
+            if (
+                progress["total_size"] != total_size
+                or segments_path.stat().st_size != total_size
+            ):
+                return {}
+            return {
+                int(start): [int(position), int(end)]
+                for start, (position, end) in progress["segments"].items()
+            }
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+
+    def _download_segment(
+        self,
+        client: httpx.Client,
+        remote_url: str,
+        dst: Path,
+        start: int,
+        end: int,
+        on_progress: Callable[[int], None],
+        position: int | None = None,
+        on_checkpoint: Callable[[int], None] | None = None,
+    ):
+        """Writes the bytes `start` to `end` (included) of a remote file at the same
+        place in `dst`, resuming the range when the connection drops.
+
+        Args:
+            position (int | None, optional): Where to resume the range from.
+            Defaults to None, which is its start.
+            on_checkpoint (Callable[[int], None] | None, optional): Called with the
+            position once the bytes before it are written, every
+            `SEGMENT_CHECKPOINT_BYTES` and at the end of each attempt. Defaults to
+            None.
+
+        Raises:
+            IncompleteDownloadError: The range is still incomplete after all attempts
+        """
+        if position is None:
+            position = start
+        checkpointed = position
+        for attempt in range(1, self.download_attempts + 1):
+            try:
                 with (
-                    open(dst, "wb") as f,
-                    tqdm(
-                        total=total,
-                        unit="B",
-                        unit_scale=True,
-                        unit_divisor=1204,
-                        desc=dl_desc if dl_desc is not None else dst.as_posix(),
-                    ) as pbar,
+                    client.stream(
+                        "GET", remote_url, headers={"Range": f"bytes={position}-{end}"}
+                    ) as response,
+                    open(dst, "r+b") as f,
                 ):
-                    num_bytes_downloaded = response.num_bytes_downloaded
+                    response.raise_for_status()
+                    if response.status_code != httpx.codes.PARTIAL_CONTENT:
+                        break
+                    f.seek(position)
                     for chunk in response.iter_bytes():
+                        chunk = chunk[: end + 1 - position]
                         f.write(chunk)
-                        pbar.update(
-                            response.num_bytes_downloaded - num_bytes_downloaded
-                        )
-                        num_bytes_downloaded = response.num_bytes_downloaded
+                        position += len(chunk)
+                        on_progress(len(chunk))
+                        if (
+                            on_checkpoint is not None
+                            and position - checkpointed >= SEGMENT_CHECKPOINT_BYTES
+                        ):
+                            f.flush()
+                            on_checkpoint(position)
+                            checkpointed = position
+            except httpx.TransportError:
+                if attempt == self.download_attempts:
+                    raise
+                continue
+            finally:
+                # The file is closed, its bytes are written
+                if on_checkpoint is not None and position != checkpointed:
+                    on_checkpoint(position)
+                    checkpointed = position
+
+            if position > end:
+                return
+
+        raise IncompleteDownloadError(remote_url, position - start, end + 1 - start)
 
     @contextmanager
-    def open_resource(self, file_href: str):
-        """Holds the data from the href temporarily in a file"""
+    def _fetch_to_cache(
+        self, file_href: str, total_size: int | None = None, **download_kwargs
+    ) -> Iterator[Path]:
+        """Holds a resource of the cache, downloading it there first on a miss. The
+        entry can't be evicted, by this process or another, until the context exits.
 
-        log.debug(f"Downloading {file_href}")
+        Args:
+            file_href (str): The remote location of the resource
+            total_size (int | None, optional): Size of the resource in the inventory,
+            looked for by href if not given. Defaults to None.
+            **download_kwargs: Passed to `_download_part`
 
-        retry = Retry(total=5, backoff_factor=0.5)
-        transport = RetryTransport(retry=retry)
+        Yields:
+            Iterator[Path]: Location of the resource in the cache
+        """
+        if total_size is None:
+            total_size = self._find_size_by_href(file_href)
+
+        def download(part_path: Path):
+            log.debug(f"Downloading {file_href} to cache")
+            self._download_part(
+                file_href,
+                part_path,
+                dl_desc=file_href,
+                total_size=total_size,
+                **download_kwargs,
+            )
+
+        with self.cache.use(file_href, total_size, download) as cached_path:
+            yield cached_path
 
-        with httpx.Client(transport=transport) as client:
-            with client.stream("GET", file_href) as response:
-                log.debug(f"Got response: {response}")
-                response.raise_for_status()
+    @contextmanager
+    def open_resource(self, file_href: str, total_size: int | None = None):
+        """Holds the data from the href in a file, opened for reading.
 
-                total_bytes = int(response.headers.get("Content-Length", 0))
-                log.debug(f"A total of {total_bytes} bytes will be downloaded")
+        Without cache, the file is temporary and disposed of when the context exits.
+        Otherwise, it is taken from the cache or kept there for the next uses.
 
-                with (
-                    tempfile.NamedTemporaryFile(delete_on_close=False) as tmp_f,
-                    tqdm(
-                        total=total_bytes,
-                        unit="B",
-                        unit_scale=True,
-                        desc=file_href,
-                        unit_divisor=1024,
-                    ) as pbar,
-                ):
-                    try:
-                        num_bytes_downloaded = response.num_bytes_downloaded
-                        for chunk in response.iter_bytes():
-                            tmp_f.write(chunk)
-                            pbar.update(
-                                response.num_bytes_downloaded - num_bytes_downloaded
-                            )
-                            num_bytes_downloaded = response.num_bytes_downloaded
-                        tmp_f.close()
-                        log.info(f"Saved {file_href} temporarily on {tmp_f.name}")
-                        yield tmp_f
-                        log.debug(f"{tmp_f.name} ready to use")
-                    finally:
-                        Path(tmp_f.name).unlink()
-                        log.debug(f"{file_href} disposed ({tmp_f.name})")
+        Args:
+            file_href (str): The remote location of the resource
+            total_size (int | None, optional): Size of the resource in the inventory,
+            looked for by href if not given. Defaults to None.
+        """
+
+        if self.cache is None:
+            with tempfile.NamedTemporaryFile(delete_on_close=False) as tmp_f:
+                tmp_f.close()
+                if total_size is None:
+                    total_size = self._find_size_by_href(file_href)
+                log.debug(f"Downloading {file_href}")
+                self._download_to_file(
+                    file_href,
+                    Path(tmp_f.name),
+                    dl_desc=file_href,
+                    total_size=total_size,
+                )
+                log.info(f"Saved {file_href} temporarily on {tmp_f.name}")
+                try:
+                    with open(tmp_f.name, "rb") as resource_f:
+                        yield resource_f
+                finally:
+                    log.debug(f"{file_href} disposed ({tmp_f.name})")
+            return
+
+        with (
+            self._fetch_to_cache(file_href, total_size) as cached_path,
+            open(cached_path, "rb") as resource_f,
+        ):
+            yield resource_f
+
+    @contextmanager
+    def open_ranges(self, file_href: str, total_size: int | None = None):
+        """Opens a resource for random access, only fetching the parts that are read
+        through byte-range requests. Meant for formats like HDF5 where a few reads
+        give the metadata of a large file. The cached copy is read instead if any.
+
+        Args:
+            file_href (str): The remote location of the resource
+            total_size (int | None, optional): Size of the resource in the inventory,
+            looked for by href if not given. Defaults to None.
+        """
+        if total_size is None:
+            total_size = self._find_size_by_href(file_href)
+
+        if self.cache is not None:
+            with self.cache.locked(file_href, total_size, shared=True):
+                cached_path = self.cache.get(file_href, total_size)
+                if cached_path is not None:
+                    with open(cached_path, "rb") as resource_f:
+                        yield resource_f
+                    return
+
+        with HttpRangeFile(self.client, file_href, total_size) as resource_f:
+            yield resource_f
 
     def save_slice_on_disk(
         self,
@@ -373,7 +1094,31 @@ class PsupArchive:
         filters: list[tuple[str, Any]] | None = None,
         auto_valid: bool = False,
         raise_on_exists: bool = False,
+        max_concurrency: int = 8,
     ):
+        """Saves a slice of the archive on the disk, keeping its folder structure.
+
+        Files are downloaded concurrently through the archive's client, whose
+        connection pool bounds the number of simultaneous transfers. A file
+        that fails to download is reported and the other ones carry on, its partial
+        download being resumed on the next call.
+
+        Args:
+            dest_folder (Path): _description_
+            filters (list[tuple[str, Any]] | None, optional): See `slice`. The whole
+            archive is saved if None. Defaults to None.
+            auto_valid (bool, optional): Skips the confirmation. Defaults to False.
+            raise_on_exists (bool, optional): Raises if a file already exists on the
+            disk, instead of skipping it. Defaults to False.
+            max_concurrency (int, optional): Maximum number of simultaneous downloads.
+            Defaults to 8.
+
+        Raises:
+            FileExistsError: _description_
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
         if filters is None:
             slice = self.psup_archive
         else:
@@ -382,20 +1127,8 @@ class PsupArchive:
                 log.error("There is nothing to download!")
                 return
 
-        total_size = slice["total_size"].sum()
-        log.warning(f"{total_size} of data will be saved at {dest_folder}")
-        if not auto_valid:
-            user_yes = input("Do you want to continue? [Y/n]")
-            if user_yes.lower() not in ("y", "yes"):
-                log.warning("Download cancelled by user.")
-                return
-        for row in tqdm(
-            slice.itertuples(),
-            total=slice.shape[0],
-            unit="file",
-            desc="Downloading archive",
-        ):
-            server_ref = row["href"]
+        to_download = []
+        for row in slice.itertuples():
             local_path = dest_folder / Path(row.rel_path)
             if local_path.exists():
                 if raise_on_exists:
@@ -403,17 +1136,82 @@ class PsupArchive:
                 else:
                     log.warning(f"{local_path} already exists. Skipping.")
             else:
+                to_download.append((row.href, local_path, int(row.total_size)))
+
+        if not to_download:
+            log.error("There is nothing to download!")
+            return
+
+        total_size = sum(size for _, _, size in to_download)
+        log.warning(
+            f"{sizeof_fmt(total_size)} of data ({len(to_download)} files) will be saved at {dest_folder}"
+        )
+        if not auto_valid:
+            user_yes = input("Do you want to continue? [Y/n]")
+            if user_yes.lower() not in ("y", "yes"):
+                log.warning("Download cancelled by user.")
+                return
+
+        failures = []
+        pbar_lock = threading.Lock()
+        with (
+            ThreadPoolExecutor(max_workers=max_concurrency) as executor,
+            tqdm(
+                total=total_size,
+                unit="B",
+                unit_scale=True,
+                unit_divisor=1024,
+                desc=f"Downloading archive ({len(to_download)} files)",
+            ) as total_pbar,
+        ):
+
+            def update_total(n_bytes: int):
+                with pbar_lock:
+                    total_pbar.update(n_bytes)
+
+            def save_one(server_ref: str, local_path: Path, size: int):
                 local_path.parent.mkdir(exist_ok=True, parents=True)
-                self._save_on_disk(server_ref, local_path)
+                self._save_on_disk(
+                    server_ref,
+                    local_path,
+                    dl_desc=local_path.name,
+                    total_size=size,
+                    on_progress=update_total,
+                )
+
+            futures = {
+                executor.submit(save_one, *download): download[0]
+                for download in to_download
+            }
+            try:
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except (httpx.HTTPError, IncompleteDownloadError, OSError) as e:
+                        log.error(f"Couldn't download {futures[future]}: {e}")
+                        failures.append(futures[future])
+            except KeyboardInterrupt:
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+
+        if failures:
+            log.error(f"{len(failures)}/{len(to_download)} files couldn't be saved")
+        else:
+            log.info(f"{len(to_download)} files saved at {dest_folder}")
 
     def save_all_on_disk(
-        self, dest_folder: Path, auto_valid: bool = False, raise_on_exists: bool = False
+        self,
+        dest_folder: Path,
+        auto_valid: bool = False,
+        raise_on_exists: bool = False,
+        max_concurrency: int = 8,
     ):
         self.save_slice_on_disk(
             dest_folder=dest_folder,
             filters=None,
             auto_valid=auto_valid,
             raise_on_exists=raise_on_exists,
+            max_concurrency=max_concurrency,
         )
 
     def get_omega_data(self, data_type: Literal["data_cubes_slice", "c_channel_slice"]):
@@ -1,6 +1,8 @@
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Literal
+from typing import Iterable, Literal
 
 import matplotlib.pyplot as plt
 import numpy as np
@@ -123,6 +125,52 @@ def fits_header_to_dict(
     return fits_obj
 
 
+def decimation_step(image_shape: tuple[int, ...], resize_dims: tuple[int, int]) -> int:
+    """Step between the pixels kept to shrink an image before it is resized, so that
+    twice the resolution of the resized image is left to the resampling filter.
+
+    Args:
+        image_shape (tuple[int, ...]): Shape of the image, (H, W, ...)
+        resize_dims (tuple[int, int]): (W, H) of the resized image
+
+    Returns:
+        int: 1 if the image is not large enough to be decimated
+    """
+    if len(image_shape) < 2:
+        return 1
+    width, height = resize_dims
+    return max(1, min(image_shape[0] // (2 * height), image_shape[1] // (2 * width)))
+
+
+def block_mean(data: np.ndarray, step: int) -> np.ndarray:
+    """Shrinks an image by averaging its `step` x `step` blocks, the non-finite
+    values left aside. The last rows and columns that don't fill a block are dropped.
+
+    The blocks are averaged one row at a time, so that only a row of blocks of the
+    image is copied at once.
+
+    Args:
+        data (np.ndarray): Image of shape (H, W, ...)
+        step (int): _description_
+
+    Returns:
+        np.ndarray: float32 image of shape (H // step, W // step, ...), NaN where a
+        block has no finite value
+    """
+    height, width = data.shape[0] // step, data.shape[1] // step
+    channels = data.shape[2:]
+    result = np.empty((height, width, *channels), dtype=np.float32)
+    for row in range(height):
+        blocks = np.asarray(
+            data[row * step : (row + 1) * step, : width * step], dtype=np.float32
+        ).reshape(step, width, step, *channels)
+        finite = np.isfinite(blocks)
+        sums = np.where(finite, blocks, 0).sum(axis=(0, 2))
+        with np.errstate(invalid="ignore"):
+            result[row] = sums / finite.sum(axis=(0, 2))
+    return result
+
+
 def convert_arr_to_thumbnail(
     data: np.ndarray,
     resize_dims: tuple[int, int],
@@ -134,23 +182,67 @@ def convert_arr_to_thumbnail(
     Converts a 2D or 3D NumPy array into a resized PNG-style image.
     Applies a matplotlib colormap if provided.
     """
+    img = convert_arr_to_image(
+        data, resize_dims, mode=mode, cmap=cmap, with_omega_fix=with_omega_fix
+    )
+
+    img = img.resize(resize_dims, Image.Resampling.LANCZOS)
 
-    # Normalizes data between 0 and 1
-    result = np.asarray(data, dtype=float)
+    return img
 
-    result = np.where(np.isinf(result), np.nan, result)
 
-    if np.all(np.isnan(result)):
-        raise ValueError("NaN: array is entirely NaN")
+def convert_arr_to_thumbnails(
+    data: np.ndarray,
+    sizes: Iterable[tuple[int, int]],
+    mode: Literal["L", "RGB", "RGBA"] = "L",
+    cmap: str | None = None,
+    with_omega_fix: bool = False,
+) -> dict[tuple[int, int], Image.Image]:
+    """Converts an array into thumbnails of several sizes, normalizing it once.
+    Each thumbnail is resized from the next larger one.
 
-    result_min = np.nanmin(result)
-    result_max = np.nanmax(result)
-    if np.isnan(result_max) or np.isnan(result_min):
-        raise ValueError(
-            f"Seems like the array's size is NaN (min={result_min}, max={result_max})"
-        )
+    Args:
+        data (np.ndarray): See `convert_arr_to_thumbnail`
+        sizes (Iterable[tuple[int, int]]): (W, H) of the thumbnails
+        mode (Literal["L", "RGB", "RGBA"], optional): _description_. Defaults to "L".
+        cmap (str | None, optional): _description_. Defaults to None.
+        with_omega_fix (bool, optional): _description_. Defaults to False.
+
+    Returns:
+        dict[tuple[int, int], Image.Image]: The thumbnails by size
+    """
+    sizes = sorted(set(sizes), key=lambda dims: dims[0] * dims[1], reverse=True)
+    if not sizes:
+        return {}
 
-    result = (result - result_min) / (result_max - result_min + 1e-8)
+    img = convert_arr_to_image(
+        data, sizes[0], mode=mode, cmap=cmap, with_omega_fix=with_omega_fix
+    )
+    thumbnails = {}
+    for dims in sizes:
+        img = img.resize(dims, Image.Resampling.LANCZOS)
+        thumbnails[dims] = img
+    return thumbnails
+
+
+def convert_arr_to_image(
+    data: np.ndarray,
+    resize_dims: tuple[int, int],
+    mode: Literal["L", "RGB", "RGBA"] = "L",
+    cmap: str | None = None,
+    with_omega_fix: bool = False,
+) -> Image.Image:
+    """Converts a 2D or 3D NumPy array into an image, before it is resized to
+    `resize_dims`.
+
+    The array is only copied once, in float32 and decimated to about twice the
+    resized image (see `decimation_step`); the transpositions and the OMEGA fix
+    are views on the array, and the pixels are written in a single uint8 buffer.
+    The decimation averages the blocks of pixels (see `block_mean`) before the
+    values are normalized, so that no pixel is left out of the thumbnail.
+    """
+
+    result = np.asarray(data)
 
     # Detect channel-first and convert to channel-last
     # Must be H, W, C in this order
@@ -161,37 +253,93 @@ def convert_arr_to_thumbnail(
     ):
         result = np.transpose(result, (1, 2, 0))
 
+    if with_omega_fix:
+        # Rotating by 180° then flipping left to right flips upside down
+        result = result[::-1]
+
+    step = decimation_step(result.shape, resize_dims)
+    if step > 1:
+        result = block_mean(result, step)
+    else:
+        result = np.array(result, dtype=np.float32)
+
+    invalid = ~np.isfinite(result)
+    if invalid.all():
+        raise ValueError("NaN: array is entirely NaN")
+    result[invalid] = np.nan
+
+    # Normalizes data between 0 and 1, or 255 for the pixels
+    result_min = np.nanmin(result)
+    result_max = np.nanmax(result)
+    result -= result_min
+    result *= np.float32(
+        (1 if cmap is not None else 255) / (result_max - result_min + 1e-8)
+    )
+
     if cmap is not None:
         cm = plt.get_cmap(cmap)
-        result = cm(result)[..., :4]  # includes alpha
-        result = (result * 255).astype(np.uint8)
+        # includes alpha, the NaN taking the "bad" color of the colormap
+        pixels = cm(result, bytes=True)
         if mode == "RGB":
-            result = result[..., :3]
+            pixels = pixels[..., :3]
     else:
-        nan_mask = np.isnan(result)  # works for both 2D and 3D
-
-        result = np.where(np.isnan(result), 0.0, result)
-        result = (result * 255).astype(np.uint8)
-
-        if mode in ["RGB", "RGBA"] and result.ndim == 2:
-            if mode == "RGB":
-                result = np.stack([result] * 3, axis=-1)
-            else:  # RGBA
-                rgb = np.stack([result] * 3, axis=-1)
-                alpha = np.where(nan_mask, 0, 255).astype(np.uint8)[..., np.newaxis]
-                result = np.concatenate([rgb, alpha], axis=-1)
-        elif result.ndim == 3 and result.shape[-1] == 3:
-            if mode == "RGBA":
-                alpha = np.where(nan_mask[:, :, 0], 0, 255).astype(np.uint8)[
-                    ..., np.newaxis
-                ]
-                result = np.concatenate([result, alpha], axis=-1)
-
-    img = Image.fromarray(result, mode=mode)
+        # The maximum stays below 255 despite the rounding of float32
+        np.minimum(result, np.nextafter(np.float32(255), np.float32(0)), out=result)
+        result[invalid] = 0.0
+
+        n_channels = {"L": 1, "RGB": 3, "RGBA": 4}[mode]
+        if n_channels == 1:
+            pixels = np.empty(result.shape, dtype=np.uint8)
+            np.copyto(pixels, result, casting="unsafe")
+        else:
+            pixels = np.empty((*result.shape[:2], n_channels), dtype=np.uint8)
+            if result.ndim == 2:
+                np.copyto(pixels[..., :3], result[..., np.newaxis], casting="unsafe")
+            else:
+                np.copyto(pixels[..., : result.shape[-1]], result, casting="unsafe")
 
-    if with_omega_fix:
-        img = img.rotate(180).transpose(Image.FLIP_LEFT_RIGHT)
+            if mode == "RGBA" and (result.ndim == 2 or result.shape[-1] == 3):
+                alpha = pixels[..., 3]
+                alpha.fill(255)
+                alpha[invalid if result.ndim == 2 else invalid[..., 0]] = 0
 
-    img = img.resize(resize_dims, Image.Resampling.LANCZOS)
+    return Image.fromarray(pixels, mode=mode)
 
-    return img
+
+def save_image(img: Image.Image, location: Path, fmt: str = "png"):
+    """Saves an image aside then moves it, so that it's never left half written
+
+    Args:
+        img (Image.Image): _description_
+        location (Path): _description_
+        fmt (str, optional): Any format known to Pillow. Defaults to "png".
+    """
+    tmp_location = location.with_name(f"{location.name}.{os.getpid()}.tmp")
+    try:
+        img.save(tmp_location, format=fmt)
+        os.replace(tmp_location, location)
+    finally:
+        tmp_location.unlink(missing_ok=True)
+
+
+def save_images(images: dict[Path, Image.Image], fmt: str = "png"):
+    """Encodes and saves images in parallel threads (see `save_image`)
+
+    Args:
+        images (dict[Path, Image.Image]): The images by location
+        fmt (str, optional): _description_. Defaults to "png".
+    """
+    if len(images) <= 1:
+        for location, img in images.items():
+            save_image(img, location, fmt=fmt)
+        return
+
+    with ThreadPoolExecutor(
+        max_workers=len(images), thread_name_prefix="save-image"
+    ) as executor:
+        futures = [
+            executor.submit(save_image, img, location, fmt)
+            for location, img in images.items()
+        ]
+        for future in futures:
+            future.result()
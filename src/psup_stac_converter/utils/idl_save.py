@@ -0,0 +1,250 @@
+import io
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable
+
+import numpy as np
+
+from psup_stac_converter.exceptions import IdlSaveFormatError
+
+# Record types, see `scipy.io._idl.RECTYPE_DICT`
+VARIABLE_RECORD = 2
+END_MARKER_RECORD = 6
+
+# IDL type codes of the values stored as plain bytes
+NUMERIC_DTYPES = {
+    1: ">u1",
+    2: ">i2",
+    3: ">i4",
+    4: ">f4",
+    5: ">f8",
+    6: ">c8",
+    9: ">c16",
+    12: ">u2",
+    13: ">u4",
+    14: ">i8",
+    15: ">u8",
+}
+STRING_TYPECODE = 7
+# Structures, pointers and object references need the rest of the file
+UNSUPPORTED_TYPECODES = {8: "structure", 10: "pointer", 11: "object reference"}
+
+# More than enough for the name of a variable (128 characters at most)
+NAME_HEAD_SIZE = 1024
+
+
+class _RecordBuffer:
+    """Reads the content of a record, aligned on 32 bits like the rest of the file"""
+
+    def __init__(self, content: bytes, offset: int = 0):
+        self._content = io.BytesIO(content)
+        # Position of the content in the file
+        self._offset = offset
+
+    def read(self, n: int) -> bytes:
+        data = self._content.read(n)
+        if len(data) < n:
+            raise IdlSaveFormatError("Record ended unexpectedly")
+        return data
+
+    def read_long(self) -> int:
+        return struct.unpack(">l", self.read(4))[0]
+
+    def read_uint64(self) -> int:
+        return struct.unpack(">Q", self.read(8))[0]
+
+    def align(self):
+        position = self._offset + self._content.tell()
+        if position % 4 != 0:
+            self._content.seek(4 - position % 4, io.SEEK_CUR)
+
+    def read_string(self) -> str:
+        length = self.read_long()
+        if length <= 0:
+            return ""
+        chars = self.read(length).decode("latin1")
+        self.align()
+        return chars
+
+    def read_string_data(self) -> bytes | str:
+        # Same as scipy: bytes, or an empty str for an empty string
+        if self.read_long() <= 0:
+            return ""
+        string_data = self.read(self.read_long())
+        self.align()
+        return string_data
+
+    def read_array_desc(self) -> dict[str, Any]:
+        arrstart = self.read_long()
+        if arrstart == 8:
+            self.read(4)
+            nbytes = self.read_long()
+            nelements = self.read_long()
+            ndims = self.read_long()
+            self.read(8)
+            nmax = self.read_long()
+            dims = [self.read_long() for _ in range(nmax)]
+        elif arrstart == 18:
+            # 64-bit array
+            self.read(8)
+            nbytes = self.read_uint64()
+            nelements = self.read_uint64()
+            ndims = self.read_long()
+            self.read(8)
+            dims = []
+            for _ in range(8):
+                self.read_long()
+                dims.append(self.read_long())
+        else:
+            raise IdlSaveFormatError(f"Unknown ARRSTART: {arrstart}")
+        return {"nbytes": nbytes, "nelements": nelements, "ndims": ndims, "dims": dims}
+
+    def read_scalar(self, typecode: int) -> Any:
+        if typecode == STRING_TYPECODE:
+            return self.read_string_data()
+        if typecode == 1:
+            if self.read_long() != 1:
+                raise IdlSaveFormatError("Error occurred while reading byte variable")
+            return np.frombuffer(self.read(4)[:1], dtype=">u1")[0]
+        if typecode in (2, 12):
+            # Stored on 4 bytes
+            return np.frombuffer(self.read(4)[2:], dtype=NUMERIC_DTYPES[typecode])[0]
+        dtype = np.dtype(NUMERIC_DTYPES[typecode])
+        return np.frombuffer(self.read(dtype.itemsize), dtype=dtype)[0]
+
+    def read_array(self, typecode: int, array_desc: dict[str, Any]) -> np.ndarray:
+        nbytes = array_desc["nbytes"]
+        if typecode == STRING_TYPECODE:
+            array = np.array(
+                [self.read_string_data() for _ in range(array_desc["nelements"])],
+                dtype=np.object_,
+            )
+        elif typecode in (2, 12):
+            # Each value is padded to 4 bytes
+            array = np.frombuffer(
+                self.read(nbytes * 2), dtype=NUMERIC_DTYPES[typecode]
+            )[1::2]
+        else:
+            if typecode == 1:
+                self.read_long()
+            array = np.frombuffer(self.read(nbytes), dtype=NUMERIC_DTYPES[typecode])
+
+        if array_desc["ndims"] > 1:
+            array = array.reshape(array_desc["dims"][: array_desc["ndims"]][::-1])
+        self.align()
+        return array
+
+    def read_variable(self, variable_name: str) -> Any:
+        """Decodes the value of a variable, its name already read"""
+        typecode = self.read_long()
+        varflags = self.read_long()
+        if varflags & 2:
+            raise IdlSaveFormatError(f"{variable_name} is a system variable")
+        if varflags & 32 or typecode in UNSUPPORTED_TYPECODES:
+            raise IdlSaveFormatError(
+                f"{variable_name} is a {UNSUPPORTED_TYPECODES.get(typecode, 'structure')}, which can't be read on its own"
+            )
+        if typecode == 0:
+            return None
+        if typecode != STRING_TYPECODE and typecode not in NUMERIC_DTYPES:
+            raise IdlSaveFormatError(f"Unknown IDL type: {typecode}")
+
+        array_desc = self.read_array_desc() if varflags & 4 else None
+        if self.read_long() != 7:
+            raise IdlSaveFormatError("VARSTART is not 7")
+        if array_desc is not None:
+            return self.read_array(typecode, array_desc)
+        return self.read_scalar(typecode)
+
+
+def _inflate(sav_f: BinaryIO, n_compressed: int, max_size: int | None = None) -> bytes:
+    """Decompresses a record from the current position, only its first `max_size`
+    bytes if given"""
+    decompressor = zlib.decompressobj()
+    content = bytearray()
+    chunk_size = 1 << 16
+    while n_compressed > 0 and (max_size is None or len(content) < max_size):
+        chunk = sav_f.read(min(chunk_size, n_compressed))
+        if not chunk:
+            break
+        n_compressed -= len(chunk)
+        if max_size is None:
+            content += decompressor.decompress(chunk)
+        else:
+            # The rest of the chunk is left compressed
+            content += decompressor.decompress(chunk, max_size - len(content))
+    if max_size is None:
+        content += decompressor.flush()
+    return bytes(content)
+
+
+def read_sav_variables(
+    file_path: Path, variable_names: Iterable[str]
+) -> dict[str, Any]:
+    """Reads some variables of an IDL .sav file, without loading the others.
+
+    The records of the file are walked through and the ones of other variables are
+    skipped by their offset, compressed or not. The file is only read until all the
+    variables are found. Values are the same as with `scipy.io.readsav`, except that
+    structures and pointers aren't supported.
+
+    Args:
+        file_path (Path): _description_
+        variable_names (Iterable[str]): The variables to read, case-insensitive
+
+    Raises:
+        IdlSaveFormatError: If the file isn't a valid IDL .sav file, or if one of the
+        variables can't be decoded on its own
+
+    Returns:
+        dict[str, Any]: The values by lowercase variable name, for the variables
+        found in the file
+    """
+    wanted = {variable_name.lower() for variable_name in variable_names}
+    variables = {}
+
+    with open(file_path, "rb") as sav_f:
+        signature = sav_f.read(2)
+        if signature != b"SR":
+            raise IdlSaveFormatError(f"Invalid SIGNATURE: {signature}")
+        recfmt = sav_f.read(2)
+        if recfmt not in (b"\x00\x04", b"\x00\x06"):
+            raise IdlSaveFormatError(f"Invalid RECFMT: {recfmt}")
+        is_compressed = recfmt == b"\x00\x06"
+
+        while len(variables) < len(wanted):
+            header = sav_f.read(16)
+            if len(header) < 16:
+                raise IdlSaveFormatError(f"{file_path} ended before its END_MARKER")
+            rectype, nextrec_low, nextrec_high = struct.unpack(">lII", header[:12])
+            nextrec = nextrec_low + (nextrec_high << 32)
+            if rectype == END_MARKER_RECORD:
+                break
+            if rectype != VARIABLE_RECORD:
+                sav_f.seek(nextrec)
+                continue
+
+            content_start = sav_f.tell()
+            content_size = nextrec - content_start
+            if is_compressed:
+                head = _RecordBuffer(_inflate(sav_f, content_size, NAME_HEAD_SIZE))
+            else:
+                head = _RecordBuffer(
+                    sav_f.read(min(content_size, NAME_HEAD_SIZE)), offset=content_start
+                )
+            variable_name = head.read_string().lower()
+
+            if variable_name in wanted:
+                sav_f.seek(content_start)
+                if is_compressed:
+                    record = _RecordBuffer(_inflate(sav_f, content_size))
+                else:
+                    record = _RecordBuffer(
+                        sav_f.read(content_size), offset=content_start
+                    )
+                record.read_string()
+                variables[variable_name] = record.read_variable(variable_name)
+            sav_f.seek(nextrec)
+
+    return variables
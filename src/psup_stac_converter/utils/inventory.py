@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from psup_stac_converter.settings import create_logger
+
+log = create_logger(__name__)
+
+SIZE_UNITS = ["", "Ki", "Mi", "Gi", "Ti", "Ei"]
+# Derived from the relative path, with few distinct values
+CATEGORICAL_COLUMNS = ["extension", "category", "root"]
+SIDECAR_METADATA_KEY = b"psup_inventory"
+
+
+def sizeof_fmt(num: int, suffix: str = "B") -> str:
+    for unit in SIZE_UNITS[:-1]:
+        if abs(num) < 1024.0:
+            return f"{num:3.1f} {unit}{suffix}"
+        num /= 1024.0
+    return f"{num:.1f} {SIZE_UNITS[-1]}{suffix}"
+
+
+def sizeof_fmt_series(sizes: pd.Series, suffix: str = "B") -> pd.Series:
+    """Vectorized `sizeof_fmt`, giving the same strings"""
+    values = sizes.to_numpy(dtype=float)
+    exponents = np.zeros(values.shape, dtype=int)
+    for power in range(1, len(SIZE_UNITS)):
+        exponents += np.abs(values) >= 1024.0**power
+    # Dividing by powers of 2 is exact, as with the successive divisions
+    scaled = values / np.power(1024.0, exponents)
+    units = np.array([f"{unit}{suffix}" for unit in SIZE_UNITS])[exponents]
+    formatted = np.char.add(np.char.add(np.char.mod("%3.1f", scaled), " "), units)
+    return pd.Series(formatted, index=sizes.index, dtype=str)
+
+
+def derive_inventory_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Sorts the inventory and adds the columns derived from the size and the
+    relative path of the files.
+
+    Args:
+        df (pd.DataFrame): The raw inventory, with `total_size` and `rel_path` columns
+
+    Returns:
+        pd.DataFrame: _description_
+    """
+    df = df.sort_values(by=["total_size", "rel_path"], ascending=False)
+    df["h_total_size"] = sizeof_fmt_series(df["total_size"])
+    # Same as Path.suffix: the last dot of the file name, if not leading nor trailing
+    df["extension"] = (
+        df["rel_path"].str.extract(r"[^/]+\.([^./]+)$", expand=False).fillna("")
+    )
+    path_parts = df["rel_path"].str.split("/", n=2, expand=True)
+    df["category"] = path_parts[0]
+    df["root"] = path_parts[1]
+    return df.astype({column: "category" for column in CATEGORICAL_COLUMNS})
+
+
+def _sidecar_path(csv_path: Path) -> Path:
+    return csv_path.with_name(f"{csv_path.name}.parquet")
+
+
+def _file_hash(file_path: Path) -> str:
+    with open(file_path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def _read_sidecar(csv_path: Path) -> pd.DataFrame | None:
+    sidecar_path = _sidecar_path(csv_path)
+    if not sidecar_path.exists():
+        return None
+
+    schema_metadata = pq.read_schema(sidecar_path).metadata or {}
+    if SIDECAR_METADATA_KEY not in schema_metadata:
+        return None
+    source = json.loads(schema_metadata[SIDECAR_METADATA_KEY])
+    csv_stat = csv_path.stat()
+    unchanged = (
+        source["mtime_ns"] == csv_stat.st_mtime_ns
+        and source["size"] == csv_stat.st_size
+    )
+    # A touched file with the same content is still valid
+    if not unchanged and source["sha256"] != _file_hash(csv_path):
+        log.debug(f"{csv_path} changed since {sidecar_path} was written")
+        return None
+    return pq.read_table(sidecar_path).to_pandas()
+
+
+def _write_sidecar(csv_path: Path, df: pd.DataFrame):
+    csv_stat = csv_path.stat()
+    source = {
+        "mtime_ns": csv_stat.st_mtime_ns,
+        "size": csv_stat.st_size,
+        "sha256": _file_hash(csv_path),
+    }
+    table = pa.Table.from_pandas(df)
+    table = table.replace_schema_metadata(
+        {**table.schema.metadata, SIDECAR_METADATA_KEY: json.dumps(source)}
+    )
+
+    sidecar_path = _sidecar_path(csv_path)
+    tmp_path = sidecar_path.with_name(f"{sidecar_path.name}.{os.getpid()}.tmp")
+    try:
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, sidecar_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def load_inventory(csv_path: Path, use_sidecar: bool = True) -> pd.DataFrame:
+    """Opens the inventory of the PSUP files, with its derived columns.
+
+    The result is kept in a Parquet file next to the CSV (`<name>.csv.parquet`),
+    used as long as the CSV doesn't change.
+
+    Args:
+        csv_path (Path): The inventory, as produced by `psup-scraper get-data-ref`
+        use_sidecar (bool, optional): Whether the Parquet file is read and written.
+        Defaults to True.
+
+    Returns:
+        pd.DataFrame: _description_
+    """
+    if use_sidecar:
+        try:
+            df = _read_sidecar(csv_path)
+        except (OSError, ValueError) as e:
+            log.warning(f"Couldn't read the cached inventory of {csv_path}: {e}")
+            df = None
+        if df is not None:
+            log.debug(f"Inventory loaded from {_sidecar_path(csv_path)}")
+            return df
+
+    df = derive_inventory_columns(pd.read_csv(csv_path))
+
+    if use_sidecar:
+        try:
+            _write_sidecar(csv_path, df)
+        except OSError as e:
+            log.warning(f"Couldn't cache the inventory of {csv_path}: {e}")
+    return df
+
+
+# What tells that a file changed between two inventories, `rel_path` identifying it
+DIFF_COLUMNS = ["rel_path", "total_size", "href"]
+
+
+class InventoryDiff(NamedTuple):
+    """Relative paths of the files added, changed and removed between two
+    inventories"""
+
+    added: list[str]
+    changed: list[str]
+    removed: list[str]
+
+    @property
+    def rel_paths(self) -> list[str]:
+        return self.added + self.changed + self.removed
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+
+def diff_inventories(previous: pd.DataFrame, current: pd.DataFrame) -> InventoryDiff:
+    """Compares two inventories by `DIFF_COLUMNS`: a file is changed if its size or
+    its href differs.
+
+    Args:
+        previous (pd.DataFrame): _description_
+        current (pd.DataFrame): _description_
+
+    Returns:
+        InventoryDiff: _description_
+    """
+    merged = pd.merge(
+        previous[DIFF_COLUMNS],
+        current[DIFF_COLUMNS],
+        on="rel_path",
+        how="outer",
+        suffixes=("_previous", "_current"),
+        indicator=True,
+    )
+    in_both = merged["_merge"] == "both"
+    is_changed = in_both & (
+        (merged["total_size_previous"] != merged["total_size_current"])
+        | (merged["href_previous"] != merged["href_current"])
+    )
+    return InventoryDiff(
+        added=sorted(merged.loc[merged["_merge"] == "right_only", "rel_path"]),
+        changed=sorted(merged.loc[is_changed, "rel_path"]),
+        removed=sorted(merged.loc[merged["_merge"] == "left_only", "rel_path"]),
+    )
+
+
+def save_inventory_snapshot(df: pd.DataFrame, snapshot_path: Path):
+    """Keeps the columns of an inventory compared by `diff_inventories`"""
+    tmp_path = snapshot_path.with_name(f"{snapshot_path.name}.{os.getpid()}.tmp")
+    try:
+        df[DIFF_COLUMNS].sort_values("rel_path").to_csv(tmp_path, index=False)
+        os.replace(tmp_path, snapshot_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def load_inventory_snapshot(snapshot_path: Path) -> pd.DataFrame:
+    return pd.read_csv(snapshot_path, usecols=DIFF_COLUMNS)
@@ -1,9 +1,9 @@
 import datetime as dt
 import logging
-import re
 from pathlib import Path
 from typing import Any, Iterator, Literal
 
+import httpx
 import pandas as pd
 from pydantic import BaseModel, HttpUrl
 from rich.console import Console
@@ -11,6 +11,7 @@ from rich.tree import Tree
 
 from psup_stac_converter.exceptions import FolderNotEmptyError, ValueNotAcceptedError
 from psup_stac_converter.settings import Settings, create_logger
+from psup_stac_converter.utils.cache import ResourceCache
 from psup_stac_converter.utils.downloader import Downloader, MemoryManager, PsupArchive
 from psup_stac_converter.utils.formatting import walk_directory
 
@@ -106,11 +107,16 @@ class IoHandler:
         walk_directory(self.output_folder, tree)
         console.print(tree)
 
+    @property
+    def http_client(self) -> httpx.Client | None:
+        """The HTTP client shared by the downloads, if the handler has one"""
+        return None
+
     def download_data(self, file_path: str):
         """Note: this is not used anywhere for now"""
         if not self.is_input_folder_empty():
             raise FolderNotEmptyError("The input folder is not empty!")
-        downloader = Downloader(file_path)
+        downloader = Downloader(file_path, client=self.http_client)
         downloader.local_download(output_folder=self.input_folder)
 
     def all_input_files_from_ext(self, extension: str) -> Iterator[Path]:
@@ -142,17 +148,51 @@ class PsupIoHandler(IoHandler):
         input_folder=None,
         output_folder=None,
         memory_manager: MemoryManager | None = None,
+        cache: ResourceCache | None = None,
+        segment_threshold: int | None = None,
+        n_segments: int = 4,
+        http_client: httpx.Client | None = None,
+        http_options: dict[str, Any] | None = None,
     ):
         super().__init__(input_folder, output_folder)
-        self.psup_archive = PsupArchive(archive_file)
+        self.psup_archive = PsupArchive(
+            archive_file,
+            cache=cache,
+            segment_threshold=segment_threshold,
+            n_segments=n_segments,
+            client=http_client,
+            client_options=http_options,
+        )
         if memory_manager is None:
             self.memory_manager = MemoryManager(log=self.log)
         else:
             self.memory_manager = memory_manager
 
-    def save_all(self, auto_valid: bool = False, raise_on_exists: bool = False):
+    @property
+    def http_client(self) -> httpx.Client:
+        return self.psup_archive.client
+
+    def close(self):
+        """Releases the connections to PSUP. Call it at the end of a run."""
+        self.psup_archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def save_all(
+        self,
+        auto_valid: bool = False,
+        raise_on_exists: bool = False,
+        max_concurrency: int = 8,
+    ):
         self.psup_archive.save_all_on_disk(
-            self.output_folder, auto_valid=auto_valid, raise_on_exists=raise_on_exists
+            self.output_folder,
+            auto_valid=auto_valid,
+            raise_on_exists=raise_on_exists,
+            max_concurrency=max_concurrency,
         )
 
     def save_files(
@@ -160,12 +200,14 @@ class PsupIoHandler(IoHandler):
         file_names: list[str],
         auto_valid: bool = False,
         raise_on_exists: bool = False,
+        max_concurrency: int = 8,
     ):
         self.psup_archive.save_slice_on_disk(
             self.output_folder,
             filters=[("file_name", file_names)],
             auto_valid=auto_valid,
             raise_on_exists=raise_on_exists,
+            max_concurrency=max_concurrency,
         )
 
     def save_file(
@@ -182,13 +224,11 @@ class PsupIoHandler(IoHandler):
         Returns:
             tuple[Path, bool]: The path of the file and whether it exists or not
         """
-        archive_slice = self.psup_archive.slice_by_one(
-            by="file_name", criteria="^" + re.escape(file_name) + "$", set_regex=True
-        )
-        if archive_slice is None:
+        row = self.psup_archive.find_by_file_name(file_name)
+        if row is None:
             raise ValueError(f"The archive has no file named {file_name} in it.")
 
-        rel_path = archive_slice.iloc[0]["rel_path"]
+        rel_path = row["rel_path"]
         full_path = self.output_folder / Path(rel_path)
         return full_path, full_path.exists()
 
@@ -200,14 +240,18 @@ class PsupIoHandler(IoHandler):
         return fp_on_disk
 
     def find_file_remote_path(self, file_name: str) -> HttpUrl:
-        slice = self.psup_archive.slice_by_one("file_name", file_name)
-        if slice is None:
+        row = self.psup_archive.find_by_file_name(file_name)
+        if row is None:
             raise ValueError(f"Couldn't find any data with file name {file_name}")
 
-        slice = slice.drop_duplicates(subset=["file_name"]).squeeze()
-        server_ref = slice["href"]
+        server_ref = row["href"]
         return HttpUrl(url=server_ref)
 
+    @property
+    def inventory(self) -> pd.DataFrame:
+        """The inventory of the PSUP files"""
+        return self.psup_archive.psup_archive
+
     def get_omega_data(
         self, data_type: Literal["data_cubes_slice", "c_channel_slice"]
     ) -> pd.DataFrame:
@@ -222,7 +266,13 @@ class PsupIoHandler(IoHandler):
         return self.psup_archive.get_omega_data(data_type=data_type)
 
     def check_memory(self) -> dict[str, Any] | None:
-        self.memory_manager.check()
+        return self.memory_manager.check()
+
+    def cache_stats(self) -> dict[str, Any] | None:
+        """Hit/miss statistics of the resource cache, if any"""
+        if self.psup_archive.cache is None:
+            return None
+        return self.psup_archive.cache.stats
 
 
 class WktIoHandler:
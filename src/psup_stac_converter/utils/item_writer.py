@@ -0,0 +1,189 @@
+import datetime as dt
+import logging
+from pathlib import Path
+from typing import NamedTuple
+from urllib.parse import urlsplit
+
+import pystac
+from pystac.layout import BestPracticesLayoutStrategy, HrefLayoutStrategy
+from pystac.stac_io import StacIO
+
+from psup_stac_converter.settings import create_logger
+
+
+class ItemStub(NamedTuple):
+    """What remains of an item once written: enough for the links and the extents
+    of its collection"""
+
+    id: str
+    href: str | None
+    bbox: list[float] | None
+    datetime: dt.datetime | None
+
+    @classmethod
+    def from_item(cls, item: pystac.Item) -> "ItemStub":
+        return cls(
+            id=item.id,
+            href=item.get_self_href(),
+            bbox=item.bbox,
+            datetime=item.datetime,
+        )
+
+
+def spatial_extent_of(item_stubs: list[ItemStub]) -> pystac.SpatialExtent:
+    """Smallest bounding box holding all the items
+
+    Args:
+        item_stubs (list[ItemStub]): _description_
+
+    Returns:
+        pystac.SpatialExtent: _description_
+    """
+    bboxes = [stub.bbox for stub in item_stubs if stub.bbox is not None]
+    return pystac.SpatialExtent(
+        bboxes=[
+            [
+                min(bbox[0] for bbox in bboxes),
+                min(bbox[1] for bbox in bboxes),
+                max(bbox[2] for bbox in bboxes),
+                max(bbox[3] for bbox in bboxes),
+            ]
+        ]
+    )
+
+
+def temporal_extent_of(item_stubs: list[ItemStub]) -> pystac.TemporalExtent:
+    """Interval going from the first to the last item
+
+    Args:
+        item_stubs (list[ItemStub]): _description_
+
+    Returns:
+        pystac.TemporalExtent: _description_
+    """
+    datetimes = [stub.datetime for stub in item_stubs if stub.datetime is not None]
+    return pystac.TemporalExtent(
+        intervals=[[min(datetimes, key=_as_utc), max(datetimes, key=_as_utc)]]
+    )
+
+
+def _as_utc(datetime: dt.datetime) -> dt.datetime:
+    """Naive datetimes are in UTC, as when pystac writes them. The ones of an
+    extent read from a file aren't naive."""
+    if datetime.tzinfo is None:
+        return datetime.replace(tzinfo=dt.UTC)
+    return datetime
+
+
+def stubs_of_extent(extent: pystac.Extent) -> list[ItemStub]:
+    """Stubs spanning an extent, so that the extent of a collection can be widened
+    to new items with `spatial_extent_of` and `temporal_extent_of`"""
+    return [
+        ItemStub(id="", href=None, bbox=bbox, datetime=datetime)
+        for bbox in extent.spatial.bboxes[:1]
+        for datetime in extent.temporal.intervals[0]
+    ]
+
+
+class ItemChanges(NamedTuple):
+    """IDs of the items of a collection created, updated and deleted by a run"""
+
+    created: list[str]
+    updated: list[str]
+    deleted: list[str]
+
+
+def item_links_by_id(collection: pystac.Collection) -> dict[str, pystac.Link]:
+    """The item links of a collection by item ID. The IDs of the items that aren't
+    loaded are taken from their file name, as laid out by `Catalog.normalize_hrefs`
+    (`<collection>/<id>/<id>.json`), so that they don't have to be read.
+
+    Args:
+        collection (pystac.Collection): _description_
+
+    Returns:
+        dict[str, pystac.Link]: _description_
+    """
+    links = {}
+    for link in collection.get_item_links():
+        if link.is_resolved():
+            item_id = link.target.id
+        else:
+            item_id = Path(urlsplit(link.get_absolute_href()).path).stem
+        links[item_id] = link
+    return links
+
+
+def delete_item_file(item_link: pystac.Link):
+    """Deletes the file of an item, its compressed copy, and its folder if left
+    empty"""
+    item_file = Path(urlsplit(item_link.get_absolute_href()).path)
+    item_file.unlink(missing_ok=True)
+    item_file.with_name(f"{item_file.name}.gz").unlink(missing_ok=True)
+    if item_file.parent.exists() and not any(item_file.parent.iterdir()):
+        item_file.parent.rmdir()
+
+
+class StreamingItemWriter:
+    """Writes the items of a catalog to their final location as soon as they are
+    created, instead of keeping them in memory until the catalog is saved.
+
+    The collections only keep a link to the written items, which `Catalog.save`
+    leaves as is. The hrefs follow the layout `Catalog.normalize_hrefs` would give
+    them, so the catalog must have its self href and its type set beforehand.
+    """
+
+    def __init__(
+        self,
+        catalog: pystac.Catalog,
+        strategy: HrefLayoutStrategy | None = None,
+        stac_io: StacIO | None = None,
+        log: logging.Logger | None = None,
+    ):
+        """
+        Args:
+            catalog (pystac.Catalog): The root catalog
+            strategy (HrefLayoutStrategy | None, optional): _description_. Defaults
+            to the STAC best practices.
+            stac_io (StacIO | None, optional): Writes the items, like the rest of
+            the catalog. Defaults to the one of pystac.
+            log (logging.Logger | None, optional): _description_. Defaults to None.
+        """
+        if catalog.get_self_href() is None:
+            raise ValueError(f"Catalog {catalog.id} has no self href to write from")
+        self.catalog = catalog
+        self.strategy = strategy or BestPracticesLayoutStrategy()
+        self.stac_io = stac_io
+        if log is None:
+            self.log = create_logger(__name__)
+        else:
+            self.log = log
+
+    def attach(self, collection: pystac.Collection):
+        """Gives the collection its final href, before its items are written"""
+        collection.set_root(self.catalog)
+        collection.set_self_href(
+            self.strategy.get_href(collection, self.catalog.self_href)
+        )
+
+    def write(self, collection: pystac.Collection, item: pystac.Item) -> ItemStub:
+        """Adds the item to an attached collection and writes it on the disk.
+
+        Returns:
+            ItemStub: The item as kept by the collection
+        """
+        # Set before the item gets cached by the root, under its href then
+        item.set_self_href(self.strategy.get_href(item, collection.self_href))
+        item_link = collection.add_item(item, strategy=self.strategy)
+        item.save_object(
+            include_self_link=self.catalog.catalog_type
+            == pystac.CatalogType.ABSOLUTE_PUBLISHED,
+            stac_io=self.stac_io,
+        )
+        item_stub = ItemStub.from_item(item)
+        self.log.debug(f"Item {item.id} written to {item_stub.href}")
+
+        # Nothing should hold the item anymore, including the cache of the root
+        item.set_root(None)
+        item_link.target = item_stub.href
+        return item_stub
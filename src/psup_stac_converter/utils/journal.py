@@ -0,0 +1,93 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, TextIO
+
+import pystac
+
+from psup_stac_converter.settings import create_logger
+
+
+class ItemJournal:
+    """Append-only record of the items created during a run, one JSON line per
+    item, so that an interrupted run can start again from where it stopped.
+
+    Each line is written and synced to the disk as soon as its item is created. A
+    line cut by a crash is ignored when the journal is read back.
+    """
+
+    def __init__(
+        self,
+        journal_path: Path,
+        resume: bool = False,
+        log: logging.Logger | None = None,
+    ):
+        """
+        Args:
+            journal_path (Path): _description_
+            resume (bool, optional): Keeps the items of the previous run. The
+            journal is started over otherwise. Defaults to False.
+            log (logging.Logger | None, optional): _description_. Defaults to None.
+        """
+        self.journal_path = journal_path
+        if log is None:
+            self.log = create_logger(__name__)
+        else:
+            self.log = log
+
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        if not resume:
+            self.journal_path.unlink(missing_ok=True)
+        self._journal_f: TextIO | None = None
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_journal_f"] = None
+        return state
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def load(self) -> dict[str, pystac.Item]:
+        """Reads the items recorded so far.
+
+        Returns:
+            dict[str, pystac.Item]: The items by ID, in the order they were recorded
+        """
+        items = {}
+        if not self.journal_path.exists():
+            return items
+
+        with open(self.journal_path, "r", encoding="utf-8") as journal_f:
+            for line_number, line in enumerate(journal_f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    item = pystac.Item.from_dict(json.loads(line))
+                except (ValueError, KeyError, TypeError) as e:
+                    self.log.warning(
+                        f"Ignoring line {line_number} of {self.journal_path}: {e}"
+                    )
+                    continue
+                items[item.id] = item
+        return items
+
+    def record(self, item: pystac.Item):
+        """Appends an item to the journal, on the disk once the call returns"""
+        if self._journal_f is None:
+            self._journal_f = open(self.journal_path, "a", encoding="utf-8")
+            # Don't glue the first record to a line cut by a crash
+            if self._journal_f.tell() > 0:
+                self._journal_f.write("\n")
+        self._journal_f.write(json.dumps(item.to_dict(include_self_link=False)) + "\n")
+        self._journal_f.flush()
+        os.fsync(self._journal_f.fileno())
+
+    def close(self):
+        if self._journal_f is not None:
+            self._journal_f.close()
+            self._journal_f = None
@@ -0,0 +1,230 @@
+import datetime as dt
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Iterable
+
+from psup_stac_converter.settings import create_logger
+
+SCHEMA_VERSION = 1
+
+
+class MetadataStore:
+    """Embedded store of the metadata extracted from the OMEGA files, so that they
+    are only opened once over several runs.
+
+    Entries are JSON documents identified by a kind (eg. `l2_sav`, `l3_nc`) and an
+    orbit/cube ID. The store is a SQLite database in WAL mode, which can be shared
+    by several processes.
+    """
+
+    def __init__(self, db_path: Path, log: logging.Logger | None = None):
+        self.db_path = db_path
+        if log is None:
+            self.log = create_logger(__name__)
+        else:
+            self.log = log
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._init_schema()
+
+    def __getstate__(self) -> dict[str, Any]:
+        # A connection can't be sent to another process, which opens its own
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["_conn"] = None
+        return state
+
+    def __setstate__(self, state: dict[str, Any]):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(
+                self.db_path, timeout=30.0, check_same_thread=False
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        return self._conn
+
+    def _init_schema(self):
+        with self._lock, self.conn as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS store_info (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS metadata (
+                    kind TEXT NOT NULL,
+                    orbit_cube_idx TEXT NOT NULL,
+                    info TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (kind, orbit_cube_idx)
+                )"""
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO store_info VALUES ('schema_version', ?)",
+                (str(SCHEMA_VERSION),),
+            )
+            (version,) = conn.execute(
+                "SELECT value FROM store_info WHERE key = 'schema_version'"
+            ).fetchone()
+        if int(version) != SCHEMA_VERSION:
+            raise RuntimeError(
+                f"{self.db_path} has the schema version {version}, {SCHEMA_VERSION} was expected"
+            )
+
+    def get(self, kind: str, orbit_cube_idx: str) -> dict[str, Any] | None:
+        """Gets the metadata of a cube.
+
+        Returns:
+            dict[str, Any] | None: The metadata, None if it wasn't stored
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT info FROM metadata WHERE kind = ? AND orbit_cube_idx = ?",
+                (kind, orbit_cube_idx),
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def get_many(
+        self, kind: str, orbit_cube_ids: Iterable[str] | None = None
+    ) -> dict[str, dict[str, Any]]:
+        """Gets the metadata of several cubes at once.
+
+        Args:
+            kind (str): _description_
+            orbit_cube_ids (Iterable[str] | None, optional): The cubes to look for,
+            all the cubes of this kind if None. Defaults to None.
+
+        Returns:
+            dict[str, dict[str, Any]]: The metadata by orbit/cube ID, for the cubes
+            found in the store
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT orbit_cube_idx, info FROM metadata WHERE kind = ?", (kind,)
+            ).fetchall()
+        if orbit_cube_ids is not None:
+            wanted = set(orbit_cube_ids)
+            rows = [row for row in rows if row[0] in wanted]
+        return {orbit_cube_idx: json.loads(info) for orbit_cube_idx, info in rows}
+
+    def put(
+        self,
+        kind: str,
+        orbit_cube_idx: str,
+        info: dict[str, Any],
+        encoder: type[json.JSONEncoder] | None = None,
+    ):
+        """Saves the metadata of a cube, replacing the previous one.
+
+        Args:
+            kind (str): _description_
+            orbit_cube_idx (str): _description_
+            info (dict[str, Any]): _description_
+            encoder (type[json.JSONEncoder] | None, optional): Serializes the objects
+            that aren't JSON types. Defaults to None.
+        """
+        self.put_many(kind, {orbit_cube_idx: info}, encoder=encoder)
+
+    def put_many(
+        self,
+        kind: str,
+        infos: dict[str, dict[str, Any]],
+        encoder: type[json.JSONEncoder] | None = None,
+        replace: bool = True,
+    ) -> int:
+        """Saves the metadata of several cubes in a single transaction.
+
+        Args:
+            kind (str): _description_
+            infos (dict[str, dict[str, Any]]): The metadata by orbit/cube ID
+            encoder (type[json.JSONEncoder] | None, optional): Serializes the objects
+            that aren't JSON types. Defaults to None.
+            replace (bool, optional): Whether existing entries are replaced or kept.
+            Defaults to True.
+
+        Returns:
+            int: The number of entries written
+        """
+        updated_at = dt.datetime.now(dt.UTC).isoformat()
+        rows = [
+            (kind, orbit_cube_idx, json.dumps(info, cls=encoder), updated_at)
+            for orbit_cube_idx, info in infos.items()
+        ]
+        with self._lock, self.conn as conn:
+            cursor = conn.executemany(
+                f"INSERT OR {'REPLACE' if replace else 'IGNORE'} INTO metadata VALUES (?, ?, ?, ?)",
+                rows,
+            )
+        return cursor.rowcount
+
+    def delete(self, kind: str, orbit_cube_idx: str):
+        with self._lock, self.conn as conn:
+            conn.execute(
+                "DELETE FROM metadata WHERE kind = ? AND orbit_cube_idx = ?",
+                (kind, orbit_cube_idx),
+            )
+
+    def count(self, kind: str) -> int:
+        with self._lock:
+            (n_entries,) = self.conn.execute(
+                "SELECT COUNT(*) FROM metadata WHERE kind = ?", (kind,)
+            ).fetchone()
+        return n_entries
+
+    def import_json_folder(self, kind: str, folder: Path, file_prefix: str) -> int:
+        """Moves the metadata saved as one JSON file per cube into the store, once
+        per folder. Entries already in the store are kept. The folder is left as is.
+
+        Args:
+            kind (str): _description_
+            folder (Path): Holds files named `<file_prefix><orbit_cube_idx>.json`
+            file_prefix (str): _description_
+
+        Returns:
+            int: The number of imported entries
+        """
+        migration_key = f"migrated:{kind}:{folder.resolve()}"
+        with self._lock:
+            done = self.conn.execute(
+                "SELECT 1 FROM store_info WHERE key = ?", (migration_key,)
+            ).fetchone()
+        if done is not None or not folder.is_dir():
+            return 0
+
+        infos = {}
+        for json_file in folder.glob(f"{file_prefix}*.json"):
+            try:
+                info = json.loads(json_file.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                self.log.warning(f"Skipping {json_file}: {e}")
+                continue
+            # Empty files were meant to be extracted again
+            if info:
+                infos[json_file.stem.removeprefix(file_prefix)] = info
+
+        n_imported = self.put_many(kind, infos, replace=False)
+        with self._lock, self.conn as conn:
+            conn.execute(
+                "INSERT INTO store_info VALUES (?, ?)",
+                (migration_key, dt.datetime.now(dt.UTC).isoformat()),
+            )
+        self.log.info(
+            f"Imported {n_imported} {kind} entries from {folder} into {self.db_path}"
+        )
+        return n_imported
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,296 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Hashable, Iterable, Iterator
+
+from psup_stac_converter.settings import create_logger
+from psup_stac_converter.utils.downloader import MemoryManager
+
+
+class StageStats:
+    """Activity of a stage of the pipeline.
+
+    The time spent working is summed over the concurrent tasks: a stage whose
+    `busy_pct` stays near 100% is the bottleneck, and so is one with its queue full
+    (its inputs waiting for it).
+    """
+
+    def __init__(self, name: str, concurrency: int, queue_size: int | None = None):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.n_done = 0
+        self.n_running = 0
+        self.busy_seconds = 0.0
+        self.queue_depth = 0
+        self._queue_depth_sum = 0
+        self._n_samples = 0
+
+    @contextmanager
+    def running(self) -> Iterator[None]:
+        """Accounts for the processing of an input"""
+        start = time.perf_counter()
+        self.n_running += 1
+        try:
+            yield
+        finally:
+            self.n_running -= 1
+            self.n_done += 1
+            self.busy_seconds += time.perf_counter() - start
+
+    def sample_queue(self, queue: asyncio.Queue | None):
+        if queue is None:
+            return
+        self.queue_depth = queue.qsize()
+        self._queue_depth_sum += self.queue_depth
+        self._n_samples += 1
+
+    @property
+    def mean_queue_depth(self) -> float:
+        if self._n_samples == 0:
+            return 0.0
+        return self._queue_depth_sum / self._n_samples
+
+    def busy_pct(self, elapsed: float) -> float:
+        if elapsed <= 0:
+            return 0.0
+        return 100 * self.busy_seconds / (elapsed * self.concurrency)
+
+    def report(self, elapsed: float) -> str:
+        report = (
+            f"{self.name}: {self.n_done} done ({self.n_done / max(elapsed, 1e-9):.2f}/s), "
+            f"{self.n_running}/{self.concurrency} running, {self.busy_pct(elapsed):.0f}% busy"
+        )
+        if self.queue_size is not None:
+            report += f", {self.queue_depth}/{self.queue_size} waiting (mean {self.mean_queue_depth:.1f})"
+        return report
+
+
+class StagedPipeline:
+    """Runs each input through three stages connected by bounded queues, each with
+    its own concurrency:
+
+    - `fetch`, the I/O bound stage, in a pool of `fetch_concurrency` threads;
+    - `process`, the CPU bound one, in the given executor (eg. a process pool),
+      as long as the memory manager admits them if any;
+    - `write`, in a single thread, in the order of the inputs.
+
+    The stages are plain blocking functions (the downloads go through the
+    synchronous httpx client): asyncio only schedules them in their executors and
+    moves the inputs between the queues, it doesn't do the I/O itself. A full queue
+    holds the stages before it back, which bounds what is fetched ahead of the
+    processing, and so does `fetch_max_bytes` (see `Prefetcher`). The activity of the stages is logged every
+    `report_interval` seconds and at the end (see `StageStats`).
+    """
+
+    # Seconds between two attempts to admit an input waiting for memory
+    memory_poll_interval = 0.5
+
+    def __init__(
+        self,
+        fetch: Callable[[Hashable], Any],
+        process: Callable[[Hashable, Any], Any],
+        write: Callable[[Hashable, Any], None],
+        process_executor: Executor,
+        fetch_concurrency: int = 4,
+        process_concurrency: int = 1,
+        queue_size: int | None = None,
+        report_interval: float = 30.0,
+        memory_manager: MemoryManager | None = None,
+        estimate_mb: Callable[[Hashable], float] | None = None,
+        fetch_size: Callable[[Hashable], int] | None = None,
+        fetch_max_bytes: int | None = None,
+        log: logging.Logger | None = None,
+    ):
+        """
+        Args:
+            fetch (Callable[[Hashable], Any]): Gets what an input needs, eg. its
+            files. Blocking, run in a thread.
+            process (Callable[[Hashable, Any], Any]): Turns an input and what was
+            fetched into a result. Must be picklable for a process pool.
+            write (Callable[[Hashable, Any], None]): Saves the result of an input
+            process_executor (Executor): Where `process` runs. Left open.
+            fetch_concurrency (int, optional): _description_. Defaults to 4.
+            process_concurrency (int, optional): Number of inputs given to the
+            executor at once, eg. its number of workers. Defaults to 1.
+            queue_size (int | None, optional): Size of the queues between the stages.
+            Defaults to twice the largest concurrency.
+            report_interval (float, optional): Seconds between two reports of the
+            stages. Defaults to 30.0.
+            memory_manager (MemoryManager | None, optional): Admits the inputs to
+            process according to their estimated peak memory. Defaults to None.
+            estimate_mb (Callable[[Hashable], float] | None, optional): Estimates
+            the peak memory of the processing of an input. Run in a fetch thread,
+            without side effects. Defaults to None.
+            fetch_size (Callable[[Hashable], int] | None, optional): Expected size
+            in bytes of what is fetched for an input. Run in a fetch thread.
+            Defaults to None.
+            fetch_max_bytes (int | None, optional): Maximum size of what is fetched
+            and not processed yet. An input larger than that is only fetched when
+            nothing else is held. Unbounded if None. Defaults to None.
+            log (logging.Logger | None, optional): _description_. Defaults to None.
+        """
+        if fetch_concurrency < 1 or process_concurrency < 1:
+            raise ValueError("The concurrency of a stage must be at least 1")
+        self.fetch = fetch
+        self.process = process
+        self.write = write
+        self.process_executor = process_executor
+        self.fetch_concurrency = fetch_concurrency
+        self.process_concurrency = process_concurrency
+        self.queue_size = queue_size or 2 * max(fetch_concurrency, process_concurrency)
+        self.report_interval = report_interval
+        self.memory_manager = memory_manager
+        self.estimate_mb = estimate_mb
+        self.fetch_size = fetch_size
+        self.fetch_max_bytes = fetch_max_bytes
+        # Size of what is fetched and not processed yet
+        self.bytes_held = 0
+        if log is None:
+            self.log = create_logger(__name__)
+        else:
+            self.log = log
+
+        self.stats = {
+            "fetch": StageStats("fetch", fetch_concurrency),
+            "process": StageStats("process", process_concurrency, self.queue_size),
+            "write": StageStats("write", 1, self.queue_size),
+        }
+        self.elapsed = 0.0
+
+    def run(self, inputs: Iterable[Hashable]):
+        """Runs all the inputs through the stages, until the last one is written.
+
+        Raises:
+            Exception: The first error raised by a stage, which stops the others
+        """
+        try:
+            asyncio.run(self._run(inputs))
+        except ExceptionGroup as eg:
+            raise eg.exceptions[0] from None
+
+    def report(self) -> list[str]:
+        return [stage.report(self.elapsed) for stage in self.stats.values()]
+
+    async def _run(self, inputs: Iterable[Hashable]):
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        fetched_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        processed_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        fetch_slots = asyncio.Semaphore(self.fetch_concurrency)
+        process_slots = asyncio.Semaphore(self.process_concurrency)
+        fetch_budget = asyncio.Condition()
+
+        fetch_executor = ThreadPoolExecutor(
+            max_workers=self.fetch_concurrency, thread_name_prefix="pipeline-fetch"
+        )
+        write_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="pipeline-write"
+        )
+
+        async def fetch_one(key: Hashable) -> Any:
+            async with fetch_slots:
+                with self.stats["fetch"].running():
+                    return await loop.run_in_executor(fetch_executor, self.fetch, key)
+
+        async def hold_bytes(key: Hashable) -> int:
+            """Waits for room in the fetch budget, returning the size held"""
+            if self.fetch_max_bytes is None or self.fetch_size is None:
+                return 0
+            size = await loop.run_in_executor(fetch_executor, self.fetch_size, key)
+            async with fetch_budget:
+                await fetch_budget.wait_for(
+                    lambda: (
+                        self.bytes_held == 0
+                        or self.bytes_held + size <= self.fetch_max_bytes
+                    )
+                )
+                self.bytes_held += size
+            return size
+
+        async def release_bytes(size: int):
+            if size == 0:
+                return
+            async with fetch_budget:
+                self.bytes_held -= size
+                fetch_budget.notify_all()
+
+        async def admit(key: Hashable) -> float:
+            """Waits for the memory to process the input, returning its estimate"""
+            if self.memory_manager is None or self.estimate_mb is None:
+                return 0.0
+            # It reads the disk or a database, which would hold the event loop up
+            estimated_mb = await loop.run_in_executor(
+                fetch_executor, self.estimate_mb, key
+            )
+            while not self.memory_manager.try_reserve(estimated_mb):
+                await asyncio.sleep(self.memory_poll_interval)
+            return estimated_mb
+
+        async def process_one(
+            key: Hashable, fetched: Any, estimated_mb: float, size: int
+        ) -> Any:
+            try:
+                with self.stats["process"].running():
+                    return await loop.run_in_executor(
+                        self.process_executor, self.process, key, fetched
+                    )
+            finally:
+                process_slots.release()
+                if self.memory_manager is not None and self.estimate_mb is not None:
+                    self.memory_manager.release(estimated_mb)
+                # What was fetched is used up by the processing
+                await release_bytes(size)
+
+        async def feed(tg: asyncio.TaskGroup):
+            for key in inputs:
+                size = await hold_bytes(key)
+                await fetched_queue.put((key, tg.create_task(fetch_one(key)), size))
+            await fetched_queue.put(None)
+
+        async def process_all(tg: asyncio.TaskGroup):
+            while (entry := await fetched_queue.get()) is not None:
+                key, fetch_task, size = entry
+                fetched = await fetch_task
+                await process_slots.acquire()
+                estimated_mb = await admit(key)
+                await processed_queue.put(
+                    (
+                        key,
+                        tg.create_task(process_one(key, fetched, estimated_mb, size)),
+                    )
+                )
+            await processed_queue.put(None)
+
+        async def write_all():
+            while (entry := await processed_queue.get()) is not None:
+                key, process_task = entry
+                result = await process_task
+                with self.stats["write"].running():
+                    await loop.run_in_executor(write_executor, self.write, key, result)
+
+        async def monitor():
+            last_report = time.perf_counter()
+            while True:
+                await asyncio.sleep(min(1.0, self.report_interval))
+                self.stats["process"].sample_queue(fetched_queue)
+                self.stats["write"].sample_queue(processed_queue)
+                if time.perf_counter() - last_report >= self.report_interval:
+                    last_report = time.perf_counter()
+                    self.elapsed = last_report - start
+                    for stage_report in self.report():
+                        self.log.info(stage_report)
+
+        try:
+            async with asyncio.TaskGroup() as tg:
+                monitor_task = tg.create_task(monitor())
+                tg.create_task(feed(tg))
+                tg.create_task(process_all(tg))
+                await tg.create_task(write_all())
+                monitor_task.cancel()
+        finally:
+            fetch_executor.shutdown(wait=True, cancel_futures=True)
+            write_executor.shutdown(wait=True)
+            self.elapsed = time.perf_counter() - start
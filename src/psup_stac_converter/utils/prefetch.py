@@ -0,0 +1,178 @@
+import logging
+import shutil
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, NamedTuple
+
+from psup_stac_converter.settings import create_logger
+
+
+class PrefetchJob(NamedTuple):
+    """A file fetched ahead of its use"""
+
+    name: str
+    # Expected size of the file, counted in the budget of the prefetcher
+    size: int
+    # Fetches the file, given the folder of the prefetcher. Returns where the file
+    # was put, or None if it isn't handed over (eg. saved in a folder of its own)
+    fetch: Callable[[Path], Path | None]
+
+
+def run_prefetch_jobs(
+    key: str,
+    jobs: list[PrefetchJob],
+    folder: Path,
+    log: logging.Logger | None = None,
+) -> dict[str, Path]:
+    """Fetches the files of an entry, leaving the ones that fail to their user.
+
+    Args:
+        key (str): _description_
+        jobs (list[PrefetchJob]): _description_
+        folder (Path): Where the files are put
+        log (logging.Logger | None, optional): _description_. Defaults to None.
+
+    Returns:
+        dict[str, Path]: The files handed over, by name
+    """
+    if log is None:
+        log = create_logger(__name__)
+    fetched = {}
+    for job in jobs:
+        try:
+            path = job.fetch(folder)
+        except Exception as e:
+            # Fetched again when needed, where the error is dealt with
+            log.warning(f"Couldn't prefetch the {job.name} file of {key}: {e}")
+            continue
+        if path is not None:
+            fetched[job.name] = path
+    log.debug(f"Prefetched {key}: {list(fetched)}")
+    return fetched
+
+
+class Prefetcher:
+    """Fetches the files of the next entries of a sequence in the background, while
+    the current one is processed, so that downloads overlap with the processing.
+
+    At most `depth` entries are fetched ahead, in the order of the sequence, as long
+    as their files fit in `max_bytes` (an entry larger than that is only fetched
+    when nothing else is). The files handed over by `take` belong to the caller;
+    the other ones are removed on `close`.
+    """
+
+    def __init__(
+        self,
+        plan: Iterable[tuple[str, list[PrefetchJob]]],
+        depth: int = 2,
+        max_bytes: int | None = None,
+        log: logging.Logger | None = None,
+    ):
+        """
+        Args:
+            plan (Iterable[tuple[str, list[PrefetchJob]]]): The entries in the order
+            they are taken, with their files. Consumed lazily, in the calling thread.
+            depth (int, optional): Maximum number of entries fetched ahead.
+            Defaults to 2.
+            max_bytes (int | None, optional): Maximum size of the files fetched ahead.
+            Unbounded if None. Defaults to None.
+            log (logging.Logger | None, optional): _description_. Defaults to None.
+        """
+        if depth < 1:
+            raise ValueError("depth must be at least 1")
+        self.depth = depth
+        self.max_bytes = max_bytes
+        if log is None:
+            self.log = create_logger(__name__)
+        else:
+            self.log = log
+
+        self.folder = Path(tempfile.mkdtemp(prefix="psup_prefetch_"))
+        self.bytes_ahead = 0
+        self._plan = iter(plan)
+        # Next entry of the plan, waiting for room to be fetched
+        self._pending: tuple[str, list[PrefetchJob]] | None = None
+        self._ahead: OrderedDict[str, tuple[Future, int]] = OrderedDict()
+        self._executor = ThreadPoolExecutor(
+            max_workers=depth, thread_name_prefix="prefetch"
+        )
+        self._schedule()
+
+    def __enter__(self) -> "Prefetcher":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _schedule(self):
+        """Starts fetching the next entries, as many as the depth and budget allow"""
+        while len(self._ahead) < self.depth:
+            if self._pending is None:
+                self._pending = next(self._plan, None)
+                if self._pending is None:
+                    return
+            key, jobs = self._pending
+            size = sum(job.size for job in jobs)
+            if (
+                self._ahead
+                and self.max_bytes is not None
+                and self.bytes_ahead + size > self.max_bytes
+            ):
+                return
+
+            self._pending = None
+            self._ahead[key] = (
+                self._executor.submit(self._fetch_entry, key, jobs),
+                size,
+            )
+            self.bytes_ahead += size
+
+    def _fetch_entry(self, key: str, jobs: list[PrefetchJob]) -> dict[str, Path]:
+        return run_prefetch_jobs(key, jobs, self.folder, log=self.log)
+
+    @staticmethod
+    def _discard(future: Future):
+        if future.cancel():
+            return
+
+        def remove_files(future: Future):
+            for path in future.result().values():
+                path.unlink(missing_ok=True)
+
+        future.add_done_callback(remove_files)
+
+    def take(self, key: str) -> dict[str, Path]:
+        """Hands over the files of an entry, waiting for them to be fetched. The
+        entries before it that weren't taken are dropped.
+
+        Args:
+            key (str): _description_
+
+        Returns:
+            dict[str, Path]: The files fetched by name, which the caller must remove.
+            Empty if the entry isn't fetched ahead (eg. already taken).
+        """
+        if key not in self._ahead:
+            return {}
+
+        while True:
+            ahead_key, (future, size) = self._ahead.popitem(last=False)
+            self.bytes_ahead -= size
+            if ahead_key == key:
+                break
+            self.log.debug(f"{ahead_key} wasn't taken, its files are dropped")
+            self._discard(future)
+
+        # The next entries start while waiting for this one
+        self._schedule()
+        return future.result()
+
+    def close(self):
+        """Stops fetching and removes the files that weren't handed over"""
+        for future, _ in self._ahead.values():
+            future.cancel()
+        self._ahead.clear()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        shutil.rmtree(self.folder, ignore_errors=True)
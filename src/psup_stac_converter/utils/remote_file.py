@@ -0,0 +1,140 @@
+import io
+from collections import OrderedDict
+
+import httpx
+
+from psup_stac_converter.exceptions import RangeRequestUnsupportedError
+from psup_stac_converter.settings import create_logger
+
+log = create_logger(__name__)
+
+
+class HttpRangeFile(io.RawIOBase):
+    """Read-only file object over a remote resource, fetching only the parts that
+    are read through byte-range requests (like `fsspec`'s HTTP files).
+
+    The resource is read by blocks, the last ones being kept in memory: libraries
+    doing many small reads, like h5py, only send a few requests.
+    """
+
+    def __init__(
+        self,
+        client: httpx.Client,
+        url: str,
+        size: int,
+        block_size: int = 256 * 1024,
+        max_blocks: int = 128,
+    ):
+        """
+        Args:
+            client (httpx.Client): _description_
+            url (str): _description_
+            size (int): Size of the resource in bytes
+            block_size (int, optional): Size of a request. Defaults to 256 KiB.
+            max_blocks (int, optional): Number of blocks kept in memory. Defaults
+            to 128.
+        """
+        super().__init__()
+        self.client = client
+        self.url = url
+        self.size = size
+        self.block_size = block_size
+        self.max_blocks = max_blocks
+        self.n_requests = 0
+        self.bytes_fetched = 0
+        self._position = 0
+        self._blocks: OrderedDict[int, bytes] = OrderedDict()
+
+    def __repr__(self) -> str:
+        return f"<HttpRangeFile {self.url}, {self.bytes_fetched}/{self.size} bytes fetched>"
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence ({whence})")
+        if position < 0:
+            raise ValueError(f"Negative seek position {position}")
+        self._position = position
+        return position
+
+    def _fetch_blocks(self, first_block: int, last_block: int) -> dict[int, bytes]:
+        """Fetches consecutive blocks in a single request, and keeps the last ones
+        in memory"""
+        start = first_block * self.block_size
+        end = min((last_block + 1) * self.block_size, self.size) - 1
+        response = self.client.get(self.url, headers={"Range": f"bytes={start}-{end}"})
+        response.raise_for_status()
+        if response.status_code != httpx.codes.PARTIAL_CONTENT:
+            raise RangeRequestUnsupportedError(self.url)
+        content = response.content
+        if len(content) != end - start + 1:
+            raise OSError(
+                f"Got {len(content)} bytes from {self.url} instead of {end - start + 1}"
+            )
+
+        self.n_requests += 1
+        self.bytes_fetched += len(content)
+        blocks = {}
+        for block_idx in range(first_block, last_block + 1):
+            offset = (block_idx - first_block) * self.block_size
+            blocks[block_idx] = content[offset : offset + self.block_size]
+        self._blocks.update(blocks)
+        while len(self._blocks) > self.max_blocks:
+            self._blocks.popitem(last=False)
+        return blocks
+
+    def readinto(self, buffer) -> int:
+        end = min(self._position + len(buffer), self.size)
+        if end <= self._position:
+            return 0
+
+        first_block = self._position // self.block_size
+        last_block = (end - 1) // self.block_size
+        # The blocks of this read are held here, as fetching a run of missing ones
+        # can push the others out of memory
+        blocks: dict[int, bytes] = {}
+        # Missing blocks are fetched by runs
+        missing_start = None
+        for block_idx in range(first_block, last_block + 2):
+            is_missing = block_idx <= last_block and block_idx not in self._blocks
+            if not is_missing and block_idx <= last_block:
+                self._blocks.move_to_end(block_idx)
+                blocks[block_idx] = self._blocks[block_idx]
+            if is_missing and missing_start is None:
+                missing_start = block_idx
+            elif not is_missing and missing_start is not None:
+                blocks.update(self._fetch_blocks(missing_start, block_idx - 1))
+                missing_start = None
+
+        view = memoryview(buffer).cast("B")
+        n_read = 0
+        for block_idx in range(first_block, last_block + 1):
+            block_start = block_idx * self.block_size
+            chunk = blocks[block_idx][
+                max(self._position - block_start, 0) : end - block_start
+            ]
+            view[n_read : n_read + len(chunk)] = chunk
+            n_read += len(chunk)
+
+        self._position += n_read
+        return n_read
+
+    def close(self):
+        if not self.closed:
+            log.debug(repr(self))
+            self._blocks.clear()
+        super().close()
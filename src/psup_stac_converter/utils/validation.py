@@ -0,0 +1,352 @@
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, NamedTuple
+from urllib.parse import urldefrag, urlsplit
+
+from jsonschema.protocols import Validator
+from jsonschema.validators import validator_for
+from pystac.validation.local_validator import get_local_schema_cache
+from referencing import Registry, Resource
+from referencing.exceptions import NoSuchResource, Unresolvable
+
+from psup_stac_converter.exceptions import SchemaNotAvailableError
+from psup_stac_converter.settings import create_logger
+from psup_stac_converter.utils.downloader import create_http_client
+
+# Schemas of the extensions used by the catalog, laid out like their URLs
+BUNDLED_SCHEMAS_FOLDER = (
+    Path(__file__).resolve().parent.parent / "stac_extra" / "schemas"
+)
+# Kept next to the validated catalog.json, records the files found valid
+VALIDATION_STATE_FILE = ".stac_validation.json"
+
+STAC_TYPES = {"Feature": "item", "Collection": "collection", "Catalog": "catalog"}
+
+
+def schema_location(folder: Path, schema_uri: str) -> Path:
+    """Where a schema is kept in a folder laid out like the URLs, eg.
+    `<folder>/stac-extensions.github.io/eo/v2.0.0/schema.json`"""
+    url = urlsplit(schema_uri)
+    return folder / url.netloc / url.path.lstrip("/")
+
+
+def core_schema_uri(stac_dict: dict[str, Any]) -> str:
+    """The schema of the STAC core that a STAC object follows
+
+    Raises:
+        KeyError: If the object isn't a STAC object
+    """
+    stac_type = STAC_TYPES[stac_dict["type"]]
+    return f"https://schemas.stacspec.org/v{stac_dict['stac_version']}/{stac_type}-spec/json-schema/{stac_type}.json"
+
+
+class SchemaStore:
+    """Gets the JSON schemas of STAC and its extensions from local copies, so that
+    the catalogs can be validated without a network. A schema is looked up in:
+
+    - the schemas of the STAC core bundled with pystac;
+    - the cache folder;
+    - the schemas bundled with this package (see `BUNDLED_SCHEMAS_FOLDER`);
+    - its URL, if downloads are allowed, saving it in the cache folder.
+
+    The validators of the schemas are compiled once and reused.
+    """
+
+    def __init__(
+        self,
+        cache_folder: Path | None = None,
+        download: bool = False,
+        log: logging.Logger | None = None,
+    ):
+        """
+        Args:
+            cache_folder (Path | None, optional): Schemas laid out like their URLs
+            (see `schema_location`). Defaults to None.
+            download (bool, optional): Downloads the missing schemas into the cache
+            folder. Defaults to False.
+            log (logging.Logger | None, optional): _description_. Defaults to None.
+        """
+        self.cache_folder = cache_folder
+        self.download = download and cache_folder is not None
+        if log is None:
+            self.log = create_logger(__name__)
+        else:
+            self.log = log
+
+        self._schemas: dict[str, dict[str, Any]] = get_local_schema_cache()
+        self._validators: dict[str, Validator] = {}
+        # Resolves the references between schemas through the store
+        self.registry = Registry(retrieve=self._retrieve)
+
+    def get(self, schema_uri: str) -> dict[str, Any]:
+        """
+        Raises:
+            SchemaNotAvailableError: If the schema isn't found and can't be downloaded
+        """
+        schema_uri = urldefrag(schema_uri).url
+        if schema_uri in self._schemas:
+            return self._schemas[schema_uri]
+
+        for folder in (self.cache_folder, BUNDLED_SCHEMAS_FOLDER):
+            if folder is None:
+                continue
+            location = schema_location(folder, schema_uri)
+            if location.is_file():
+                schema = json.loads(location.read_bytes())
+                break
+        else:
+            if not self.download:
+                raise SchemaNotAvailableError(schema_uri)
+            schema = self._download(schema_uri)
+
+        self._schemas[schema_uri] = schema
+        return schema
+
+    def _download(self, schema_uri: str) -> dict[str, Any]:
+        self.log.info(f"Downloading {schema_uri} into {self.cache_folder}")
+        try:
+            with create_http_client() as client:
+                response = client.get(schema_uri, follow_redirects=True)
+                response.raise_for_status()
+            schema = response.json()
+        except Exception as e:
+            raise SchemaNotAvailableError(schema_uri) from e
+
+        location = schema_location(self.cache_folder, schema_uri)
+        location.parent.mkdir(parents=True, exist_ok=True)
+        tmp_location = location.with_name(f"{location.name}.{os.getpid()}.tmp")
+        try:
+            tmp_location.write_bytes(response.content)
+            os.replace(tmp_location, location)
+        finally:
+            tmp_location.unlink(missing_ok=True)
+        return schema
+
+    def _retrieve(self, schema_uri: str) -> Resource:
+        try:
+            return Resource.from_contents(self.get(schema_uri))
+        except SchemaNotAvailableError as e:
+            raise NoSuchResource(ref=schema_uri) from e
+
+    def validator(self, schema_uri: str) -> Validator:
+        """The compiled validator of a schema"""
+        if schema_uri not in self._validators:
+            schema = self.get(schema_uri)
+            self._validators[schema_uri] = validator_for(schema)(
+                schema, registry=self.registry
+            )
+        return self._validators[schema_uri]
+
+    def errors_of(self, stac_dict: dict[str, Any]) -> list[str]:
+        """Validates a STAC object against the core schema and its extensions' ones
+
+        Args:
+            stac_dict (dict[str, Any]): _description_
+
+        Returns:
+            list[str]: The errors found, empty if the object is valid
+        """
+        try:
+            schema_uris = [core_schema_uri(stac_dict)]
+        except (KeyError, TypeError):
+            return ["Not a STAC object"]
+        schema_uris.extend(stac_dict.get("stac_extensions", []))
+
+        errors = []
+        for schema_uri in schema_uris:
+            try:
+                for error in self.validator(schema_uri).iter_errors(stac_dict):
+                    error_path = "/".join(str(part) for part in error.absolute_path)
+                    errors.append(f"[{schema_uri}] {error.message} (at /{error_path})")
+            except (SchemaNotAvailableError, Unresolvable) as e:
+                errors.append(f"[{schema_uri}] {e}")
+        return errors
+
+
+class ValidationReport(NamedTuple):
+    n_checked: int
+    # Files unchanged since they were found valid
+    n_skipped: int
+    # Errors by file
+    errors: dict[Path, list[str]]
+
+    @property
+    def valid(self) -> bool:
+        return not self.errors
+
+
+def _link_target(stac_file: Path, href: str) -> Path | None:
+    """The file a link points to, None if it isn't a local file"""
+    url = urlsplit(href)
+    if url.scheme in ("http", "https"):
+        return None
+    if url.scheme == "file":
+        href = url.path
+    return (stac_file.parent / href).resolve()
+
+
+def find_stac_files(
+    catalog_file: Path, log: logging.Logger | None = None
+) -> tuple[list[Path], list[Path]]:
+    """Walks through a saved catalog by its `child` and `item` links. Only the
+    catalogs and collections are read.
+
+    Args:
+        catalog_file (Path): _description_
+        log (logging.Logger | None, optional): _description_. Defaults to None.
+
+    Returns:
+        tuple[list[Path], list[Path]]: The catalogs and collections, and the items
+    """
+    if log is None:
+        log = create_logger(__name__)
+    parents: list[Path] = []
+    items: list[Path] = []
+    to_visit = [catalog_file.resolve()]
+    seen = set(to_visit)
+    while to_visit:
+        stac_file = to_visit.pop()
+        parents.append(stac_file)
+        for link in json.loads(stac_file.read_bytes()).get("links", []):
+            if link.get("rel") not in ("child", "item"):
+                continue
+            target = _link_target(stac_file, link["href"])
+            if target is None:
+                log.warning(f"{link['href']} isn't a local file, it isn't validated")
+                continue
+            if target in seen:
+                continue
+            seen.add(target)
+            if link["rel"] == "child":
+                to_visit.append(target)
+            else:
+                items.append(target)
+    return parents, items
+
+
+# Schemas held by each worker of the process pool (see `validate_catalog`)
+_worker_store: SchemaStore | None = None
+
+
+def _init_validation_worker(cache_folder: Path | None, download: bool):
+    """Process pool initializer: compiles the validators once per worker"""
+    global _worker_store
+    _worker_store = SchemaStore(cache_folder, download=download)
+
+
+def _validate_files(
+    stac_files: list[Path], store: SchemaStore | None = None
+) -> list[tuple[Path, list[str]]]:
+    if store is None:
+        store = _worker_store
+    results = []
+    for stac_file in stac_files:
+        try:
+            stac_dict = json.loads(stac_file.read_bytes())
+        except (OSError, ValueError) as e:
+            results.append((stac_file, [f"Unreadable: {e}"]))
+            continue
+        results.append((stac_file, store.errors_of(stac_dict)))
+    return results
+
+
+def _file_signature(stac_file: Path) -> list[int]:
+    stat = stac_file.stat()
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def validate_catalog(
+    catalog_file: Path,
+    n_jobs: int = 1,
+    changed_only: bool = False,
+    schema_cache_folder: Path | None = None,
+    download_schemas: bool = False,
+    chunk_size: int = 200,
+    log: logging.Logger | None = None,
+) -> ValidationReport:
+    """Validates a saved catalog, its collections and items, against the local
+    schemas (see `SchemaStore`). The items are validated by `n_jobs` processes.
+
+    The files found valid are recorded next to the catalog, with their modification
+    time and size (see `VALIDATION_STATE_FILE`), so that only the new and modified
+    ones can be validated next time.
+
+    Args:
+        catalog_file (Path): The catalog.json of the catalog
+        n_jobs (int, optional): _description_. Defaults to 1.
+        changed_only (bool, optional): Skips the files unchanged since they were
+        found valid. Defaults to False.
+        schema_cache_folder (Path | None, optional): See `SchemaStore`.
+        Defaults to None.
+        download_schemas (bool, optional): See `SchemaStore`. Defaults to False.
+        chunk_size (int, optional): Number of items sent at once to a process.
+        Defaults to 200.
+        log (logging.Logger | None, optional): _description_. Defaults to None.
+
+    Returns:
+        ValidationReport: _description_
+    """
+    if log is None:
+        log = create_logger(__name__)
+    catalog_folder = catalog_file.resolve().parent
+    state_file = catalog_folder / VALIDATION_STATE_FILE
+    state: dict[str, list[int]] = {}
+    if state_file.exists():
+        try:
+            state = json.loads(state_file.read_bytes())
+        except ValueError:
+            log.warning(f"{state_file} is corrupted, the whole catalog is validated")
+
+    def state_key(stac_file: Path) -> str:
+        return stac_file.relative_to(catalog_folder).as_posix()
+
+    parents, items = find_stac_files(catalog_file, log=log)
+    stac_files = parents + items
+    if changed_only:
+        stac_files = [
+            stac_file
+            for stac_file in stac_files
+            if state.get(state_key(stac_file)) != _file_signature(stac_file)
+        ]
+    n_skipped = len(parents) + len(items) - len(stac_files)
+    log.info(f"Validating {len(stac_files)} STAC files ({n_skipped} unchanged skipped)")
+
+    chunks = [
+        stac_files[start : start + chunk_size]
+        for start in range(0, len(stac_files), chunk_size)
+    ]
+    results: list[tuple[Path, list[str]]] = []
+    if n_jobs <= 1 or len(chunks) <= 1:
+        store = SchemaStore(schema_cache_folder, download=download_schemas, log=log)
+        for chunk in chunks:
+            results.extend(_validate_files(chunk, store=store))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(n_jobs, len(chunks)),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_validation_worker,
+            initargs=(schema_cache_folder, download_schemas),
+        ) as executor:
+            for chunk_results in executor.map(_validate_files, chunks):
+                results.extend(chunk_results)
+
+    errors = {}
+    for stac_file, file_errors in results:
+        if file_errors:
+            errors[stac_file] = file_errors
+            state.pop(state_key(stac_file), None)
+        else:
+            state[state_key(stac_file)] = _file_signature(stac_file)
+
+    tmp_state_file = state_file.with_name(f"{state_file.name}.{os.getpid()}.tmp")
+    try:
+        tmp_state_file.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp_state_file, state_file)
+    finally:
+        tmp_state_file.unlink(missing_ok=True)
+
+    return ValidationReport(len(stac_files), n_skipped, errors)
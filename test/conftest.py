@@ -3,10 +3,15 @@
 import shutil
 import uuid
 from pathlib import Path
+from typing import Callable, Iterator
 
+import pandas as pd
 import pytest
 from pystac import Asset, Catalog, Item, ItemCollection
 
+from psup_stac_converter.omega.c_channel_proj import OmegaCChannelProj
+from psup_stac_converter.utils.io import PsupIoHandler
+
 HERE = Path(__file__).resolve().parent
 
 
@@ -29,3 +34,41 @@ def tmp_asset(tmp_path: Path) -> Asset:
     catalog = Catalog.from_file(f"{dst}/catalog.json")
     item = next(catalog.get_items(recursive=True))
     return next(v for v in item.assets.values())
+
+
+def write_inventory(inventory: Path, file_sizes: dict[str, int]):
+    """Writes an inventory of OMEGA L3 files, as produced by the PSUP scraper"""
+    pd.DataFrame(
+        [
+            {
+                "file_name": file_name,
+                "rel_path": f"omega/cubes_L3/{file_name}",
+                "href": f"https://psup.example/omega/cubes_L3/{file_name}",
+                "total_size": total_size,
+            }
+            for file_name, total_size in file_sizes.items()
+        ]
+    ).to_csv(inventory, index=False)
+
+
+@pytest.fixture
+def make_c_channel_reader(
+    tmp_path: Path,
+) -> Iterator[Callable[..., OmegaCChannelProj]]:
+    """Makes readers of OMEGA C channel cubes over an inventory of the given files,
+    downloading to `tmp_path / "raw"`. The readers are closed at teardown."""
+    readers: list[OmegaCChannelProj] = []
+
+    def make(file_sizes: dict[str, int], **kwargs) -> OmegaCChannelProj:
+        inventory = tmp_path / "psup_refs.csv"
+        write_inventory(inventory, file_sizes)
+        io_handler = PsupIoHandler(
+            inventory, input_folder=tmp_path / "raw", output_folder=tmp_path / "raw"
+        )
+        reader = OmegaCChannelProj(io_handler, **kwargs)
+        readers.append(reader)
+        return reader
+
+    yield make
+    for reader in readers:
+        reader.close()
@@ -0,0 +1,116 @@
+import datetime as dt
+import gzip
+import json
+from pathlib import Path
+
+import pystac
+import pytest
+
+from psup_stac_converter.utils.catalog_io import (
+    CatalogStacIO,
+    save_catalog,
+    write_if_changed,
+)
+
+
+def _catalog(n_items: int = 5) -> pystac.Catalog:
+    catalog = pystac.Catalog(id="mars", description="Mars")
+    collection = pystac.Collection(
+        id="omega_c_channel_proj",
+        description="OMEGA",
+        extent=pystac.Extent(
+            spatial=pystac.SpatialExtent(bboxes=[[-180.0, -90.0, 180.0, 90.0]]),
+            temporal=pystac.TemporalExtent(intervals=[[None, None]]),
+        ),
+    )
+    collection.add_items(
+        [
+            pystac.Item(
+                id=f"ORB000{idx}_1",
+                geometry=None,
+                bbox=[float(idx), -10.0, idx + 10.0, 10.0],
+                datetime=dt.datetime(2004, 1, idx + 1, tzinfo=dt.UTC),
+                properties={"title": f"Cube n°{idx}"},
+            )
+            for idx in range(n_items)
+        ]
+    )
+    catalog.add_child(collection)
+    return catalog
+
+
+def _read_tree(root: Path) -> dict[str, dict]:
+    return {
+        json_file.relative_to(root).as_posix(): json.loads(json_file.read_text())
+        for json_file in root.rglob("*.json")
+    }
+
+
+@pytest.mark.parametrize("catalog_type", list(pystac.CatalogType))
+def test_same_catalog_as_pystac(tmp_path: Path, catalog_type: pystac.CatalogType):
+    catalog = _catalog()
+    catalog.normalize_hrefs((tmp_path / "pystac").as_posix())
+    catalog.save(catalog_type=catalog_type)
+
+    catalog = _catalog()
+    catalog.normalize_hrefs((tmp_path / "threads").as_posix())
+    save_catalog(catalog, catalog_type, n_threads=3)
+
+    expected = _read_tree(tmp_path / "pystac")
+    if catalog_type != pystac.CatalogType.SELF_CONTAINED:
+        expected = json.loads(json.dumps(expected).replace("/pystac/", "/threads/"))
+    assert _read_tree(tmp_path / "threads") == expected
+    assert catalog.catalog_type == catalog_type
+
+
+def test_unchanged_files_not_rewritten(tmp_path: Path):
+    catalog = _catalog()
+    catalog.normalize_hrefs(tmp_path.as_posix())
+    stac_io = CatalogStacIO()
+    save_catalog(catalog, pystac.CatalogType.SELF_CONTAINED, stac_io=stac_io)
+    assert (stac_io.n_written, stac_io.n_unchanged) == (7, 0)
+    mtimes = {path: path.stat().st_mtime_ns for path in tmp_path.rglob("*.json")}
+
+    catalog = _catalog()
+    catalog.normalize_hrefs(tmp_path.as_posix())
+    next(catalog.get_items("ORB0002_1", recursive=True)).properties["title"] = (
+        "Modified"
+    )
+    save_catalog(catalog, pystac.CatalogType.SELF_CONTAINED, stac_io=stac_io)
+
+    assert (stac_io.n_written, stac_io.n_unchanged) == (8, 6)
+    changed = [
+        path.name for path, mtime in mtimes.items() if path.stat().st_mtime_ns != mtime
+    ]
+    assert changed == ["ORB0002_1.json"]
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_compact_files_with_gzip_copies(tmp_path: Path):
+    catalog = _catalog()
+    catalog.normalize_hrefs(tmp_path.as_posix())
+    stac_io = CatalogStacIO(json_format="compact", gzip_copies=True)
+    save_catalog(catalog, pystac.CatalogType.SELF_CONTAINED, stac_io=stac_io)
+
+    catalog_file = tmp_path / "catalog.json"
+    assert b"\n" not in catalog_file.read_bytes()
+    assert len(list(tmp_path.rglob("*.json.gz"))) == 7
+    assert (
+        gzip.decompress((tmp_path / "catalog.json.gz").read_bytes())
+        == catalog_file.read_bytes()
+    )
+    read_back = pystac.Catalog.from_file(catalog_file.as_posix())
+    assert len(list(read_back.get_items(recursive=True))) == 5
+    assert (
+        next(read_back.get_items("ORB0001_1", recursive=True)).properties["title"]
+        == "Cube n°1"
+    )
+
+
+def test_write_if_changed(tmp_path: Path):
+    location = tmp_path / "folder" / "item.json"
+
+    assert write_if_changed(location, b"{}")
+    assert not write_if_changed(location, b"{}")
+    assert write_if_changed(location, b"[]")
+    assert location.read_bytes() == b"[]"
@@ -0,0 +1,114 @@
+import datetime as dt
+from pathlib import Path
+
+import pystac
+import pytest
+
+from psup_stac_converter.omega.c_channel_proj import OmegaCChannelProj
+from psup_stac_converter.utils.catalog_io import save_catalog
+from psup_stac_converter.utils.item_writer import (
+    ItemChanges,
+    StreamingItemWriter,
+    item_links_by_id,
+)
+
+pytestmark = pytest.mark.filterwarnings("ignore::tqdm.TqdmExperimentalWarning")
+
+
+def _item(item_id: str, x: float, title: str = "") -> pystac.Item:
+    return pystac.Item(
+        id=item_id,
+        geometry=None,
+        bbox=[x, -10.0, x + 10.0, 10.0],
+        # Naive, like the items of the readers
+        datetime=dt.datetime(2004, 1, 1 + int(x)),
+        properties={"title": title},
+    )
+
+
+@pytest.fixture
+def reader(make_c_channel_reader) -> OmegaCChannelProj:
+    reader = make_c_channel_reader(
+        {"ORB0001_1.nc": 1000, "ORB0002_3.nc": 1000, "ORB0003_5.nc": 1000}
+    )
+    reader.create_stac_item = lambda orbit_cube_idx: _item(
+        orbit_cube_idx, 20.0, title="new"
+    )
+    return reader
+
+
+@pytest.fixture
+def catalog_file(tmp_path: Path) -> Path:
+    """A catalog made before ORB0002_3 was added and ORB0009_9 removed"""
+    catalog = pystac.Catalog(id="mars", description="Mars")
+    collection = pystac.Collection(
+        id="omega_c_channel_proj",
+        description="OMEGA",
+        extent=pystac.Extent(
+            spatial=pystac.SpatialExtent(bboxes=[[0.0, -10.0, 12.0, 10.0]]),
+            temporal=pystac.TemporalExtent(
+                intervals=[
+                    [dt.datetime(2004, 1, 1, tzinfo=dt.UTC), None],
+                ]
+            ),
+        ),
+    )
+    collection.add_items(
+        [_item("ORB0001_1", 0.0), _item("ORB0003_5", 1.0), _item("ORB0009_9", 2.0)]
+    )
+    catalog.add_child(collection)
+    catalog.normalize_hrefs((tmp_path / "catalog").as_posix())
+    save_catalog(catalog, pystac.CatalogType.SELF_CONTAINED)
+    return tmp_path / "catalog" / "catalog.json"
+
+
+def test_collection_brought_up_to_date(
+    reader: OmegaCChannelProj, catalog_file: Path, tmp_path: Path
+):
+    outdated_copy = tmp_path / "raw" / "omega" / "cubes_L3" / "ORB0001_1.nc"
+    outdated_copy.parent.mkdir(parents=True)
+    outdated_copy.write_bytes(b"outdated")
+    reader.metadata_store.put(reader.nc_metadata_kind, "ORB0001_1", {"a": 1})
+
+    catalog = pystac.Catalog.from_file(catalog_file.as_posix())
+    collection = next(catalog.get_collections())
+    item_writer = StreamingItemWriter(catalog)
+    item_changes = reader.update_collection(
+        collection, changed_ids={"ORB0001_1"}, item_writer=item_writer
+    )
+
+    assert item_changes == ItemChanges(
+        created=["ORB0002_3"], updated=["ORB0001_1"], deleted=["ORB0009_9"]
+    )
+    assert not (catalog_file.parent / "omega_c_channel_proj" / "ORB0009_9").exists()
+    assert not outdated_copy.exists()
+    assert reader.metadata_store.get(reader.nc_metadata_kind, "ORB0001_1") is None
+    # Widened to the new items only
+    assert collection.extent.spatial.bboxes == [[0.0, -10.0, 30.0, 10.0]]
+    # The unchanged items aren't read
+    assert not item_links_by_id(collection)["ORB0003_5"].is_resolved()
+
+    save_catalog(catalog, pystac.CatalogType.SELF_CONTAINED)
+    catalog = pystac.Catalog.from_file(catalog_file.as_posix())
+    titles = {
+        item.id: item.properties["title"] for item in catalog.get_items(recursive=True)
+    }
+    assert titles == {"ORB0001_1": "new", "ORB0002_3": "new", "ORB0003_5": ""}
+
+
+def test_nothing_to_update(reader: OmegaCChannelProj, catalog_file: Path):
+    catalog = pystac.Catalog.from_file(catalog_file.as_posix())
+    collection = next(catalog.get_collections())
+    reader.update_collection(collection)
+    save_catalog(catalog, pystac.CatalogType.SELF_CONTAINED)
+    mtimes = {path: path.stat().st_mtime_ns for path in catalog_file.parent.rglob("*")}
+
+    catalog = pystac.Catalog.from_file(catalog_file.as_posix())
+    collection = next(catalog.get_collections())
+    item_changes = reader.update_collection(collection, n_limit=0)
+    save_catalog(catalog, pystac.CatalogType.SELF_CONTAINED)
+
+    assert item_changes == ItemChanges(created=[], updated=[], deleted=[])
+    assert {
+        path: path.stat().st_mtime_ns for path in catalog_file.parent.rglob("*")
+    } == mtimes
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from shapely import MultiPolygon, Polygon, get_num_coordinates, remove_repeated_points
+from skimage import measure
+
+from psup_stac_converter.omega.c_channel_proj import contour_footprint, downsample_mask
+
+LONGITUDES = np.linspace(20.0, 42.0, 45)
+LATITUDES = np.linspace(-10.0, 12.0, 45)
+
+
+def disk_mask(center: tuple[int, int], radius: int) -> np.ndarray:
+    rows, cols = np.ogrid[: len(LATITUDES), : len(LONGITUDES)]
+    return (rows - center[0]) ** 2 + (cols - center[1]) ** 2 <= radius**2
+
+
+def vertex_by_vertex(mask: np.ndarray) -> list[Polygon]:
+    """How the footprints were outlined before"""
+    return [
+        remove_repeated_points(
+            Polygon(
+                [
+                    (LONGITUDES[round(_x)].item(), LATITUDES[round(_y)].item())
+                    for _x, _y in zip(_contour[:, 1], _contour[:, 0])
+                ]
+            )
+        )
+        for _contour in measure.find_contours(mask)
+    ]
+
+
+def test_same_footprint_as_vertex_by_vertex():
+    mask = disk_mask((15, 15), 10)
+    assert contour_footprint(mask, LONGITUDES, LATITUDES).equals_exact(
+        vertex_by_vertex(mask)[0], tolerance=0
+    )
+
+    mask |= disk_mask((35, 35), 6)
+    footprint = contour_footprint(mask, LONGITUDES, LATITUDES)
+    assert isinstance(footprint, MultiPolygon)
+    assert footprint.equals_exact(MultiPolygon(vertex_by_vertex(mask)), tolerance=0)
+
+
+def test_downsampled_mask():
+    mask = np.zeros((5, 7), dtype=bool)
+    mask[4, 6] = True
+    mask[0, 1] = True
+
+    downsampled = downsample_mask(mask, 2)
+
+    assert downsampled.shape == (3, 4)
+    assert downsampled.sum() == 2
+    assert downsampled[2, 3] and downsampled[0, 0]
+    assert downsample_mask(mask, 1) is mask
+
+
+@pytest.mark.parametrize(
+    "options", [{"downsampling": 3}, {"tolerance": 0.5}, {"tolerance": 0.05}]
+)
+def test_smaller_footprints(options: dict):
+    mask = disk_mask((22, 22), 15)
+    exact = contour_footprint(mask, LONGITUDES, LATITUDES)
+
+    footprint = contour_footprint(mask, LONGITUDES, LATITUDES, **options)
+
+    assert get_num_coordinates(footprint) < get_num_coordinates(exact)
+    # Within a block of 3 pixels of 0.5°
+    np.testing.assert_allclose(footprint.bounds, exact.bounds, atol=1.5)
+
+
+def test_no_valid_pixels():
+    footprint = contour_footprint(np.zeros((45, 45), dtype=bool), LONGITUDES, LATITUDES)
+    assert footprint.is_empty
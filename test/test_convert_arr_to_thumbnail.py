@@ -2,7 +2,13 @@ import numpy as np
 import pytest
 from PIL import Image
 
-from psup_stac_converter.utils.file_utils import convert_arr_to_thumbnail
+from psup_stac_converter.utils.file_utils import (
+    block_mean,
+    convert_arr_to_thumbnail,
+    convert_arr_to_thumbnails,
+    decimation_step,
+    save_images,
+)
 
 
 @pytest.fixture
@@ -147,3 +153,96 @@ def test_rgba_nan_pixels_are_transparent():
     arr = np.array(img)
     assert np.all(arr[2:4, 2:4, 3] == 0), "NaN pixels should be transparent"
     assert np.all(arr[0:2, 0:2, 3] == 255), "Valid pixels should be opaque"
+
+
+def test_omega_fix_flips_upside_down():
+    data = np.random.rand(3, 16, 24)
+    data[:, :4, :] = np.nan
+    original = data.copy()
+
+    img = convert_arr_to_thumbnail(data, (24, 16), mode="RGBA", with_omega_fix=True)
+
+    arr = np.array(img)
+    assert np.all(arr[-4:, :, 3] == 0), "The invalid top rows should end at the bottom"
+    assert np.all(arr[:-4, :, 3] == 255)
+    np.testing.assert_array_equal(data, original)
+
+
+def test_decimation_step():
+    assert decimation_step((64, 64, 3), (32, 32)) == 1
+    assert decimation_step((1024, 2048), (256, 256)) == 2
+    assert decimation_step((128, 5000), (256, 256)) == 1
+    assert decimation_step((32, 3), (320, 10)) == 1
+    assert decimation_step((0,), (32, 32)) == 1
+
+
+def test_decimated_large_image():
+    data = np.random.rand(3, 2048, 2048)
+    data[:, :512, :512] = np.nan
+
+    img = convert_arr_to_thumbnail(data, (256, 256), mode="RGBA")
+
+    arr = np.array(img)
+    assert img.size == (256, 256)
+    assert np.all(arr[:60, :60, 3] == 0)
+    assert np.all(arr[70:, 70:, 3] == 255)
+
+
+def test_block_mean():
+    data = np.arange(36, dtype=float).reshape(6, 6)
+    data[0, 0] = np.nan
+    data[3:, 3:] = np.inf
+
+    result = block_mean(data, 3)
+
+    assert result.dtype == np.float32
+    # The NaN and infinite values are left out of their block
+    np.testing.assert_allclose(result, [[63 / 8, 10], [25, np.nan]])
+
+
+def test_decimation_keeps_every_pixel():
+    # Only the rows skipped by a plain stride hold values
+    data = np.zeros((2048, 2048))
+    data[1::4, :1024] = 1.0
+
+    img = convert_arr_to_thumbnail(data, (256, 256), mode="L")
+
+    arr = np.array(img)
+    assert arr[:, :120].min() > 200
+    assert arr[:, 136:].max() < 50
+    np.testing.assert_allclose(
+        arr,
+        np.array(
+            convert_arr_to_thumbnail(
+                data.reshape(512, 4, 512, 4).mean(axis=(1, 3)), (256, 256), mode="L"
+            )
+        ),
+        atol=1,
+    )
+
+
+def test_thumbnails_of_several_sizes(tmp_path):
+    data = np.random.rand(3, 300, 200)
+    data[:, :30, :] = np.nan
+
+    thumbnails = convert_arr_to_thumbnails(
+        data, [(64, 64), (256, 256), (128, 128), (64, 64)], mode="RGBA"
+    )
+
+    assert list(thumbnails) == [(256, 256), (128, 128), (64, 64)]
+    assert all(img.size == dims for dims, img in thumbnails.items())
+    np.testing.assert_array_equal(
+        np.array(thumbnails[(256, 256)]),
+        np.array(convert_arr_to_thumbnail(data, (256, 256), mode="RGBA")),
+    )
+
+    locations = {tmp_path / f"{w}x{h}.webp": img for (w, h), img in thumbnails.items()}
+    save_images(locations, fmt="webp")
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "128x128.webp",
+        "256x256.webp",
+        "64x64.webp",
+    ]
+    with Image.open(tmp_path / "64x64.webp") as img:
+        assert img.format == "WEBP"
+        assert img.size == (64, 64)
@@ -0,0 +1,46 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from psup_stac_converter.omega._base import find_valid_pixels, select_rgb_from_xarr
+
+
+@pytest.fixture
+def cube_path(tmp_path: Path) -> Path:
+    rng = np.random.default_rng(0)
+    reflectance = rng.random((20, 6, 5)).astype(np.float32)
+    # Pixels without any value, and others with only a few
+    reflectance[:, 0, :] = np.nan
+    reflectance[:15, 1:3, 2] = np.nan
+    reflectance[:, 4, 4] = np.nan
+    dataset = xr.Dataset(
+        {"Reflectance": (("wavelength", "latitude", "longitude"), reflectance)},
+        coords={"wavelength": np.linspace(0.4, 2.5, 20)},
+    )
+    nc_path = tmp_path / "cube.nc"
+    dataset.to_netcdf(nc_path, engine="h5netcdf")
+    return nc_path
+
+
+@pytest.mark.parametrize("chunk_planes", [1, 3, 8, 50])
+def test_valid_pixels_by_chunks(cube_path: Path, chunk_planes: int):
+    with xr.open_dataset(cube_path, engine="h5netcdf", cache=False) as cube:
+        expected = cube.Reflectance.notnull().mean(axis=0).values > 0
+        valid_pixels = find_valid_pixels(cube.Reflectance, chunk_planes=chunk_planes)
+
+    assert valid_pixels.dtype == bool
+    np.testing.assert_array_equal(valid_pixels, expected)
+
+
+def test_rgb_bands_read_one_by_one(cube_path: Path):
+    with xr.open_dataset(cube_path, engine="h5netcdf", cache=False) as cube:
+        expected = cube.isel(wavelength=[4, 10, 16]).Reflectance.values
+        rgb = select_rgb_from_xarr(cube)
+
+        transposed = cube.transpose("latitude", "longitude", "wavelength")
+        rgb_last = select_rgb_from_xarr(transposed)
+
+    np.testing.assert_array_equal(rgb, expected)
+    np.testing.assert_array_equal(rgb_last, np.moveaxis(expected, 0, -1))
@@ -0,0 +1,105 @@
+import struct
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pytest
+import scipy.io as sio
+
+from psup_stac_converter.exceptions import IdlSaveFormatError
+from psup_stac_converter.utils.idl_save import read_sav_variables
+
+
+def _pad(content: bytes) -> bytes:
+    return content + b"\x00" * (-len(content) % 4)
+
+
+def _string(chars: str) -> bytes:
+    return _pad(struct.pack(">l", len(chars)) + chars.encode("latin1"))
+
+
+def _variable(name: str, value) -> bytes:
+    """Content of a VARIABLE record, as IDL writes it"""
+    if isinstance(value, bytes):
+        typedesc = struct.pack(">ll", 7, 0)
+        data = struct.pack(">ll", len(value), len(value)) + value
+    elif isinstance(value, np.ndarray):
+        typecode = {np.dtype("float32"): 4, np.dtype("int16"): 2}[value.dtype]
+        dims = list(value.shape[::-1]) + [1] * (8 - value.ndim)
+        nbytes = value.size * value.itemsize
+        typedesc = struct.pack(">ll", typecode, 4) + struct.pack(
+            ">llllqll8l", 8, 0, nbytes, value.size, value.ndim, 0, 8, *dims
+        )
+        if typecode == 2:
+            # Each value is padded to 4 bytes
+            data = value.astype(">i4").tobytes()
+        else:
+            data = value.astype(">f4").tobytes()
+    else:
+        typedesc = struct.pack(">ll", 4, 0)
+        data = struct.pack(">f", value)
+    return _string(name) + typedesc + struct.pack(">l", 7) + _pad(data)
+
+
+def _write_sav(sav_path: Path, records: list[bytes], compressed: bool = False) -> Path:
+    content = bytearray(b"SR\x00\x06" if compressed else b"SR\x00\x04")
+    for record in records:
+        if compressed:
+            record = zlib.compress(record)
+        nextrec = len(content) + 16 + len(record)
+        content += struct.pack(">lIIl", 2, nextrec % 2**32, nextrec >> 32, 0)
+        content += record
+    content += struct.pack(">lIIl", 6, len(content) + 16, 0, 0)
+    sav_path.write_bytes(bytes(content))
+    return sav_path
+
+
+VARIABLES = {
+    "LAT": np.arange(12, dtype=np.float32).reshape(3, 4),
+    "PRES": np.array([1, 0, 1], dtype=np.int16),
+    "SOLARLONG": 123.5,
+    "POINTING_MODE": b'"NADIR"',
+}
+
+
+@pytest.mark.parametrize("compressed", [False, True])
+def test_same_values_as_scipy(tmp_path: Path, compressed: bool):
+    sav_path = _write_sav(
+        tmp_path / "cube.sav",
+        [_variable(name, value) for name, value in VARIABLES.items()],
+        compressed=compressed,
+    )
+    expected = sio.readsav(sav_path, python_dict=True)
+
+    variables = read_sav_variables(sav_path, VARIABLES)
+
+    assert variables.keys() == expected.keys()
+    for name, value in variables.items():
+        assert type(value) is type(expected[name])
+        np.testing.assert_array_equal(value, expected[name])
+        assert getattr(value, "dtype", None) == getattr(expected[name], "dtype", None)
+
+
+@pytest.mark.parametrize("compressed", [False, True])
+def test_other_variables_are_skipped(tmp_path: Path, compressed: bool):
+    cube = _variable("CUBE", np.ones((8, 16, 16), dtype=np.float32))
+    # Can't be decoded: only skipping it lets the other variables be read
+    broken_cube = cube[:12] + b"\xff" * (len(cube) - 12)
+    sav_path = _write_sav(
+        tmp_path / "cube.sav",
+        [_variable("LAT", VARIABLES["LAT"]), broken_cube, _variable("year", 27.0)],
+        compressed=compressed,
+    )
+
+    variables = read_sav_variables(sav_path, ["lat", "YEAR", "missing"])
+
+    assert list(variables) == ["lat", "year"]
+    assert variables["year"] == 27.0
+
+
+def test_invalid_signature(tmp_path: Path):
+    sav_path = tmp_path / "cube.sav"
+    sav_path.write_bytes(b"not a sav file")
+
+    with pytest.raises(IdlSaveFormatError):
+        read_sav_variables(sav_path, ["lat"])
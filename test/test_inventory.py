@@ -0,0 +1,99 @@
+import os
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from psup_stac_converter.utils.inventory import (
+    InventoryDiff,
+    derive_inventory_columns,
+    diff_inventories,
+    load_inventory,
+    load_inventory_snapshot,
+    save_inventory_snapshot,
+    sizeof_fmt,
+    sizeof_fmt_series,
+)
+
+
+@pytest.fixture
+def inventory_file(tmp_path: Path) -> Path:
+    inventory_file = tmp_path / "psup_refs.csv"
+    pd.DataFrame(
+        [
+            {
+                "file_name": Path(rel_path).name,
+                "rel_path": rel_path,
+                "href": f"http://psup.example/{rel_path}",
+                "total_size": total_size,
+            }
+            for rel_path, total_size in [
+                ("omega/cubes_L3/ORB0001_1.nc", 74452),
+                ("omega/cubes_L2/ORB0001_1.sav", 3 * 1024**3),
+                ("features/crism/crism.tar.gz", 1024),
+                ("features/crism/README", 12),
+            ]
+        ]
+    ).to_csv(inventory_file, index=False)
+    return inventory_file
+
+
+@pytest.mark.parametrize(
+    "total_size", [0, 12, 1023, 1024, 1048575, 3 * 1024**3, 1024**5, 5 * 1024**6]
+)
+def test_sizeof_fmt_series_matches_sizeof_fmt(total_size: int):
+    assert sizeof_fmt_series(pd.Series([total_size])).item() == sizeof_fmt(total_size)
+
+
+def test_derived_columns(inventory_file: Path):
+    df = derive_inventory_columns(pd.read_csv(inventory_file))
+
+    assert df["rel_path"].iloc[0] == "omega/cubes_L2/ORB0001_1.sav"
+    assert df["h_total_size"].iloc[0] == "3.0 GiB"
+    assert df.set_index("file_name")["extension"].to_dict() == {
+        "ORB0001_1.sav": "sav",
+        "ORB0001_1.nc": "nc",
+        "crism.tar.gz": "gz",
+        "README": "",
+    }
+    assert df["category"].tolist() == ["omega", "omega", "features", "features"]
+    assert df["root"].tolist() == ["cubes_L2", "cubes_L3", "crism", "crism"]
+    assert isinstance(df["root"].dtype, pd.CategoricalDtype)
+
+
+def test_sidecar_is_reused_until_the_inventory_changes(inventory_file: Path):
+    sidecar = inventory_file.with_name("psup_refs.csv.parquet")
+    df = load_inventory(inventory_file)
+    assert sidecar.exists()
+    pd.testing.assert_frame_equal(load_inventory(inventory_file), df)
+
+    # Same content, newer modification time
+    os.utime(inventory_file, ns=(0, 0))
+    pd.testing.assert_frame_equal(load_inventory(inventory_file), df)
+
+    pd.read_csv(inventory_file).head(1).to_csv(inventory_file, index=False)
+    assert load_inventory(inventory_file).shape[0] == 1
+
+
+def test_diff_of_inventories(inventory_file: Path, tmp_path: Path):
+    previous = load_inventory(inventory_file)
+    snapshot_file = tmp_path / "last_build.csv"
+    save_inventory_snapshot(previous, snapshot_file)
+
+    current = pd.read_csv(inventory_file)
+    current.loc[current["rel_path"] == "omega/cubes_L3/ORB0001_1.nc", "total_size"] = 1
+    current.loc[current["rel_path"] == "features/crism/README", "href"] = "http://b/"
+    current = current[current["rel_path"] != "omega/cubes_L2/ORB0001_1.sav"]
+    added = {"file_name": "ORB0002_3.nc", "rel_path": "omega/cubes_L3/ORB0002_3.nc"}
+    current = pd.concat(
+        [current, pd.DataFrame([{**added, "href": "h", "total_size": 5}])]
+    )
+
+    inventory_diff = diff_inventories(load_inventory_snapshot(snapshot_file), current)
+
+    assert inventory_diff == InventoryDiff(
+        added=["omega/cubes_L3/ORB0002_3.nc"],
+        changed=["features/crism/README", "omega/cubes_L3/ORB0001_1.nc"],
+        removed=["omega/cubes_L2/ORB0001_1.sav"],
+    )
+    assert not diff_inventories(previous, load_inventory(inventory_file))
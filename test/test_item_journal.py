@@ -0,0 +1,56 @@
+import datetime as dt
+from pathlib import Path
+
+import pystac
+import pytest
+
+from psup_stac_converter.utils.journal import ItemJournal
+
+
+def _item(item_id: str) -> pystac.Item:
+    return pystac.Item(
+        id=item_id,
+        geometry=None,
+        bbox=None,
+        datetime=dt.datetime(2004, 1, 1, tzinfo=dt.UTC),
+        properties={},
+    )
+
+
+@pytest.fixture
+def journal_path(tmp_path: Path) -> Path:
+    return tmp_path / "checkpoints" / "collection.jsonl"
+
+
+def test_recorded_items_are_loaded_back(journal_path: Path):
+    with ItemJournal(journal_path) as journal:
+        journal.record(_item("ORB0001_1"))
+        journal.record(_item("ORB0002_3"))
+
+    items = ItemJournal(journal_path, resume=True).load()
+
+    assert list(items) == ["ORB0001_1", "ORB0002_3"]
+    assert items["ORB0002_3"].datetime == dt.datetime(2004, 1, 1, tzinfo=dt.UTC)
+
+
+def test_line_cut_by_a_crash_is_ignored(journal_path: Path):
+    with ItemJournal(journal_path) as journal:
+        journal.record(_item("ORB0001_1"))
+    with open(journal_path, "a", encoding="utf-8") as journal_f:
+        journal_f.write('{"type": "Feature", "id": "ORB00')
+
+    with ItemJournal(journal_path, resume=True) as journal:
+        assert list(journal.load()) == ["ORB0001_1"]
+        journal.record(_item("ORB0002_3"))
+
+    assert list(ItemJournal(journal_path, resume=True).load()) == [
+        "ORB0001_1",
+        "ORB0002_3",
+    ]
+
+
+def test_journal_starts_over_without_resume(journal_path: Path):
+    with ItemJournal(journal_path) as journal:
+        journal.record(_item("ORB0001_1"))
+
+    assert ItemJournal(journal_path).load() == {}
@@ -0,0 +1,124 @@
+import datetime as dt
+import gc
+import json
+import weakref
+from pathlib import Path
+
+import pystac
+import pytest
+
+from psup_stac_converter.utils.item_writer import (
+    ItemStub,
+    StreamingItemWriter,
+    spatial_extent_of,
+    temporal_extent_of,
+)
+
+
+def _item(item_id: str, x: float, day: int) -> pystac.Item:
+    return pystac.Item(
+        id=item_id,
+        geometry=None,
+        bbox=[x, -10.0, x + 10.0, 10.0],
+        datetime=dt.datetime(2004, 1, day, tzinfo=dt.UTC),
+        properties={},
+        assets={"thumbnail": pystac.Asset(href=f"/thumbnails/{item_id}.png")},
+    )
+
+
+def _collection() -> pystac.Collection:
+    return pystac.Collection(
+        id="omega_c_channel_proj",
+        description="OMEGA",
+        extent=pystac.Extent(
+            spatial=pystac.SpatialExtent(bboxes=[[-180.0, -90.0, 180.0, 90.0]]),
+            temporal=pystac.TemporalExtent(intervals=[[None, None]]),
+        ),
+    )
+
+
+def _read_tree(root: Path) -> dict[str, dict]:
+    tree = {}
+    for json_file in root.rglob("*.json"):
+        stac_dict = json.loads(json_file.read_text())
+        # Links may come in another order
+        stac_dict["links"] = sorted(stac_dict["links"], key=lambda link: link["rel"])
+        tree[json_file.relative_to(root).as_posix()] = stac_dict
+    return tree
+
+
+@pytest.mark.parametrize(
+    "catalog_type",
+    [pystac.CatalogType.SELF_CONTAINED, pystac.CatalogType.ABSOLUTE_PUBLISHED],
+)
+def test_streamed_catalog_is_saved_as_usual(
+    tmp_path: Path, catalog_type: pystac.CatalogType
+):
+    # Kept in memory until the end
+    catalog = pystac.Catalog(id="mars", description="Mars")
+    collection = _collection()
+    collection.add_items([_item("ORB0001_1", 0.0, 1), _item("ORB0002_3", 20.0, 2)])
+    catalog.add_child(collection)
+    catalog.normalize_hrefs((tmp_path / "in_memory").as_posix())
+    catalog.save(catalog_type=catalog_type)
+
+    # Written along the way
+    catalog = pystac.Catalog(id="mars", description="Mars")
+    catalog.catalog_type = catalog_type
+    catalog.normalize_hrefs((tmp_path / "streamed").as_posix())
+    writer = StreamingItemWriter(catalog)
+    collection = _collection()
+    writer.attach(collection)
+    for item in [_item("ORB0001_1", 0.0, 1), _item("ORB0002_3", 20.0, 2)]:
+        writer.write(collection, item)
+    catalog.add_child(collection)
+    catalog.normalize_hrefs((tmp_path / "streamed").as_posix(), skip_unresolved=True)
+    catalog.save(catalog_type=catalog_type)
+
+    in_memory = _read_tree(tmp_path / "in_memory")
+    streamed = _read_tree(tmp_path / "streamed")
+    if catalog_type == pystac.CatalogType.ABSOLUTE_PUBLISHED:
+        in_memory = json.loads(
+            json.dumps(in_memory).replace("/in_memory/", "/streamed/")
+        )
+    assert streamed == in_memory
+
+
+def test_written_items_are_released(tmp_path: Path):
+    catalog = pystac.Catalog(id="mars", description="Mars")
+    catalog.normalize_hrefs(tmp_path.as_posix())
+    writer = StreamingItemWriter(catalog)
+    collection = _collection()
+    writer.attach(collection)
+
+    item = _item("ORB0001_1", 0.0, 1)
+    item_ref = weakref.ref(item)
+    item_stub = writer.write(collection, item)
+    del item
+    gc.collect()
+
+    assert item_ref() is None
+    assert (
+        item_stub.href
+        == (
+            tmp_path / "omega_c_channel_proj" / "ORB0001_1" / "ORB0001_1.json"
+        ).as_posix()
+    )
+    assert not collection.get_single_link(pystac.RelType.ITEM).is_resolved()
+
+
+def test_extents_of_stubs():
+    item_stubs = [
+        ItemStub.from_item(_item("ORB0002_3", 20.0, 2)),
+        ItemStub.from_item(_item("ORB0001_1", 0.0, 1)),
+    ]
+
+    assert spatial_extent_of(item_stubs).bboxes == [[0.0, -10.0, 30.0, 10.0]]
+    assert temporal_extent_of(item_stubs).intervals == [
+        [dt.datetime(2004, 1, 1, tzinfo=dt.UTC), dt.datetime(2004, 1, 2, tzinfo=dt.UTC)]
+    ]
+
+
+def test_catalog_needs_an_href():
+    with pytest.raises(ValueError):
+        StreamingItemWriter(pystac.Catalog(id="mars", description="Mars"))
@@ -0,0 +1,97 @@
+from pathlib import Path
+
+import psutil
+import pytest
+
+from psup_stac_converter.exceptions import OutOfMemoryError
+from psup_stac_converter.utils.downloader import MemoryManager
+
+MiB = 1024**2
+
+
+@pytest.fixture
+def cgroup(tmp_path: Path) -> dict[str, Path]:
+    """A container limited to 1 GiB in a cgroup v2 hierarchy"""
+    cgroup_root = tmp_path / "cgroup"
+    pod_folder = cgroup_root / "kubepods" / "pod1"
+    container_folder = pod_folder / "container1"
+    container_folder.mkdir(parents=True)
+    (cgroup_root / "memory.max").write_text("max\n")
+    (pod_folder / "memory.max").write_text(f"{1024 * MiB}\n")
+    (container_folder / "memory.max").write_text("max\n")
+    set_usage(container_folder, current_mb=200, inactive_file_mb=100)
+
+    proc_cgroup = tmp_path / "proc_cgroup"
+    proc_cgroup.write_text("0::/kubepods/pod1/container1\n")
+    return {
+        "cgroup_root": cgroup_root,
+        "proc_cgroup": proc_cgroup,
+        "folder": container_folder,
+    }
+
+
+def set_usage(cgroup_folder: Path, current_mb: int, inactive_file_mb: int = 0):
+    (cgroup_folder / "memory.current").write_text(f"{current_mb * MiB}\n")
+    (cgroup_folder / "memory.stat").write_text(
+        f"anon {current_mb * MiB}\ninactive_file {inactive_file_mb * MiB}\n"
+    )
+
+
+def test_limit_of_the_cgroup(cgroup: dict[str, Path]):
+    memory_manager = MemoryManager(
+        cgroup_root=cgroup["cgroup_root"], proc_cgroup=cgroup["proc_cgroup"]
+    )
+
+    if psutil.virtual_memory().total > 1024 * MiB:
+        assert memory_manager.limited_by_cgroup
+        assert memory_manager.total_mb == 1024
+        assert memory_manager.threshold_mb == pytest.approx(716.8)
+    # The file cache isn't counted
+    assert memory_manager.group_used_mb == 100
+
+
+def test_no_cgroup(tmp_path: Path):
+    memory_manager = MemoryManager(
+        cgroup_root=tmp_path, proc_cgroup=tmp_path / "missing"
+    )
+
+    assert memory_manager.cgroup_folder is None
+    assert not memory_manager.limited_by_cgroup
+    assert memory_manager.total_mb == psutil.virtual_memory().total / MiB
+
+
+def test_tasks_are_admitted_while_they_fit(cgroup: dict[str, Path]):
+    memory_manager = MemoryManager(
+        cgroup_root=cgroup["cgroup_root"], proc_cgroup=cgroup["proc_cgroup"]
+    )
+    memory_manager.total_mb = 1024
+    memory_manager.threshold_mb = 700
+
+    assert memory_manager.try_reserve(400)
+    assert not memory_manager.try_reserve(300)
+    assert memory_manager.try_reserve(150)
+    assert memory_manager.n_reserved == 2
+
+    # Running tasks take more than expected
+    memory_manager.release(150)
+    set_usage(cgroup["folder"], current_mb=650)
+    assert not memory_manager.try_reserve(100)
+
+    # Alone, a task is admitted whatever its size
+    memory_manager.release(400)
+    assert memory_manager.try_reserve(5000)
+    memory_manager.release(5000)
+    assert memory_manager.reserved_mb == 0
+
+
+def test_check_counts_the_whole_cgroup(cgroup: dict[str, Path]):
+    memory_manager = MemoryManager(
+        cgroup_root=cgroup["cgroup_root"], proc_cgroup=cgroup["proc_cgroup"]
+    )
+    if not memory_manager.limited_by_cgroup:
+        pytest.skip("The host has less RAM than the cgroup limit")
+
+    memory_manager.check()
+    set_usage(cgroup["folder"], current_mb=900, inactive_file_mb=10)
+    with pytest.raises(OutOfMemoryError):
+        memory_manager.check()
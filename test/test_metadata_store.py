@@ -0,0 +1,62 @@
+import json
+import pickle
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from psup_stac_converter.utils.metadata_store import MetadataStore
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> Iterator[MetadataStore]:
+    store = MetadataStore(tmp_path / "omega_metadata.sqlite")
+    yield store
+    store.close()
+
+
+def test_put_and_get(store: MetadataStore):
+    assert store.get("l2_sav", "ORB0001_1") is None
+
+    store.put("l2_sav", "ORB0001_1", {"dims": [128, 300]})
+    store.put("l3_sav", "ORB0001_1", {"dims": [64, 64]})
+
+    assert store.get("l2_sav", "ORB0001_1") == {"dims": [128, 300]}
+    assert store.count("l2_sav") == 1
+
+
+def test_bulk_read_and_write(store: MetadataStore):
+    store.put_many("l2_nc", {f"ORB000{i}_1": {"i": i} for i in range(5)})
+
+    assert store.get_many("l2_nc", ["ORB0001_1", "ORB0003_1", "ORB0009_1"]) == {
+        "ORB0001_1": {"i": 1},
+        "ORB0003_1": {"i": 3},
+    }
+    assert len(store.get_many("l2_nc")) == 5
+
+
+def test_store_is_shared_through_pickling(store: MetadataStore):
+    store.put("l2_sav", "ORB0001_1", {"dims": [128, 300]})
+    worker_store = pickle.loads(pickle.dumps(store))
+    worker_store.put("l2_sav", "ORB0002_1", {"dims": [64, 300]})
+    worker_store.close()
+
+    assert store.get("l2_sav", "ORB0002_1") == {"dims": [64, 300]}
+
+
+def test_json_folder_is_imported_once(store: MetadataStore, tmp_path: Path):
+    folder = tmp_path / "l2_sav"
+    folder.mkdir()
+    (folder / "sav_ORB0001_1.json").write_text(json.dumps({"dims": [128, 300]}))
+    (folder / "sav_ORB0002_1.json").write_text("{}")
+    (folder / "sav_ORB0003_1.json").write_text('{"dims": [12')
+    store.put("l2_sav", "ORB0004_1", {"dims": [1, 1]})
+    (folder / "sav_ORB0004_1.json").write_text(json.dumps({"dims": [0, 0]}))
+
+    assert store.import_json_folder("l2_sav", folder, file_prefix="sav_") == 1
+    assert store.get("l2_sav", "ORB0001_1") == {"dims": [128, 300]}
+    assert store.get("l2_sav", "ORB0002_1") is None
+    assert store.get("l2_sav", "ORB0004_1") == {"dims": [1, 1]}
+
+    (folder / "sav_ORB0005_1.json").write_text(json.dumps({"dims": [2, 2]}))
+    assert store.import_json_folder("l2_sav", folder, file_prefix="sav_") == 0
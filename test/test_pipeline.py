@@ -0,0 +1,108 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from psup_stac_converter.utils.pipeline import StagedPipeline
+
+
+def fetch(key: int) -> str:
+    # Later inputs are fetched faster, but are written in order anyway
+    time.sleep(0.01 * (5 - key % 5))
+    return f"file{key}"
+
+
+def process(key: int, fetched: str) -> str:
+    return f"{fetched}-item{key}"
+
+
+def test_results_are_written_in_order():
+    written = []
+    with ThreadPoolExecutor(max_workers=2) as process_executor:
+        pipeline = StagedPipeline(
+            fetch,
+            process,
+            lambda key, result: written.append(result),
+            process_executor,
+            fetch_concurrency=3,
+            process_concurrency=2,
+            queue_size=2,
+        )
+        pipeline.run(range(10))
+
+    assert written == [f"file{key}-item{key}" for key in range(10)]
+    assert [stats.n_done for stats in pipeline.stats.values()] == [10, 10, 10]
+    assert pipeline.stats["fetch"].busy_pct(pipeline.elapsed) > 0
+    assert pipeline.report()[0].startswith("fetch: 10 done")
+
+
+def test_an_error_stops_the_stages():
+    def failing_process(key: int, fetched: str) -> str:
+        if key == 3:
+            raise MemoryError("Not enough memory left")
+        return fetched
+
+    written = []
+    with ThreadPoolExecutor(max_workers=1) as process_executor:
+        pipeline = StagedPipeline(
+            fetch,
+            failing_process,
+            lambda key, result: written.append(key),
+            process_executor,
+        )
+        with pytest.raises(MemoryError):
+            pipeline.run(range(100))
+
+    assert written == [0, 1, 2]
+    assert pipeline.stats["fetch"].n_done < 100
+
+
+class AdmitAll:
+    """Memory manager admitting every input"""
+
+    def try_reserve(self, mb: float) -> bool:
+        return True
+
+    def release(self, mb: float):
+        pass
+
+
+def test_fetched_bytes_within_budget():
+    sizes = {0: 60, 1: 60, 2: 500, 3: 30, 4: 30}
+    held = {}
+
+    def process_when_held(key: int, fetched: str) -> str:
+        held[key] = pipeline.bytes_held
+        return fetched
+
+    estimate_threads = []
+
+    def estimate_mb(key: int) -> float:
+        estimate_threads.append(threading.current_thread().name)
+        return 1.0
+
+    written = []
+    with ThreadPoolExecutor(max_workers=2) as process_executor:
+        pipeline = StagedPipeline(
+            fetch,
+            process_when_held,
+            lambda key, result: written.append(key),
+            process_executor,
+            fetch_concurrency=4,
+            process_concurrency=2,
+            memory_manager=AdmitAll(),
+            estimate_mb=estimate_mb,
+            fetch_size=sizes.__getitem__,
+            fetch_max_bytes=100,
+        )
+        pipeline.run(range(5))
+
+    assert written == list(range(5))
+    # The input larger than the budget is fetched alone
+    assert held[2] == 500
+    assert all(held[key] <= 100 for key in [0, 1, 3, 4])
+    assert pipeline.bytes_held == 0
+    # Out of the event loop
+    assert all(name.startswith("pipeline-fetch") for name in estimate_threads)
+    assert len(estimate_threads) == 5
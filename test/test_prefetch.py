@@ -0,0 +1,96 @@
+import threading
+import time
+from pathlib import Path
+
+from psup_stac_converter.utils.prefetch import Prefetcher, PrefetchJob
+
+
+def write_job(name: str, size: int, started: list[str]) -> PrefetchJob:
+    def fetch(folder: Path) -> Path:
+        started.append(name)
+        file_path = folder / name
+        file_path.write_bytes(b"\x00" * size)
+        return file_path
+
+    return PrefetchJob(name, size, fetch)
+
+
+def plan_of(sizes: dict[str, int], started: list[str], planned: list[str]):
+    for key, size in sizes.items():
+        planned.append(key)
+        yield key, [write_job(f"{key}.nc", size, started)]
+
+
+def test_files_are_fetched_in_order_within_the_depth():
+    started, planned = [], []
+    with Prefetcher(
+        plan_of({"a": 1, "b": 1, "c": 1, "d": 1}, started, planned), depth=2
+    ) as prefetcher:
+        # The plan is only consumed as entries are taken
+        assert planned == ["a", "b"]
+
+        fetched = prefetcher.take("a")
+        assert list(fetched) == ["a.nc"]
+        assert fetched["a.nc"].read_bytes() == b"\x00"
+        assert planned == ["a", "b", "c"]
+
+        # Taken twice: fetched again by the caller
+        assert prefetcher.take("a") == {}
+
+        assert list(prefetcher.take("b")) == ["b.nc"]
+        assert list(prefetcher.take("c")) == ["c.nc"]
+        assert list(prefetcher.take("d")) == ["d.nc"]
+
+    assert sorted(started) == ["a.nc", "b.nc", "c.nc", "d.nc"]
+    assert not prefetcher.folder.exists()
+
+
+def test_files_fit_in_the_budget():
+    started, planned = [], []
+    with Prefetcher(
+        plan_of({"a": 6, "b": 6, "c": 2, "d": 20}, started, planned),
+        depth=3,
+        max_bytes=10,
+    ) as prefetcher:
+        assert prefetcher.bytes_ahead == 6
+        prefetcher.take("a")
+        assert prefetcher.bytes_ahead == 8
+        prefetcher.take("b")
+        prefetcher.take("c")
+        # Larger than the budget, but nothing else is ahead
+        assert prefetcher.bytes_ahead == 20
+        prefetcher.take("d")
+        assert prefetcher.bytes_ahead == 0
+
+
+def test_entries_not_taken_are_dropped():
+    started, planned = [], []
+    with Prefetcher(
+        plan_of({"a": 1, "b": 1, "c": 1}, started, planned), depth=2
+    ) as prefetcher:
+        assert list(prefetcher.take("b")) == ["b.nc"]
+        prefetcher.take("c")
+        # Removed once fetched
+        deadline = time.monotonic() + 5
+        while (prefetcher.folder / "a.nc").exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert sorted(path.name for path in prefetcher.folder.iterdir()) == [
+            "b.nc",
+            "c.nc",
+        ]
+
+
+def test_failed_files_are_left_to_the_caller():
+    release = threading.Event()
+
+    def failing_fetch(folder: Path) -> Path:
+        release.wait(timeout=5)
+        raise OSError("Connection reset")
+
+    started = []
+    plan = [
+        ("a", [PrefetchJob("a.sav", 1, failing_fetch), write_job("a.nc", 1, started)])
+    ]
+    with Prefetcher(plan, depth=1) as prefetcher:
+        release.set()
+        assert list(prefetcher.take("a")) == ["a.nc"]
@@ -0,0 +1,41 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from psup_stac_converter.utils.downloader import PsupArchive
+
+
+@pytest.fixture
+def archive(tmp_path: Path) -> PsupArchive:
+    archive_file = tmp_path / "psup_refs.csv"
+    pd.DataFrame(
+        [
+            {
+                "file_name": file_name,
+                "rel_path": f"omega/cubes_L3/{file_name}",
+                "href": f"http://psup.example/omega/cubes_L3/{file_name}",
+                "total_size": total_size,
+            }
+            for file_name, total_size in [
+                ("ORB0001_1.nc", 10),
+                ("ORB0001_10.nc", 20),
+                ("ORB0001_1.sav", 30),
+            ]
+        ]
+    ).to_csv(archive_file, index=False)
+    return PsupArchive(archive_file)
+
+
+def test_find_by_file_name_is_exact(archive: PsupArchive):
+    row = archive.find_by_file_name("ORB0001_1.nc")
+    assert row["total_size"] == 10
+    assert archive.find_by_file_name("ORB0001_1") is None
+
+
+def test_find_size_by_href(archive: PsupArchive):
+    assert (
+        archive._find_size_by_href("http://psup.example/omega/cubes_L3/ORB0001_10.nc")
+        == 20
+    )
+    assert archive._find_size_by_href("http://psup.example/missing.nc") is None
@@ -0,0 +1,111 @@
+import io
+from pathlib import Path
+
+import httpx
+import numpy as np
+import pytest
+import xarray as xr
+
+from psup_stac_converter.exceptions import RangeRequestUnsupportedError
+from psup_stac_converter.utils.remote_file import HttpRangeFile
+
+URL = "http://psup.example/omega/cubes_L3/ORB0001_1.nc"
+
+
+def serve(content: bytes, requests: list[str | None], accept_ranges: bool = True):
+    def handler(request: httpx.Request) -> httpx.Response:
+        range_header = request.headers.get("Range")
+        requests.append(range_header)
+        if range_header is None or not accept_ranges:
+            return httpx.Response(200, content=content)
+        start, _, end = range_header.removeprefix("bytes=").partition("-")
+        return httpx.Response(206, content=content[int(start) : int(end) + 1])
+
+    return httpx.Client(transport=httpx.MockTransport(handler))
+
+
+def test_reads_and_seeks_like_a_file():
+    content = bytes(range(256)) * 10
+    requests = []
+    remote_f = HttpRangeFile(
+        serve(content, requests), URL, len(content), block_size=100
+    )
+
+    assert remote_f.read(10) == content[:10]
+    remote_f.seek(-20, io.SEEK_END)
+    assert remote_f.read() == content[-20:]
+    remote_f.seek(150)
+    assert remote_f.read(300) == content[150:450]
+    assert remote_f.read(0) == b""
+    remote_f.seek(len(content) + 5)
+    assert remote_f.read(10) == b""
+
+    # Blocks already fetched aren't requested again, consecutive ones together
+    assert requests == ["bytes=0-99", "bytes=2500-2559", "bytes=100-499"]
+    remote_f.seek(0)
+    assert remote_f.read(500) == content[:500]
+    assert len(requests) == 3
+
+
+def test_server_without_ranges():
+    requests = []
+    remote_f = HttpRangeFile(
+        serve(b"0123456789", requests, accept_ranges=False), URL, 10
+    )
+
+    with pytest.raises(RangeRequestUnsupportedError):
+        remote_f.read(2)
+
+
+def test_netcdf_header_without_the_data(tmp_path: Path):
+    dataset = xr.Dataset(
+        {"Reflectance": (("latitude", "longitude"), np.ones((512, 512)))},
+        coords={"latitude": np.linspace(-10, 10, 512), "longitude": np.arange(512)},
+    )
+    dataset["Reflectance"].attrs = {"valid_min": 0.0, "valid_max": 1.0, "units": "1"}
+    dataset.attrs["history"] = "Created 01/02/10"
+    nc_path = tmp_path / "ORB0001_1.nc"
+    dataset.to_netcdf(nc_path, engine="h5netcdf")
+    content = nc_path.read_bytes()
+
+    requests = []
+    with HttpRangeFile(
+        serve(content, requests), URL, len(content), block_size=16 * 1024
+    ) as remote_f:
+        with xr.open_dataset(remote_f, engine="h5netcdf") as nc_header:
+            assert nc_header.attrs["history"] == "Created 01/02/10"
+            assert nc_header["Reflectance"].attrs["valid_max"] == 1.0
+            np.testing.assert_array_equal(
+                nc_header.coords["latitude"].values, dataset.coords["latitude"].values
+            )
+        # The 2 MiB of reflectance are left out
+        assert remote_f.bytes_fetched < len(content) / 10
+
+
+def test_read_larger_than_the_blocks_in_memory():
+    content = bytes(range(256)) * 40
+    requests = []
+    remote_f = HttpRangeFile(
+        serve(content, requests), URL, len(content), block_size=1024, max_blocks=4
+    )
+
+    assert remote_f.read(8192) == content[:8192]
+    assert requests == ["bytes=0-8191"]
+    # Only the last blocks are kept
+    remote_f.seek(7168)
+    assert remote_f.read(1024) == content[7168:8192]
+    assert len(requests) == 1
+
+
+def test_read_around_a_block_in_memory():
+    content = bytes(range(256)) * 40
+    requests = []
+    remote_f = HttpRangeFile(
+        serve(content, requests), URL, len(content), block_size=1024, max_blocks=4
+    )
+
+    remote_f.seek(2048)
+    assert remote_f.read(10) == content[2048:2058]
+    remote_f.seek(0)
+    assert remote_f.read(6144) == content[:6144]
+    assert requests == ["bytes=2048-3071", "bytes=0-2047", "bytes=3072-6143"]
@@ -0,0 +1,164 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from psup_stac_converter.utils.cache import ResourceCache
+from psup_stac_converter.utils.downloader import PsupArchive
+
+HREF = "http://psup.example/omega/cubes_L3/ORB0001_1.nc"
+
+
+def _add_entry(cache: ResourceCache, href: str, content: bytes) -> Path:
+    with cache.reserve(href, len(content)) as tmp_path:
+        tmp_path.write_bytes(content)
+    return cache.path_for(href, len(content))
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> ResourceCache:
+    return ResourceCache(tmp_path / "cache", max_bytes=100)
+
+
+@pytest.fixture
+def archive_file(tmp_path: Path) -> Path:
+    archive_file = tmp_path / "psup_refs.csv"
+    pd.DataFrame(
+        [
+            {
+                "file_name": "ORB0001_1.nc",
+                "rel_path": "omega/cubes_L3/ORB0001_1.nc",
+                "href": HREF,
+                "total_size": 10,
+            }
+        ]
+    ).to_csv(archive_file, index=False)
+    return archive_file
+
+
+def test_miss_then_hit(cache: ResourceCache):
+    assert cache.get(HREF, 10) is None
+    entry = _add_entry(cache, HREF, b"0123456789")
+
+    assert cache.get(HREF, 10) == entry
+    assert entry.suffix == ".nc"
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 1
+    assert cache.stats["bytes_added"] == 10
+
+
+def test_size_is_part_of_the_key(cache: ResourceCache):
+    _add_entry(cache, HREF, b"0123456789")
+    assert cache.get(HREF, 11) is None
+
+
+def test_least_recently_used_is_evicted(cache: ResourceCache):
+    first = _add_entry(cache, "http://psup.example/a.sav", b"a" * 40)
+    second = _add_entry(cache, "http://psup.example/b.sav", b"b" * 40)
+    os.utime(first, (1, 1))
+    os.utime(second, (2, 2))
+    # "a" is used again and becomes the most recent entry
+    cache.get("http://psup.example/a.sav", 40)
+
+    third = _add_entry(cache, "http://psup.example/c.sav", b"c" * 40)
+
+    assert first.exists()
+    assert not second.exists()
+    assert third.exists()
+    assert cache.size == 80
+    assert cache.stats["evictions"] == 1
+
+
+def test_entry_in_use_is_not_evicted(cache: ResourceCache):
+    first = _add_entry(cache, "http://psup.example/a.sav", b"a" * 40)
+    second = _add_entry(cache, "http://psup.example/b.sav", b"b" * 40)
+    os.utime(first, (1, 1))
+    os.utime(second, (2, 2))
+
+    with cache.locked("http://psup.example/a.sav", 40, shared=True):
+        _add_entry(cache, "http://psup.example/c.sav", b"c" * 40)
+        assert first.exists()
+
+    assert not second.exists()
+
+
+def test_concurrent_misses_download_once(cache: ResourceCache):
+    downloads = []
+    started = threading.Barrier(4)
+
+    def download(part_path: Path):
+        downloads.append(part_path)
+        part_path.write_bytes(b"0123456789")
+
+    def read_entry(_) -> bytes:
+        started.wait()
+        with cache.use(HREF, 10, download) as entry:
+            return entry.read_bytes()
+
+    with ThreadPoolExecutor(4) as executor:
+        contents = list(executor.map(read_entry, range(4)))
+
+    assert contents == [b"0123456789"] * 4
+    assert len(downloads) == 1
+
+
+def test_entry_larger_than_budget_is_kept_for_use(cache: ResourceCache):
+    entry = _add_entry(cache, HREF, b"x" * 150)
+    assert entry.exists()
+
+
+def test_failed_download_is_not_published(cache: ResourceCache):
+    with pytest.raises(ConnectionError):
+        with cache.reserve(HREF, 10) as tmp_path:
+            tmp_path.write_bytes(b"01234")
+            raise ConnectionError("Connection lost")
+
+    assert cache.get(HREF, 10) is None
+    assert cache.size == 0
+    # Kept to resume the download
+    assert tmp_path.read_bytes() == b"01234"
+
+
+def test_open_resource_downloads_once(
+    archive_file: Path, cache: ResourceCache, monkeypatch: pytest.MonkeyPatch
+):
+    archive = PsupArchive(archive_file, cache=cache)
+    downloads = []
+
+    def fake_download(remote_url: str, part_path: Path, **kwargs):
+        downloads.append(remote_url)
+        part_path.write_bytes(b"0123456789")
+
+    monkeypatch.setattr(archive, "_download_part", fake_download)
+
+    for _ in range(2):
+        with archive.open_resource(HREF) as resource_f:
+            assert resource_f.read() == b"0123456789"
+
+    assert downloads == [HREF]
+    assert cache.stats["hits"] == 1
+
+
+@pytest.mark.parametrize("link_from_cache", [False, True])
+def test_saved_file_and_entry(
+    archive_file: Path,
+    cache: ResourceCache,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    link_from_cache: bool,
+):
+    archive = PsupArchive(archive_file, cache=cache, link_from_cache=link_from_cache)
+    monkeypatch.setattr(
+        archive,
+        "_download_part",
+        lambda remote_url, part_path, **kwargs: part_path.write_bytes(b"0123456789"),
+    )
+    dst = tmp_path / "ORB0001_1.nc"
+
+    archive._save_on_disk(HREF, dst, total_size=10)
+
+    assert dst.read_bytes() == b"0123456789"
+    assert dst.samefile(cache.path_for(HREF, 10)) == link_from_cache
@@ -0,0 +1,163 @@
+from pathlib import Path
+
+import httpx
+import pandas as pd
+import pytest
+
+from psup_stac_converter.exceptions import IncompleteDownloadError
+from psup_stac_converter.utils.downloader import PsupArchive
+
+HREF = "http://psup.example/omega/cubes_L2/ORB0001_1.sav"
+CONTENT = bytes(range(256)) * 4
+
+pytestmark = pytest.mark.filterwarnings("ignore::tqdm.TqdmExperimentalWarning")
+
+
+@pytest.fixture
+def archive(tmp_path: Path) -> PsupArchive:
+    archive_file = tmp_path / "psup_refs.csv"
+    pd.DataFrame(
+        [
+            {
+                "file_name": "ORB0001_1.sav",
+                "rel_path": "omega/cubes_L2/ORB0001_1.sav",
+                "href": HREF,
+                "total_size": len(CONTENT),
+            }
+        ]
+    ).to_csv(archive_file, index=False)
+    return PsupArchive(archive_file)
+
+
+def serve(requests: list[str | None], accept_ranges: bool = True, max_bytes=None):
+    def handler(request: httpx.Request) -> httpx.Response:
+        range_header = request.headers.get("Range")
+        requests.append(range_header)
+        if range_header is not None and accept_ranges:
+            start, _, end = range_header.removeprefix("bytes=").partition("-")
+            end = int(end) + 1 if end else None
+            return httpx.Response(
+                206,
+                content=CONTENT[:max_bytes][int(start) : end],
+                headers={"Content-Range": f"bytes {start}-{end}/{len(CONTENT)}"},
+            )
+        return httpx.Response(200, content=CONTENT[:max_bytes])
+
+    return httpx.Client(transport=httpx.MockTransport(handler))
+
+
+def test_download_resumes_from_part_file(archive: PsupArchive, tmp_path: Path):
+    dst = tmp_path / "ORB0001_1.sav"
+    dst.with_name("ORB0001_1.sav.part").write_bytes(CONTENT[:100])
+    requests = []
+
+    archive._download_to_file(
+        HREF, dst, total_size=len(CONTENT), client=serve(requests)
+    )
+
+    assert requests == ["bytes=100-"]
+    assert dst.read_bytes() == CONTENT
+    assert not dst.with_name("ORB0001_1.sav.part").exists()
+
+
+def test_download_starts_over_without_range_support(
+    archive: PsupArchive, tmp_path: Path
+):
+    dst = tmp_path / "ORB0001_1.sav"
+    dst.with_name("ORB0001_1.sav.part").write_bytes(b"garbage")
+    requests = []
+
+    archive._download_to_file(
+        HREF, dst, total_size=len(CONTENT), client=serve(requests, accept_ranges=False)
+    )
+
+    assert requests == ["bytes=7-"]
+    assert dst.read_bytes() == CONTENT
+
+
+def test_truncated_download_is_kept_for_later(archive: PsupArchive, tmp_path: Path):
+    dst = tmp_path / "ORB0001_1.sav"
+    requests = []
+
+    with pytest.raises(IncompleteDownloadError):
+        archive._download_to_file(
+            HREF, dst, total_size=len(CONTENT), client=serve(requests, max_bytes=500)
+        )
+
+    assert len(requests) == archive.download_attempts
+    assert not dst.exists()
+    assert dst.with_name("ORB0001_1.sav.part").stat().st_size == 500
+
+
+def test_segmented_download(archive: PsupArchive, tmp_path: Path):
+    archive.segment_threshold = 1000
+    archive.n_segments = 3
+    dst = tmp_path / "ORB0001_1.sav"
+    requests = []
+
+    archive._download_to_file(
+        HREF, dst, total_size=len(CONTENT), client=serve(requests)
+    )
+
+    assert sorted(requests) == [
+        "bytes=0-0",
+        "bytes=0-341",
+        "bytes=342-683",
+        "bytes=684-1023",
+    ]
+    assert dst.read_bytes() == CONTENT
+
+
+def test_segmented_download_falls_back_to_single_stream(
+    archive: PsupArchive, tmp_path: Path
+):
+    archive.segment_threshold = 1000
+    dst = tmp_path / "ORB0001_1.sav"
+    requests = []
+
+    archive._download_to_file(
+        HREF, dst, total_size=len(CONTENT), client=serve(requests, accept_ranges=False)
+    )
+
+    assert requests == ["bytes=0-0", None]
+    assert dst.read_bytes() == CONTENT
+
+
+def test_injected_client_is_shared_and_left_open(archive: PsupArchive, tmp_path: Path):
+    requests = []
+    client = serve(requests)
+    archive = PsupArchive(tmp_path / "psup_refs.csv", client=client)
+
+    archive._download_to_file(HREF, tmp_path / "a.sav", total_size=len(CONTENT))
+    archive._download_to_file(HREF, tmp_path / "b.sav", total_size=len(CONTENT))
+    archive.close()
+
+    assert requests == [None, None]
+    assert not client.is_closed
+
+
+def test_failed_segmented_download_is_resumed(archive: PsupArchive, tmp_path: Path):
+    archive.segment_threshold = 1000
+    archive.n_segments = 3
+    dst = tmp_path / "ORB0001_1.sav"
+    segments_path = tmp_path / "ORB0001_1.sav.seg.part"
+    requests = []
+
+    # The second range stops after 100 bytes, the third one gets nothing
+    with pytest.raises(IncompleteDownloadError):
+        archive._download_to_file(
+            HREF, dst, total_size=len(CONTENT), client=serve(requests, max_bytes=442)
+        )
+
+    assert segments_path.stat().st_size == len(CONTENT)
+    assert (tmp_path / "ORB0001_1.sav.progress.part").exists()
+
+    requests = []
+    archive._download_to_file(
+        HREF, dst, total_size=len(CONTENT), client=serve(requests)
+    )
+
+    # The first range isn't downloaded again, nor the start of the second one
+    assert sorted(requests) == ["bytes=0-0", "bytes=442-683", "bytes=684-1023"]
+    assert dst.read_bytes() == CONTENT
+    assert not list(tmp_path.glob("*.part"))
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from psup_stac_converter.omega.c_channel_proj import OmegaCChannelProj
+
+
+@pytest.fixture
+def reader(make_c_channel_reader) -> OmegaCChannelProj:
+    return make_c_channel_reader({"ORB0001_1.nc": 1000, "ORB0001_1.sav": 9})
+
+
+def render(reader: OmegaCChannelProj, orbit_cube_idx: str):
+    reader.make_thumbnail(
+        orbit_cube_idx,
+        np.random.rand(3, 40, 30),
+        reader.thumbnail_dims,
+        mode=reader.thumbnail_mode,
+        thumbnail_location=reader.thumbnail_location(orbit_cube_idx),
+    )
+    reader.metadata_store.put(
+        reader.thumbnail_kind, orbit_cube_idx, reader.thumbnail_key(orbit_cube_idx)
+    )
+
+
+def test_thumbnail_made_again_when_its_rendering_changes(
+    reader: OmegaCChannelProj,
+):
+    assert not reader.thumbnail_is_current("ORB0001_1")
+
+    render(reader, "ORB0001_1")
+    assert reader.thumbnail_is_current("ORB0001_1")
+    assert list(reader.thumbnail_folder.iterdir()) == [
+        reader.thumbnail_location("ORB0001_1")
+    ]
+
+    reader.thumbnail_mode = "RGB"
+    assert not reader.thumbnail_is_current("ORB0001_1")
+    assert [job.name for job in reader.prefetch_jobs("ORB0001_1")] == ["nc", "sav"]
+
+
+def test_thumbnail_made_again_when_its_source_changes(make_c_channel_reader):
+    reader = make_c_channel_reader({"ORB0001_1.nc": 1000, "ORB0001_1.sav": 9})
+    render(reader, "ORB0001_1")
+    reader.close()
+
+    reader = make_c_channel_reader({"ORB0001_1.nc": 2000, "ORB0001_1.sav": 9})
+    assert not reader.thumbnail_is_current("ORB0001_1")
+
+
+def test_thumbnail_without_key_is_adopted(reader: OmegaCChannelProj):
+    reader.make_thumbnail(
+        "ORB0001_1",
+        np.random.rand(3, 40, 30),
+        reader.thumbnail_dims,
+        thumbnail_location=reader.thumbnail_location("ORB0001_1"),
+    )
+    assert reader.metadata_store.get(reader.thumbnail_kind, "ORB0001_1") is None
+
+    assert reader.thumbnail_is_current("ORB0001_1")
+    reader.estimate_peak_mb("ORB0001_1")
+    # Only recorded with the item
+    assert reader.metadata_store.get(reader.thumbnail_kind, "ORB0001_1") is None
+
+    reader.record_thumbnail_key("ORB0001_1")
+    assert reader.metadata_store.get(
+        reader.thumbnail_kind, "ORB0001_1"
+    ) == reader.thumbnail_key("ORB0001_1")
+    assert reader.thumbnail_is_current("ORB0001_1")
+
+
+def test_thumbnails_of_several_sizes(make_c_channel_reader):
+    reader = make_c_channel_reader(
+        {"ORB0001_1.nc": 1000, "ORB0001_1.sav": 9},
+        thumbnail_sizes=[256, 64, 1024],
+        thumbnail_format="webp",
+    )
+    assert reader.thumbnail_dims == (256, 256)
+
+    reader.make_thumbnails("ORB0001_1", np.random.rand(3, 40, 30))
+
+    assert sorted(path.name for path in reader.thumbnail_folder.iterdir()) == [
+        "ORB0001_1_1024x1024.webp",
+        "ORB0001_1_256x256.webp",
+        "ORB0001_1_64x64.webp",
+    ]
+    assert reader.thumbnail_is_current("ORB0001_1")
+    reader.thumbnail_location("ORB0001_1", dims=(64, 64)).unlink()
+    assert not reader.thumbnail_is_current("ORB0001_1")
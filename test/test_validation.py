@@ -0,0 +1,180 @@
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pystac
+import pytest
+from pystac.extensions.datacube import DatacubeExtension, Dimension, Variable
+from pystac.extensions.scientific import ScientificExtension
+
+from psup_stac_converter.utils.validation import (
+    VALIDATION_STATE_FILE,
+    SchemaStore,
+    validate_catalog,
+)
+
+SSYS_SCHEMA = "https://stac-extensions.github.io/ssys/v1.1.1/schema.json"
+DATACUBE_SCHEMA = "https://stac-extensions.github.io/datacube/v2.2.0/schema.json"
+
+
+def make_item(idx: int) -> pystac.Item:
+    return pystac.Item(
+        id=f"item_{idx}",
+        geometry={"type": "Point", "coordinates": [float(idx), 0.0]},
+        bbox=[float(idx), 0.0, float(idx), 0.0],
+        datetime=datetime(2010, 1, 1),
+        properties={"ssys:targets": ["Mars"]},
+        stac_extensions=[SSYS_SCHEMA],
+    )
+
+
+@pytest.fixture
+def catalog_file(tmp_path: Path) -> Path:
+    catalog = pystac.Catalog("psup", "A catalog")
+    collection = pystac.Collection(
+        "omega",
+        "A collection",
+        pystac.Extent(
+            pystac.SpatialExtent([[0.0, 0.0, 5.0, 0.0]]),
+            pystac.TemporalExtent([[datetime(2010, 1, 1), None]]),
+        ),
+    )
+    collection.add_items([make_item(idx) for idx in range(5)])
+    catalog.add_child(collection)
+    catalog.normalize_and_save(
+        str(tmp_path / "catalog"), catalog_type=pystac.CatalogType.SELF_CONTAINED
+    )
+    return tmp_path / "catalog" / "catalog.json"
+
+
+def item_file(catalog_file: Path, idx: int) -> Path:
+    return catalog_file.parent / "omega" / f"item_{idx}" / f"item_{idx}.json"
+
+
+def edit(stac_file: Path, **properties):
+    stac_dict = json.loads(stac_file.read_text())
+    stac_dict["properties"].update(properties)
+    stac_file.write_text(json.dumps(stac_dict))
+
+
+def test_valid_catalog(catalog_file: Path):
+    report = validate_catalog(catalog_file)
+
+    assert report.valid
+    assert report.n_checked == 7
+    assert report.n_skipped == 0
+    assert (catalog_file.parent / VALIDATION_STATE_FILE).exists()
+
+
+def test_invalid_item_is_reported(catalog_file: Path):
+    edit(item_file(catalog_file, 3), **{"ssys:targets": "Mars"})
+
+    report = validate_catalog(catalog_file)
+
+    assert not report.valid
+    assert list(report.errors) == [item_file(catalog_file, 3)]
+    assert SSYS_SCHEMA in report.errors[item_file(catalog_file, 3)][0]
+
+
+def test_missing_schema_is_reported(catalog_file: Path, tmp_path: Path):
+    stac_file = item_file(catalog_file, 0)
+    stac_dict = json.loads(stac_file.read_text())
+    stac_dict["stac_extensions"].append(
+        "https://stac-extensions.github.io/unknown/v1.0.0/schema.json"
+    )
+    stac_file.write_text(json.dumps(stac_dict))
+
+    report = validate_catalog(catalog_file, schema_cache_folder=tmp_path / "schemas")
+
+    assert list(report.errors) == [stac_file]
+    assert "isn't available" in report.errors[stac_file][0]
+
+
+def test_schema_from_the_cache_folder(tmp_path: Path):
+    schema_uri = "https://stac-extensions.github.io/unknown/v1.0.0/schema.json"
+    schema_file = (
+        tmp_path / "stac-extensions.github.io" / "unknown" / "v1.0.0" / "schema.json"
+    )
+    schema_file.parent.mkdir(parents=True)
+    schema_file.write_text(json.dumps({"type": "object", "required": ["id"]}))
+
+    store = SchemaStore(tmp_path)
+
+    assert store.validator(schema_uri).is_valid({"id": "item_0"})
+    assert not store.validator(schema_uri).is_valid({})
+
+
+def test_only_changed_files_validated(catalog_file: Path):
+    validate_catalog(catalog_file, changed_only=True)
+    edit(item_file(catalog_file, 1), title="Modified")
+
+    report = validate_catalog(catalog_file, changed_only=True)
+    assert report.valid
+    assert (report.n_checked, report.n_skipped) == (1, 6)
+
+    edit(item_file(catalog_file, 1), **{"ssys:targets": "Mars"})
+    report = validate_catalog(catalog_file, changed_only=True)
+    assert not report.valid
+    # Invalid files are checked again until they are fixed
+    report = validate_catalog(catalog_file, changed_only=True)
+    assert (report.n_checked, report.n_skipped) == (1, 6)
+
+    report = validate_catalog(catalog_file)
+    assert report.n_checked == 7
+
+
+def test_items_validated_in_parallel(catalog_file: Path):
+    edit(item_file(catalog_file, 4), **{"ssys:targets": "Mars"})
+
+    report = validate_catalog(catalog_file, n_jobs=2, chunk_size=2)
+
+    assert report.n_checked == 7
+    assert list(report.errors) == [item_file(catalog_file, 4)]
+
+
+def test_datacube_and_sci_validated_offline(tmp_path: Path):
+    item = make_item(0)
+    DatacubeExtension.ext(item, add_if_missing=True).apply(
+        dimensions={
+            "x": Dimension.from_dict(
+                {"type": "spatial", "axis": "x", "extent": [0.0, 5.0]}
+            ),
+            "wavelength": Dimension.from_dict(
+                {"type": "spatial", "axis": "z", "extent": [0.97, 2.55]}
+            ),
+        },
+        variables={
+            "Reflectance": Variable.from_dict(
+                {"dimensions": ["x", "wavelength"], "type": "data"}
+            )
+        },
+    )
+    collection = pystac.Collection(
+        "omega",
+        "A collection",
+        pystac.Extent(
+            pystac.SpatialExtent([[0.0, 0.0, 5.0, 0.0]]),
+            pystac.TemporalExtent([[datetime(2010, 1, 1), None]]),
+        ),
+    )
+    ScientificExtension.ext(collection, add_if_missing=True).apply(
+        doi="10.1029/2005JE002600", citation="Bibring et al. (2006)"
+    )
+    collection.add_item(item)
+    collection.normalize_and_save(
+        str(tmp_path / "catalog"), catalog_type=pystac.CatalogType.SELF_CONTAINED
+    )
+    collection_file = tmp_path / "catalog" / "collection.json"
+
+    # No download: the schemas come with the package
+    report = validate_catalog(collection_file, schema_cache_folder=tmp_path / "cache")
+    assert report.valid
+    assert report.n_checked == 2
+
+    item_file = tmp_path / "catalog" / "item_0" / "item_0.json"
+    stac_dict = json.loads(item_file.read_text())
+    stac_dict["properties"]["cube:dimensions"]["x"]["axis"] = "t"
+    item_file.write_text(json.dumps(stac_dict))
+    report = validate_catalog(collection_file)
+    assert list(report.errors) == [item_file]
+    assert DATACUBE_SCHEMA in report.errors[item_file][0]